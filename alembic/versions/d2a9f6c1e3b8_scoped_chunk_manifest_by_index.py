@@ -0,0 +1,36 @@
+"""scoped chunk_manifest rows by vector index
+
+Revision ID: d2a9f6c1e3b8
+Revises: b7d1e4a9c2f0
+Create Date: 2026-10-18 20:12:31.506114
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd2a9f6c1e3b8'
+down_revision: Union[str, Sequence[str], None] = 'b7d1e4a9c2f0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Rows written before scoping cannot be attributed to an index; dropping them
+    # makes the next ingestion of each file a full one
+    op.execute('DELETE FROM chunk_manifest')
+    op.add_column('chunk_manifest', sa.Column('index_name', sa.String(), server_default='', nullable=False))
+    op.drop_constraint('chunk_manifest_chunk_id_key', 'chunk_manifest', type_='unique')
+    op.create_unique_constraint('chunk_manifest_index_name_chunk_id_key', 'chunk_manifest', ['index_name', 'chunk_id'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute('DELETE FROM chunk_manifest')
+    op.drop_constraint('chunk_manifest_index_name_chunk_id_key', 'chunk_manifest', type_='unique')
+    op.drop_column('chunk_manifest', 'index_name')
+    op.create_unique_constraint('chunk_manifest_chunk_id_key', 'chunk_manifest', ['chunk_id'])
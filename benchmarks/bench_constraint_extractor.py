@@ -0,0 +1,113 @@
+"""
+Compares the rule-based ConstraintExtractor with the LLM constraint path on
+benchmarks/constraint_corpus.json.
+
+Reports per-query extraction latency, how often the extractor is confident
+(i.e. the LLM call is skipped), its accuracy on the labelled corpus when
+confident, and, with --llm (needs GEMINI_API_KEY), agreement with and latency
+of TourPlannerService's LLM extraction.
+
+    python -m benchmarks.bench_constraint_extractor [--llm]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import time
+
+from config import settings
+from services.constraint_extractor import ConstraintExtractor
+
+CORPUS_PATH = os.path.join(os.path.dirname(__file__), "constraint_corpus.json")
+
+
+def load_corpus() -> list[dict]:
+    with open(CORPUS_PATH, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def run_rules(corpus: list[dict], repeats: int) -> list[dict]:
+    extractor = ConstraintExtractor(settings.ALLOWED_CITIES)
+    results = []
+    for case in corpus:
+        timings = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            constraints, confident = extractor.extract(
+                case["query"], case.get("history")
+            )
+            timings.append((time.perf_counter() - start) * 1000)
+        results.append(
+            {
+                "constraints": constraints,
+                "confident": confident,
+                "latency_ms": statistics.median(timings),
+            }
+        )
+    return results
+
+
+async def run_llm(corpus: list[dict]) -> list[dict]:
+    from langchain_google_genai import ChatGoogleGenerativeAI
+    from services.tour_planner_service import TourPlannerService
+
+    llm = ChatGoogleGenerativeAI(
+        model="gemini-2.5-flash", google_api_key=settings.GEMINI_API_KEY, temperature=0
+    )
+    planner = TourPlannerService(
+        pc_index=None, llm=llm, embedding_service=None, redis_service=None
+    )
+    results = []
+    for case in corpus:
+        start = time.perf_counter()
+        constraints = await planner._get_tour_constraints_with_llm(
+            case["query"], case.get("history") or []
+        )
+        results.append(
+            {
+                "constraints": constraints,
+                "latency_ms": (time.perf_counter() - start) * 1000,
+            }
+        )
+    return results
+
+
+def main(use_llm: bool, repeats: int):
+    corpus = load_corpus()
+    rules = run_rules(corpus, repeats)
+
+    confident = [(case, r) for case, r in zip(corpus, rules) if r["confident"]]
+    correct = sum(r["constraints"] == case["expected"] for case, r in confident)
+    latencies = [r["latency_ms"] for r in rules]
+
+    print(f"queries                  : {len(corpus)}")
+    print(f"rule latency p50 / max   : {statistics.median(latencies):.3f} / {max(latencies):.3f} ms")
+    print(f"confident (LLM skipped)  : {len(confident)} ({len(confident) / len(corpus):.0%})")
+    print(f"accuracy when confident  : {correct}/{len(confident)}")
+
+    for case, r in zip(corpus, rules):
+        if r["confident"] and r["constraints"] != case["expected"]:
+            print(f"  WRONG: {case['query']!r} -> {r['constraints']}")
+
+    if not use_llm:
+        return
+
+    llm = asyncio.run(run_llm(corpus))
+    llm_latencies = [r["latency_ms"] for r in llm]
+    agree = sum(
+        r["constraints"] == l["constraints"] for r, l in zip(rules, llm) if r["confident"]
+    )
+    llm_correct = sum(l["constraints"] == case["expected"] for case, l in zip(corpus, llm))
+    print(f"llm latency p50 / max    : {statistics.median(llm_latencies):.0f} / {max(llm_latencies):.0f} ms")
+    print(f"llm accuracy (all)       : {llm_correct}/{len(corpus)}")
+    print(f"rules/llm agreement      : {agree}/{len(confident)} confident queries")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--llm", action="store_true", help="also run the LLM path")
+    parser.add_argument("--repeats", type=int, default=20)
+    args = parser.parse_args()
+    main(args.llm, args.repeats)
@@ -0,0 +1,151 @@
+"""
+Compares the fp32 torch baseline with the int8 and ONNX inference backends on
+the documents/ corpus.
+
+For the dense model it reports single-query latency (p50/p95), batch
+throughput and cosine drift of every chunk embedding against fp32. For the
+cross-encoder it reports pair latency, throughput and score drift on
+(query, chunk) pairs.
+
+    python -m benchmarks.bench_inference_backend --backends torch int8 onnx
+"""
+
+import argparse
+import os
+import statistics
+import time
+
+import numpy as np
+
+from services.document_ingestion_service import DocumentProcessor
+from services.inference_backend import (
+    TORCH,
+    BACKENDS,
+    load_cross_encoder,
+    load_dense_model,
+)
+
+DOCUMENTS_DIR = os.path.join(os.path.dirname(__file__), "..", "documents")
+
+QUERIES = [
+    "what is the refund policy?",
+    "can i cancel my booking?",
+    "plan a 3 day trip from kathmandu to pokhara",
+    "best hotels in chitwan",
+    "how long is the bus from lumbini to pokhara",
+]
+
+
+def load_corpus() -> list[str]:
+    processor = DocumentProcessor()
+    texts = []
+    for filename in sorted(os.listdir(DOCUMENTS_DIR)):
+        with open(os.path.join(DOCUMENTS_DIR, filename), "rb") as f:
+            content = f.read()
+        if filename.endswith(".json"):
+            documents = processor.process_json(content, filename)
+        elif filename.endswith(".txt"):
+            documents = processor.process_txt(content, filename)
+        else:
+            continue
+        texts.extend(d.page_content for d in documents)
+    return texts
+
+
+def _percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+def _latencies(fn, items, repeats: int) -> list[float]:
+    fn(items[:1])  # warm-up pass
+    timings = []
+    for _ in range(repeats):
+        for item in items:
+            start = time.perf_counter()
+            fn([item])
+            timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def bench_dense(backend: str, corpus: list[str], repeats: int):
+    model = load_dense_model(backend)
+    latencies = _latencies(model.embed_documents, QUERIES, repeats)
+
+    start = time.perf_counter()
+    embeddings = np.asarray(model.embed_documents(corpus), dtype=np.float32)
+    throughput = len(corpus) / (time.perf_counter() - start)
+    return latencies, throughput, embeddings
+
+
+def bench_cross_encoder(backend: str, pairs: list[list[str]], repeats: int):
+    model = load_cross_encoder(backend)
+    latencies = _latencies(model.predict, pairs, repeats)
+
+    start = time.perf_counter()
+    scores = np.asarray(model.predict(pairs), dtype=np.float32)
+    throughput = len(pairs) / (time.perf_counter() - start)
+    return latencies, throughput, scores
+
+
+def cosine_rows(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    a = a / np.linalg.norm(a, axis=1, keepdims=True)
+    b = b / np.linalg.norm(b, axis=1, keepdims=True)
+    return np.sum(a * b, axis=1)
+
+
+def main(backends: list[str], repeats: int):
+    corpus = load_corpus()
+    pairs = [[query, text] for query in QUERIES for text in corpus[:20]]
+    print(f"corpus chunks: {len(corpus)}, rerank pairs: {len(pairs)}\n")
+
+    if TORCH not in backends:
+        backends = [TORCH] + backends
+
+    baseline_emb = baseline_scores = None
+    print("dense (all-mpnet-base-v2)")
+    print(f"{'backend':8} {'p50 ms':>8} {'p95 ms':>8} {'chunks/s':>9} {'mean cos':>9} {'min cos':>8}")
+    for backend in backends:
+        try:
+            latencies, throughput, embeddings = bench_dense(backend, corpus, repeats)
+        except Exception as e:
+            print(f"{backend:8} unavailable: {e}")
+            continue
+        if baseline_emb is None:
+            baseline_emb = embeddings
+        cos = cosine_rows(baseline_emb, embeddings)
+        print(
+            f"{backend:8} {statistics.median(latencies):8.1f} {_percentile(latencies, 0.95):8.1f} "
+            f"{throughput:9.1f} {cos.mean():9.4f} {cos.min():8.4f}"
+        )
+
+    print("\ncross-encoder (ms-marco-MiniLM-L6-v2)")
+    print(f"{'backend':8} {'p50 ms':>8} {'p95 ms':>8} {'pairs/s':>9} {'max |dscore|':>13} {'top1 agree':>11}")
+    for backend in backends:
+        try:
+            latencies, throughput, scores = bench_cross_encoder(backend, pairs, repeats)
+        except Exception as e:
+            print(f"{backend:8} unavailable: {e}")
+            continue
+        if baseline_scores is None:
+            baseline_scores = scores
+        per_query = len(pairs) // len(QUERIES)
+        top1_agree = np.mean(
+            [
+                np.argmax(scores[i : i + per_query])
+                == np.argmax(baseline_scores[i : i + per_query])
+                for i in range(0, len(pairs), per_query)
+            ]
+        )
+        print(
+            f"{backend:8} {statistics.median(latencies):8.1f} {_percentile(latencies, 0.95):8.1f} "
+            f"{throughput:9.1f} {np.abs(scores - baseline_scores).max():13.4f} {top1_agree:11.0%}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--backends", nargs="+", default=list(BACKENDS), choices=BACKENDS)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+    main(args.backends, args.repeats)
@@ -0,0 +1,123 @@
+"""
+Peak memory of ingesting a large upload, eager vs streaming.
+
+The eager path is what ingestion did before: read the whole file, parse every
+Document up front, then batch. The streaming path parses the file in blocks
+and feeds batches straight into encode/upsert. Peak Python heap (tracemalloc)
+of the streaming path should stay flat as the file grows.
+
+Synthetic hotel catalogs (.json) and policy texts (.txt) are generated in a
+temp dir. The encoders and the index are stubs, so only parsing and batching
+are measured and the benchmark runs offline.
+
+    python -m benchmarks.bench_ingest_memory --records 5000 20000 80000
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+
+from services.document_ingestion_service import DocumentProcessor, IngestDocumentService
+from services.lookup_store import lookup_store
+
+CITIES = ["kathmandu", "pokhara", "chitwan", "lumbini", "nagarkot", "bandipur"]
+WORDS = "refund booking cancel policy guide tour bus hotel days advance fee".split()
+
+
+class StubEmbeddings:
+    def embed_documents(self, texts):
+        return [[0.0] * 8 for _ in texts]
+
+
+class DiscardIndex:
+    """Async index stub that drops what it is given."""
+
+    async def upsert(self, vectors):
+        await asyncio.sleep(0)
+
+    async def delete(self, **kwargs):
+        pass
+
+
+class BenchIngestService(IngestDocumentService):
+    @staticmethod
+    def _encode_sparse(texts):
+        return [{"indices": [0], "values": [1.0]} for _ in texts]
+
+
+def write_catalog(path: str, records: int):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("[")
+        for i in range(records):
+            item = {
+                "city": random.choice(CITIES),
+                "text": (
+                    f"hotel name -Hotel {i}, hotel level-{random.randint(1, 5)}, "
+                    f"price per night - {random.randint(20, 400)}"
+                ),
+                "amenities": random.sample(WORDS, 5),
+            }
+            f.write(("," if i else "") + json.dumps(item))
+        f.write("]")
+
+
+def write_text(path: str, records: int):
+    with open(path, "w", encoding="utf-8") as f:
+        for _ in range(records):
+            f.write(" ".join(random.choices(WORDS, k=30)) + ".\n")
+
+
+async def ingest(service, path: str, filename: str, streaming: bool) -> int:
+    if streaming:
+        with open(path, "rb") as stream:
+            documents = service.iter_documents(stream, filename)
+            return await service._process_and_upsert(documents, filename)
+    with open(path, "rb") as f:
+        content = f.read()
+    if filename.endswith(".json"):
+        documents = DocumentProcessor.process_json(content, filename)
+    else:
+        documents = DocumentProcessor.process_txt(content, filename)
+    return await service._process_and_upsert(documents, filename)
+
+
+def measure(service, path: str, filename: str, streaming: bool):
+    tracemalloc.start()
+    start = time.perf_counter()
+    chunks = asyncio.run(ingest(service, path, filename, streaming))
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return chunks, peak / 2**20, elapsed
+
+
+def main(sizes: list[int]):
+    random.seed(0)
+    workdir = tempfile.mkdtemp()
+    lookup_store.path = os.path.join(workdir, "lookup_store.json")
+    service = BenchIngestService(DiscardIndex(), StubEmbeddings(), None)
+
+    print(f"{'file':14} {'records':>8} {'MiB':>7} {'mode':10} {'chunks':>8} "
+          f"{'peak MiB':>9} {'s':>6}")
+    for filename, write in (("hotels.json", write_catalog), ("company.txt", write_text)):
+        for records in sizes:
+            path = os.path.join(workdir, filename)
+            write(path, records)
+            size = os.path.getsize(path) / 2**20
+            for streaming in (False, True):
+                chunks, peak, elapsed = measure(service, path, filename, streaming)
+                mode = "streaming" if streaming else "eager"
+                print(f"{filename:14} {records:8} {size:7.1f} {mode:10} {chunks:8} "
+                      f"{peak:9.1f} {elapsed:6.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--records", nargs="+", type=int, default=[5000, 20000, 80000])
+    args = parser.parse_args()
+    main(args.records)
@@ -0,0 +1,87 @@
+"""
+Shows that the planner's three concurrent hybrid searches overlap once the
+index is wrapped in AsyncIndexService, and that the event loop stays responsive.
+
+A fake index sleeps for --latency seconds per query to stand in for the
+Pinecone round-trip, so the benchmark runs without network access.
+
+    python -m benchmarks.bench_retrieval_overlap --latency 0.15 --rounds 5
+"""
+
+import argparse
+import asyncio
+import time
+
+from services.async_index_service import AsyncIndexService
+
+
+class SlowIndex:
+    """Blocking index stub with a fixed per-query latency."""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    def query(self, **kwargs):
+        time.sleep(self.latency)
+        return {"matches": []}
+
+
+class BlockingIndex:
+    """What hybrid_search did before: a sync call inside an async def."""
+
+    def __init__(self, index):
+        self.index = index
+
+    async def query(self, **kwargs):
+        return self.index.query(**kwargs)
+
+
+async def _heartbeat(stop: asyncio.Event, interval: float, lags: list):
+    """Measures how late the event loop wakes us up (loop stall)."""
+    while not stop.is_set():
+        expected = time.perf_counter() + interval
+        await asyncio.sleep(interval)
+        lags.append(max(0.0, time.perf_counter() - expected))
+
+
+async def _run_gather(index, rounds: int):
+    stop = asyncio.Event()
+    lags = []
+    heartbeat = asyncio.create_task(_heartbeat(stop, 0.005, lags))
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        # Mirrors TourPlannerService.run: attractions, travel hours, hotels
+        await asyncio.gather(
+            index.query(top_k=3, vector=[]),
+            index.query(top_k=3, vector=[]),
+            index.query(top_k=3, vector=[]),
+        )
+    elapsed = time.perf_counter() - start
+
+    stop.set()
+    await heartbeat
+    return elapsed / rounds, max(lags) if lags else 0.0
+
+
+async def main(latency: float, rounds: int, concurrency: int):
+    slow_index = SlowIndex(latency)
+    async_index = AsyncIndexService(slow_index, max_concurrency=concurrency)
+
+    sync_avg, sync_lag = await _run_gather(BlockingIndex(slow_index), rounds)
+    async_avg, async_lag = await _run_gather(async_index, rounds)
+    async_index.close()
+
+    print(f"per-query latency      : {latency * 1000:.0f} ms")
+    print(f"blocking gather (avg)  : {sync_avg * 1000:.0f} ms, max loop stall {sync_lag * 1000:.0f} ms")
+    print(f"async pool gather (avg): {async_avg * 1000:.0f} ms, max loop stall {async_lag * 1000:.0f} ms")
+    print(f"speedup                : {sync_avg / async_avg:.2f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--latency", type=float, default=0.15)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+    asyncio.run(main(args.latency, args.rounds, args.concurrency))
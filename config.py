@@ -19,6 +19,35 @@ class Settings:
     REDIS_HOST: str = os.getenv("REDIS_HOST", "localhost")
     REDIS_PORT: int = int(os.getenv("REDIS_PORT", 6379))
     REDIS_MAX_MESSAGES: int = 20
+    # Per-user lock that serializes concurrent turns of one session (seconds)
+    SESSION_LOCK_TIMEOUT: int = int(os.getenv("SESSION_LOCK_TIMEOUT", 120))
+    SESSION_LOCK_WAIT: int = int(os.getenv("SESSION_LOCK_WAIT", 30))
+    # Token budget of the compacted history lines sent to the LLM prompts
+    HISTORY_TOKEN_BUDGET: int = int(os.getenv("HISTORY_TOKEN_BUDGET", 600))
+    # Token budget per retrieved-context section of the planning prompt
+    CONTEXT_SECTION_TOKEN_BUDGET: int = int(
+        os.getenv("CONTEXT_SECTION_TOKEN_BUDGET", 400)
+    )
+    HISTORY_MESSAGE_MAX_TOKENS: int = int(os.getenv("HISTORY_MESSAGE_MAX_TOKENS", 120))
+    # Sessions expire after this long without a turn (seconds)
+    SESSION_TTL: int = int(os.getenv("SESSION_TTL", 7 * 86400))
+    # Messages are dropped oldest first once a session is over this size
+    SESSION_MAX_BYTES: int = int(os.getenv("SESSION_MAX_BYTES", 64 * 1024))
+    # Stored session and embedding values at least this large are zlib-compressed
+    SESSION_COMPRESS_MIN_BYTES: int = int(os.getenv("SESSION_COMPRESS_MIN_BYTES", 512))
+
+    # --- Embedding Cache Config ---
+    # In-process LRU tier checked before the Redis embedding cache
+    EMB_CACHE_LRU_SIZE: int = int(os.getenv("EMB_CACHE_LRU_SIZE", 1024))
+    EMB_CACHE_LRU_TTL: int = int(os.getenv("EMB_CACHE_LRU_TTL", 600))
+    # Redis tier; reads slide the TTL
+    EMB_CACHE_REDIS_TTL: int = int(os.getenv("EMB_CACHE_REDIS_TTL", 86400))
+
+    # --- Embedding Batching Config ---
+    # Concurrent queries arriving within the window share one forward pass
+    EMBED_BATCHING: bool = os.getenv("EMBED_BATCHING", "true").lower() == "true"
+    EMBED_BATCH_MAX_SIZE: int = int(os.getenv("EMBED_BATCH_MAX_SIZE", 32))
+    EMBED_BATCH_WINDOW_MS: float = float(os.getenv("EMBED_BATCH_WINDOW_MS", 5))
 
     # --- Business Logic (The "Editable" part) ---
     ALLOWED_CITIES: list = ["kathmandu", "pokhara", "chitwan", "lumbini", "nagarkot"]
@@ -27,6 +56,85 @@ class Settings:
     PINECONE_REGION: str = os.getenv("PINECONE_REGION", "us-east-1")
     EMBEDDING_DIMENSION: int = int(os.getenv("EMBEDDING_DIMENSION", 768))
 
+    # --- Model Config ---
+    EMBEDDING_MODEL_NAME: str = "all-mpnet-base-v2"
+    CROSS_ENCODER_MODEL_NAME: str = "cross-encoder/ms-marco-MiniLM-L6-v2"
+    # "torch" (fp32), "int8" (dynamic quantization) or "onnx" (needs optimum[onnxruntime])
+    INFERENCE_BACKEND: str = os.getenv("INFERENCE_BACKEND", "torch").lower()
+    # Load every model during startup instead of on first use
+    PRELOAD_MODELS: bool = os.getenv("PRELOAD_MODELS", "true").lower() == "true"
+    # Bind the port immediately and warm models/connections in the background
+    FAST_START: bool = os.getenv("FAST_START", "false").lower() == "true"
+
+    # --- Reranking Config ---
+    RERANK_CACHE_SIZE: int = int(os.getenv("RERANK_CACHE_SIZE", 4096))
+    RERANK_CACHE_TTL: int = int(os.getenv("RERANK_CACHE_TTL", 3600))
+    # Skip the cross-encoder when retrieval scores already separate the top-k
+    RERANK_CASCADE: bool = os.getenv("RERANK_CASCADE", "true").lower() == "true"
+    # Relative gap between the k-th and (k+1)-th retrieval score
+    RERANK_CASCADE_MARGIN: float = float(os.getenv("RERANK_CASCADE_MARGIN", 0.15))
+
+    # --- Semantic Answer Cache Config ---
+    SEMANTIC_CACHE_ENABLED: bool = (
+        os.getenv("SEMANTIC_CACHE_ENABLED", "true").lower() == "true"
+    )
+    # Min cosine similarity between query embeddings to reuse an answer
+    SEMANTIC_CACHE_THRESHOLD: float = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", 0.92))
+    SEMANTIC_CACHE_TTL: int = int(os.getenv("SEMANTIC_CACHE_TTL", 86400))
+    SEMANTIC_CACHE_MAX_ENTRIES: int = int(os.getenv("SEMANTIC_CACHE_MAX_ENTRIES", 500))
+
+    # --- Intent Classification Config ---
+    LOCAL_INTENT_CLASSIFIER: bool = (
+        os.getenv("LOCAL_INTENT_CLASSIFIER", "true").lower() == "true"
+    )
+    # Below this kNN vote share the query is escalated to the LLM
+    INTENT_CONFIDENCE_THRESHOLD: float = float(
+        os.getenv("INTENT_CONFIDENCE_THRESHOLD", 0.8)
+    )
+
+    # --- Tour Constraint Extraction Config ---
+    # Try the rule-based extractor first; the LLM is only asked when it is unsure
+    RULE_BASED_CONSTRAINTS: bool = (
+        os.getenv("RULE_BASED_CONSTRAINTS", "true").lower() == "true"
+    )
+
+    # --- Plan Cache Config ---
+    PLAN_CACHE_ENABLED: bool = os.getenv("PLAN_CACHE_ENABLED", "true").lower() == "true"
+    PLAN_CACHE_TTL: int = int(os.getenv("PLAN_CACHE_TTL", 7 * 86400))
+
+    # --- Ingestion Config ---
+    # Chunks encoded and upserted per batch (Pinecone caps upsert request size)
+    INGEST_BATCH_SIZE: int = int(os.getenv("INGEST_BATCH_SIZE", 64))
+    # Document embeddings are cached by text hash so re-ingestion reuses them
+    DOC_EMB_CACHE_TTL: int = int(os.getenv("DOC_EMB_CACHE_TTL", 30 * 86400))
+    # Uploads are spooled and parsed in blocks of this many bytes
+    INGEST_READ_SIZE: int = int(os.getenv("INGEST_READ_SIZE", 64 * 1024))
+    # Bulk ingestion: parse worker processes, upserts in flight, and the file
+    # size from which a file is streamed instead of parsed in a worker
+    BULK_INGEST_ROOT: str = os.getenv("BULK_INGEST_ROOT", "documents")
+    BULK_INGEST_WORKERS: int = int(
+        os.getenv("BULK_INGEST_WORKERS", os.cpu_count() or 2)
+    )
+    BULK_UPSERT_CONCURRENCY: int = int(os.getenv("BULK_UPSERT_CONCURRENCY", 4))
+    BULK_STREAM_MIN_BYTES: int = int(os.getenv("BULK_STREAM_MIN_BYTES", 8 * 2**20))
+    # Job progress is published to Redis this often, so any worker can serve a
+    # poll, and kept this long after the last update
+    INGEST_JOB_PUBLISH_INTERVAL: float = float(
+        os.getenv("INGEST_JOB_PUBLISH_INTERVAL", 1.0)
+    )
+    INGEST_JOB_TTL: int = int(os.getenv("INGEST_JOB_TTL", 86400))
+
+    # --- Vector Store Config ---
+    # "pinecone" for the managed index, "local" for the in-process index
+    VECTOR_BACKEND: str = os.getenv("VECTOR_BACKEND", "pinecone").lower()
+    LOCAL_INDEX_DIR: str = os.getenv("LOCAL_INDEX_DIR", "data/local_index")
+    # Max retrieval calls in flight per worker (also the HTTP connection pool size)
+    RETRIEVAL_MAX_CONCURRENCY: int = int(os.getenv("RETRIEVAL_MAX_CONCURRENCY", 8))
+    # Snapshot of the keyed travel/hotel/attraction records built at ingestion
+    LOOKUP_STORE_PATH: str = os.getenv("LOOKUP_STORE_PATH", "data/lookup_store.json")
+    # Files with more structured records than this are served by vector search
+    LOOKUP_STORE_MAX_RECORDS: int = int(os.getenv("LOOKUP_STORE_MAX_RECORDS", 5000))
+
 
 # Global instance
 settings = Settings()
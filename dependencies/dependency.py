@@ -19,7 +19,14 @@ from services import (
     redis_service,
     ranking_service,
     pinecone_service,
+    semantic_cache_service,
+    intent_classifier,
+    plan_cache_service,
+    chunk_manifest_service,
+    bulk_ingestion_service,
 )
+from config import settings
+from services.model_registry import model_registry, MPNET
 from database.database_setup import SessionLocal
 from models.models import User
 
@@ -45,22 +52,40 @@ def get_llm_service(request: Request):
 
 
 def get_pinecone_service():
-    return pinecone_service.PineconeService()
+    # Shared instance: constructing one per request used to hit Pinecone every time
+    return pinecone_service.pc_service
+
+
+def require_ready(request: Request):
+    """Reject traffic with 503 until the background warm-up has finished."""
+    readiness = request.app.state.readiness
+    if not readiness.ready:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Service is warming up. Please try again shortly.",
+            headers={"Retry-After": "5"},
+        )
 
 
 def get_embedding_service(request: Request):
-    emb_model = request.app.state.emb_model
-    return embedding_service.EmbeddingService(model=emb_model)
+    # Models come from the shared registry, loaded once per process
+    batchers = request.app.state.embedding_batchers
+    return embedding_service.EmbeddingService(
+        dense_batcher=batchers.get("dense"),
+        sparse_batcher=batchers.get("sparse"),
+    )
 
 
 def get_ranking_service(request: Request):
-    cross_encoder = request.app.state.cross_encoder
-    return ranking_service.RankingService(model=cross_encoder)
+    return ranking_service.RankingService()
 
 
 def get_redis_service(request: Request):
     redis_client = request.app.state.redis_client
-    return redis_service.RedisService(redis_client=redis_client)
+    return redis_service.RedisService(
+        redis_client=redis_client,
+        binary_client=request.app.state.redis_binary_client,
+    )
 
 
 def get_rag_service(
@@ -75,6 +100,15 @@ def get_rag_service(
     ranking_service = ranking_service
     redis_service = redis_service
 
+    semantic_cache = (
+        semantic_cache_service.SemanticCacheService(
+            redis_client=request.app.state.redis_client,
+            namespace=policy_service.POLICY_CACHE_NAMESPACE,
+        )
+        if settings.SEMANTIC_CACHE_ENABLED
+        else None
+    )
+
     # Core logic: We create the 'dependencies' of RagService here
     policy = policy_service.PolicyService(
         pc_index=pc_index,
@@ -82,35 +116,67 @@ def get_rag_service(
         embedding_service=embedding_service,
         ranking_service=ranking_service,
         redis_service=redis_service,
+        semantic_cache=semantic_cache,
+    )
+    plan_cache = (
+        plan_cache_service.PlanCacheService(redis_client=request.app.state.redis_client)
+        if settings.PLAN_CACHE_ENABLED
+        else None
     )
     tour = tour_planner_service.TourPlannerService(
         pc_index=pc_index,
         llm=llm,
         embedding_service=embedding_service,
         redis_service=redis_service,
+        plan_cache=plan_cache,
     )
 
     # Then we inject them into the main service
     return rag_service.RagService(policy_service=policy, tour_planner=tour)
 
 
-def get_classify_service(request: Request):
+def get_classify_service(
+    request: Request,
+    embedding_service=Depends(get_embedding_service),
+    redis_service=Depends(get_redis_service),
+):
     llm = request.app.state.llm
-    return classify_services.ClassifyService(llm=llm)
+    local_classifier = (
+        intent_classifier.LocalIntentClassifier(
+            embedding_service=embedding_service, redis_service=redis_service
+        )
+        if settings.LOCAL_INTENT_CLASSIFIER
+        else None
+    )
+    return classify_services.ClassifyService(
+        llm=llm, local_classifier=local_classifier
+    )
 
 
 def get_booking_service(request: Request, db: Session = Depends(get_db)):
     return booking_service.BookingService(db=db)
 
 
-def get_ingest_document(request: Request, pc_service=Depends(get_pinecone_service)):
+def get_ingest_document(
+    request: Request,
+    pc_service=Depends(get_pinecone_service),
+    redis_service=Depends(get_redis_service),
+):
     pc_index = request.app.state.pc_index
-    emb_model = request.app.state.emb_model
+    emb_model = model_registry.get(MPNET)
     return document_ingestion_service.IngestDocumentService(
-        pc_index=pc_index, emb_model=emb_model, pc_service=pc_service
+        pc_index=pc_index,
+        emb_model=emb_model,
+        pc_service=pc_service,
+        redis_service=redis_service,
+        manifest=chunk_manifest_service.ChunkManifestService(),
     )
 
 
+def get_bulk_ingestion(ingest_service=Depends(get_ingest_document)):
+    return bulk_ingestion_service.BulkIngestionService(ingest_service)
+
+
 def get_user_services(db: Session = Depends(get_db)):
     return user_services.UserServices(db=db)
 
@@ -0,0 +1,89 @@
+"""
+Bulk-ingests a directory, or a manifest listing files, into the vector index and
+prints per-stage throughput and total wall time.
+
+    python ingest.py documents/
+    python ingest.py partners/manifest.txt --workers 8 --upsert-concurrency 8
+
+With VECTOR_BACKEND=local the index lives in this process, so stop the API
+first or use POST /admin/ingest-directory instead.
+"""
+
+import argparse
+import asyncio
+import time
+
+from redis.asyncio import Redis
+
+from config import settings
+from services.async_index_service import AsyncIndexService
+from services.bulk_ingestion_service import BulkIngestionService, discover_files
+from services.chunk_manifest_service import ChunkManifestService
+from services.document_ingestion_service import IngestDocumentService
+from services.lookup_store import lookup_store
+from services.model_registry import model_registry, MPNET
+from services.pinecone_service import pc_service
+from services.redis_service import RedisService
+from services.vector_index import open_vector_index
+
+
+def print_report(job, wall_seconds: float):
+    print(f"\n{'stage':8} {'chunks':>8} {'seconds':>8} {'chunks/s':>9}")
+    for stage, stats in job.stage_report().items():
+        print(
+            f"{stage:8} {stats['chunks']:8} {stats['seconds']:8.2f} "
+            f"{stats['chunks_per_second']:9.1f}"
+        )
+    print(
+        f"\n{job.status}: {job.processed_chunks} upserted, "
+        f"{job.skipped_chunks} unchanged, {job.deleted_chunks} deleted, "
+        f"{job.failed_chunks} failed"
+    )
+    for error in job.errors:
+        print(f"  error: {error}")
+    print(f"wall time: {wall_seconds:.2f}s")
+
+
+async def main(path: str, workers: int, upsert_concurrency: int):
+    started = time.perf_counter()
+    files = discover_files(path)
+    print(f"{len(files)} files under {path}")
+
+    # Merge into the existing snapshot rather than overwrite it
+    lookup_store.load()
+    pc_index = AsyncIndexService(open_vector_index())
+    redis_client = Redis(
+        host=settings.REDIS_HOST, port=settings.REDIS_PORT, decode_responses=True
+    )
+    redis_binary_client = Redis(host=settings.REDIS_HOST, port=settings.REDIS_PORT)
+    ingest_service = IngestDocumentService(
+        pc_index=pc_index,
+        emb_model=model_registry.get(MPNET),
+        pc_service=pc_service,
+        redis_service=RedisService(
+            redis_client=redis_client, binary_client=redis_binary_client
+        ),
+        manifest=ChunkManifestService(),
+    )
+    try:
+        job = await BulkIngestionService(
+            ingest_service, workers=workers, upsert_concurrency=upsert_concurrency
+        ).ingest(files)
+    finally:
+        await redis_client.close()
+        await redis_binary_client.close()
+        pc_index.close()
+    print_report(job, time.perf_counter() - started)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("path", help="directory, or manifest file listing files")
+    parser.add_argument("--workers", type=int, default=settings.BULK_INGEST_WORKERS)
+    parser.add_argument(
+        "--upsert-concurrency", type=int, default=settings.BULK_UPSERT_CONCURRENCY
+    )
+    args = parser.parse_args()
+    asyncio.run(main(args.path, args.workers, args.upsert_concurrency))
@@ -1,17 +1,81 @@
+import time
+
+# Recorded before the heavy imports so cold-start time includes them
+PROCESS_STARTED_AT = time.perf_counter()
+
+import asyncio
 import os
 from contextlib import asynccontextmanager
 from dotenv import load_dotenv
 from fastapi import FastAPI, Depends
 from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain_huggingface import HuggingFaceEmbeddings
-from sentence_transformers import CrossEncoder
 from redis.asyncio import Redis
 from database.database_setup import Base, engine
-from routes import classify_route, vector_db_route, user_register_route
+from routes import (
+    classify_route,
+    vector_db_route,
+    user_register_route,
+    metrics_route,
+    health_route,
+)
 from workflow.graph import graph
 from config import settings
 from dependencies.dependency import get_pinecone_service
-from services.pinecone_service import pc_service
+from services.vector_index import open_vector_index
+from services.async_index_service import AsyncIndexService
+from services.embedding_service import EmbeddingService
+from services.model_registry import model_registry, MPNET, SPLADE, CROSS_ENCODER
+from services.readiness_service import ReadinessTracker
+from services.lookup_store import lookup_store
+from services.ingestion_jobs import ingestion_jobs
+from utils.logger import logger
+
+
+def _warm_models():
+    """Load every model and run a dummy pass so first requests skip allocation costs."""
+    model_registry.preload()
+    model_registry.get(MPNET).embed_documents(["warm up"])
+    model_registry.get(SPLADE).encode_documents(["warm up"])
+    model_registry.get(CROSS_ENCODER).predict([["warm up", "warm up"]])
+
+
+async def _warm_up(app: FastAPI):
+    """
+    Brings up the vector index, models, database and redis, recording each in
+    app.state.readiness. Blocking steps run in threads so /healthz keeps answering.
+    """
+    readiness: ReadinessTracker = app.state.readiness
+
+    async def step(name: str, coro_fn):
+        start = time.perf_counter()
+        try:
+            await coro_fn()
+            readiness.mark_ready(name, time.perf_counter() - start)
+        except Exception as e:
+            readiness.mark_failed(name, e)
+
+    async def vector_index():
+        pc_index = await asyncio.to_thread(open_vector_index)
+        await asyncio.to_thread(lookup_store.load)
+        # Queries run off the event loop through a bounded pool
+        app.state.pc_index = AsyncIndexService(pc_index)
+
+    async def models():
+        if settings.PRELOAD_MODELS:
+            await asyncio.to_thread(_warm_models)
+
+    async def database():
+        await asyncio.to_thread(Base.metadata.create_all, bind=engine)
+
+    async def redis():
+        await app.state.redis_client.ping()
+
+    await asyncio.gather(
+        step("vector_index", vector_index),
+        step("models", models),
+        step("database", database),
+        step("redis", redis),
+    )
 
 
 @asynccontextmanager
@@ -21,38 +85,61 @@ async def lifespan(app: FastAPI):
     pinecone_api_key = settings.PINECONE_API_KEY
     gemini_api_key = settings.GEMINI_API_KEY
 
-    if not pinecone_api_key or not gemini_api_key:
-        raise RuntimeError("Missing API keys in environment.")
+    use_local_index = settings.VECTOR_BACKEND == "local"
 
-    pc_index = pc_service.get_index()
+    if not gemini_api_key or (not use_local_index and not pinecone_api_key):
+        raise RuntimeError("Missing API keys in environment.")
 
     llm = ChatGoogleGenerativeAI(
         model="gemini-2.5-flash", google_api_key=gemini_api_key, temperature=0
     )
 
-    emb_model = HuggingFaceEmbeddings(model_name="all-mpnet-base-v2")
-    cross_encoder = CrossEncoder("cross-encoder/ms-marco-MiniLM-L6-v2")
-
     redis_client = Redis(
         host=settings.REDIS_HOST, port=settings.REDIS_PORT, decode_responses=True
     )
+    # Sessions and embeddings are stored as compact binary values
+    redis_binary_client = Redis(host=settings.REDIS_HOST, port=settings.REDIS_PORT)
+    # Job progress is shared through Redis, so any worker can answer a poll
+    ingestion_jobs.attach(redis_client)
 
-    app.state.pc_index = pc_index
+    app.state.pc_index = None
     app.state.llm = llm
-    app.state.emb_model = emb_model
-    app.state.cross_encoder = cross_encoder
+    app.state.embedding_batchers = (
+        EmbeddingService.create_batchers() if settings.EMBED_BATCHING else {}
+    )
     app.state.graph = graph
     app.state.redis_client = redis_client
+    app.state.redis_binary_client = redis_binary_client
+    app.state.readiness = ReadinessTracker(
+        ["vector_index", "models", "database", "redis"],
+        started_at=PROCESS_STARTED_AT,
+    )
 
-    Base.metadata.create_all(bind=engine)
+    if settings.FAST_START:
+        # Bind immediately; /readyz turns green once the warm-up finishes
+        app.state.warmup_task = asyncio.create_task(_warm_up(app))
+    else:
+        await _warm_up(app)
+        if not app.state.readiness.ready:
+            raise RuntimeError(f"Startup failed: {app.state.readiness.report()}")
 
     yield
 
+    if settings.FAST_START and not app.state.warmup_task.done():
+        app.state.warmup_task.cancel()
+    await ingestion_jobs.close()
     await redis_client.close()
+    await redis_binary_client.close()
+    for batcher in app.state.embedding_batchers.values():
+        await batcher.close()
+    if app.state.pc_index is not None:
+        app.state.pc_index.close()
 
 
 app = FastAPI(lifespan=lifespan)
 
+app.include_router(health_route.router)
 app.include_router(classify_route.router)
 app.include_router(vector_db_route.router)
 app.include_router(user_register_route.router)
+app.include_router(metrics_route.router)
@@ -1,6 +1,6 @@
 from sqlalchemy import ForeignKey, Column, Integer, String, DateTime, func, Boolean
 from sqlalchemy import String
-from sqlalchemy import JSON
+from sqlalchemy import JSON, UniqueConstraint
 from database.database_setup import Base
 
 
@@ -19,4 +19,17 @@ class Booking(Base):
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("user_account.id"), nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    title = Column(String, nullable=True)
\ No newline at end of file
+    title = Column(String, nullable=True)
+
+class ChunkManifest(Base):
+    __tablename__ = "chunk_manifest"
+    __table_args__ = (UniqueConstraint("index_name", "chunk_id"),)
+    id = Column(Integer, primary_key=True, index=True)
+    # Backend and index the chunk was written to, e.g. "pinecone:tour-planner"
+    index_name = Column(String, nullable=False, server_default="")
+    filename = Column(String, nullable=False, index=True)
+    chunk_id = Column(String, nullable=False)
+    content_hash = Column(String(64), nullable=False)
+    updated_at = Column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
+    )
@@ -1,7 +1,7 @@
 class AIPrompts:
     @staticmethod
     def get_tour_constraint_prompt(
-        user_query: str, message_history: list, allowed_cities: list
+        user_query: str, message_history: str, allowed_cities: list
     ) -> str:
         return f"""
                 INPUT:
@@ -11,11 +11,28 @@ class AIPrompts:
                 Role: You are an AI assistant to retrieve the necessary entity
                 from the above given user query and provide in the following json 
                 format. We have got only 5 cities in the database: {allowed_cities}.
-                Make sure to consider city full names.
+                Make sure to consider city full names. If the user wants to visit
+                more cities on the way, list them as stops.
 
                 Note: check message history for existing entities.
                 """
 
+    @staticmethod
+    def get_tour_constraint_update_prompt(
+        user_query: str, current_constraints: dict, allowed_cities: list
+    ) -> str:
+        return f"""
+                INPUT:
+                user query : {user_query}
+                current constraints: {current_constraints}
+
+                Role: You are an AI assistant to update the tour constraints from the
+                above given user query and provide in the following json format.
+                Only fill the fields the user query sets or changes and leave the rest
+                as null. We have got only 5 cities in the database: {allowed_cities}.
+                Make sure to consider city full names.
+                """
+
     @staticmethod
     def get_missing_constraints_prompt(
         missing_constraints: list, allowed_cities: list
@@ -33,19 +50,29 @@ class AIPrompts:
     def get_planning_prompt(
         user_query: str,
         metadata: dict,
-        attractions: list,
-        travel: list,
-        hotels: list,
+        attractions: str,
+        travel: str,
+        hotels: str,
+        route: bool = False,
     ) -> str:
+        """The data sections are the packed, one-record-per-line context."""
+        stops = metadata.get("stops") or []
+        via = f" via {', '.join(stops)}" if stops else ""
+        travel_label = "Route (computed, follow it as given)" if route else "Travel Info"
         return f"""
-            You are an expert tour planner. Create a {metadata["days"]}-day tour plan from {metadata["from_city"]} to {metadata["to_city"]}. 
+            You are an expert tour planner. Create a {metadata["days"]}-day tour plan from {metadata["from_city"]} to {metadata["to_city"]}{via}. 
             
             USER QUERY: {user_query}
             
             DATA:
-            - Attractions: {attractions}
-            - Travel Info: {travel}
-            - Hotels: {hotels}
+            Attractions:
+            {attractions}
+
+            {travel_label}:
+            {travel}
+
+            Hotels:
+            {hotels}
 
             INSTRUCTIONS:
             1. {metadata["days"]}-day itinerary.
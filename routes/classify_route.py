@@ -1,10 +1,14 @@
+import json
 import time
 
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
 from workflow.state import GraphState
 from workflow.graph import graph
 from langchain_core.runnables import RunnableConfig
+from redis.asyncio.lock import Lock
+from redis.exceptions import LockError
 from utils.logger import logger
 from models.models import User
 from services.classify_services import ClassifyService
@@ -13,15 +17,80 @@ from services.redis_service import RedisService
 from dependencies.dependency import (
     get_redis_service,
     get_graph_config,
+    require_ready,
 )
 
-router = APIRouter(prefix="/api/user-{userid}/classify", tags=["classification"])
+router = APIRouter(
+    prefix="/api/user-{userid}/classify",
+    tags=["classification"],
+    dependencies=[Depends(require_ready)],
+)
 
 
 class UserQuery(BaseModel):
     user_query: str = Field(
         ..., description="Enter the query for the intent classification"
     )
+    regenerate: bool = Field(
+        False, description="Skip the cached tour plan and generate a new one"
+    )
+
+
+async def _acquire_session_lock(redis_service: RedisService, userid: int) -> Lock:
+    lock = redis_service.session_lock(userid)
+    if not await lock.acquire():
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Another request for this session is still running. Retry shortly.",
+        )
+    return lock
+
+
+async def _release_session_lock(lock: Lock):
+    try:
+        await lock.release()
+    except LockError:
+        logger.warning("Session lock expired before the turn finished")
+
+
+class _SessionStreamingResponse(StreamingResponse):
+    """
+    Releases the session lock once the response is over, however it ends. The
+    body generator cannot do it: when the client disconnects before the first
+    chunk, it is never started, so its finally never runs.
+    """
+
+    def __init__(self, content, lock: Lock, **kwargs):
+        super().__init__(content, **kwargs)
+        self.lock = lock
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            await _release_session_lock(self.lock)
+
+
+async def _prepare_graph_inputs(
+    userid: int, query: UserQuery, redis_service: RedisService, config: dict
+) -> dict:
+    session_id = f"session_{userid}"
+
+    # Get existing state from Redis
+    redis_response = await redis_service.get_redis(userid)
+
+    # Add thread_id to the config derived from dependency
+    config["configurable"]["thread_id"] = session_id
+
+    return {
+        "user_id": userid,
+        "user_query": query.user_query.lower(),
+        "regenerate": query.regenerate,
+        "messages": redis_response.get("messages"),
+        "history": redis_response.get("history"),
+        "title": redis_response.get("title"),
+        "constraints": redis_response.get("constraints"),
+    }
 
 
 @router.post("")
@@ -34,40 +103,127 @@ async def classify_user_query(
     """
     This starts the graph execution and returns the result.
     """
-    session_id = f"session_{userid}"
-    user_query = query.user_query
     start_time = time.time()
+    lock = await _acquire_session_lock(redis_service, userid)
+    try:
+        inputs = await _prepare_graph_inputs(userid, query, redis_service, config)
+        # Nodes append to the loaded list in place, so count it before the run
+        history_len = len(inputs["messages"])
 
-    # Get existing state from Redis
-    redis_response = await redis_service.get_redis(userid)
-    messages = redis_response.get("messages")
-    title = redis_response.get("title")
-
-    # Add thread_id to the config derived from dependency
-    config["configurable"]["thread_id"] = session_id
+        # Run the graph
+        result = await graph.ainvoke(inputs, config=config)
+        final_title = result.get("title") or inputs["title"]
+        response = result.get("response")
 
-    # Run the graph
-    inputs = {
-        "user_id": userid,
-        "user_query": user_query.lower(),
-        "messages": messages,
-        "title": title,
-    }
-    result = await graph.ainvoke(inputs, config=config)
-    final_title = result.get("title") or title
-    response = result.get("response")
-
-    if response:
-        # before setting a key to redis check whether N messages exceeds or not
-        await redis_service.set_redis(userid=userid, result=result, title=final_title)
-        updated_list_of_messages = result.get("messages")
-        logger.info(f"Count of messages ----> {len(updated_list_of_messages)}")
-        end_time = time.time()
-        logger.info(f"Time taken ----> {end_time - start_time}")
-        return result.get("response")
+        if response:
+            # Only this turn's messages are appended; redis trims to N messages
+            await redis_service.set_redis(
+                userid=userid, result=result, title=final_title, history_len=history_len
+            )
+            updated_list_of_messages = result.get("messages")
+            logger.info(f"Count of messages ----> {len(updated_list_of_messages)}")
+            end_time = time.time()
+            logger.info(f"Time taken ----> {end_time - start_time}")
+            return result.get("response")
+    finally:
+        await _release_session_lock(lock)
 
     logger.error("No result from the graph")
     raise HTTPException(
         status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
         detail="I am unable to answer at the moment. Please try again later.",
     )
+
+
+def _sse(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+@router.post("/stream")
+async def classify_user_query_stream(
+    userid: int,
+    query: UserQuery,
+    redis_service: RedisService = Depends(get_redis_service),
+    config: dict = Depends(get_graph_config),
+):
+    """
+    Streaming variant of the classify endpoint (server-sent events).
+
+    Emits `intent` as soon as the query is routed, `token` events while the
+    policy answer is generated, `day_plan` events as each day of a tour plan is
+    completed, then `done` with the full response once the session is saved.
+    """
+    start_time = time.time()
+    # The planner only streams day plans when asked to; /classify does not
+    config = {
+        **config,
+        "configurable": {**config["configurable"], "stream_day_plans": True},
+    }
+    lock = await _acquire_session_lock(redis_service, userid)
+    try:
+        inputs = await _prepare_graph_inputs(userid, query, redis_service, config)
+    except Exception:
+        await _release_session_lock(lock)
+        raise
+    history_len = len(inputs["messages"])
+
+    async def event_stream():
+        first_event_logged = False
+        state = dict(inputs)
+        try:
+            async for mode, chunk in graph.astream(
+                inputs, config=config, stream_mode=["updates", "messages", "custom"]
+            ):
+                event = None
+                if mode == "updates":
+                    for node, update in chunk.items():
+                        state.update(update or {})
+                        if node == "classify":
+                            event = _sse(
+                                "intent",
+                                {
+                                    "intent": update.get("intent"),
+                                    "path": update.get("intent_path"),
+                                },
+                            )
+                elif mode == "messages":
+                    message_chunk, metadata = chunk
+                    content = getattr(message_chunk, "content", None)
+                    from_policy = metadata.get("langgraph_node") == "policy"
+                    if from_policy and isinstance(content, str) and content:
+                        event = _sse("token", {"content": content})
+                elif mode == "custom":
+                    event = _sse(chunk["event"], chunk["data"])
+
+                if event:
+                    if not first_event_logged:
+                        first_event_logged = True
+                        logger.info(
+                            f"Time to first event ----> {time.time() - start_time}"
+                        )
+                    yield event
+        except Exception as e:
+            logger.error(f"Streaming graph run failed: {e}")
+            yield _sse("error", {"detail": "I am unable to answer at the moment."})
+            return
+
+        response = state.get("response")
+        if not response:
+            logger.error("No result from the graph")
+            yield _sse("error", {"detail": "I am unable to answer at the moment."})
+            return
+
+        # Persist the session once the whole turn has been generated
+        final_title = state.get("title") or inputs["title"]
+        await redis_service.set_redis(
+            userid=userid, result=state, title=final_title, history_len=history_len
+        )
+        logger.info(f"Time taken ----> {time.time() - start_time}")
+        yield _sse("done", {"response": response})
+
+    return _SessionStreamingResponse(
+        event_stream(),
+        lock,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
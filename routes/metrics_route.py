@@ -0,0 +1,86 @@
+from fastapi import APIRouter, Depends, Request
+
+from services.query_embedding_cache import query_embedding_cache
+from services.model_registry import model_registry
+from services.ranking_service import RankingService
+from services.semantic_cache_service import SemanticCacheService
+from services.classify_services import ClassifyService
+from services.plan_cache_service import PlanCacheService
+from services.redis_service import RedisService
+from dependencies.dependency import get_access_admin, get_redis_service
+
+router = APIRouter(
+    prefix="/admin/metrics",
+    tags=["metrics"],
+    dependencies=[Depends(get_access_admin)],
+)
+
+
+@router.get("/embedding-cache")
+async def embedding_cache_metrics():
+    """
+    Hit/miss counters for the in-process LRU and Redis embedding cache tiers,
+    plus how many lookups were coalesced onto an in-flight computation.
+    """
+    return query_embedding_cache.stats()
+
+
+@router.get("/embedding-batching")
+async def embedding_batching_metrics(request: Request):
+    """
+    Queue depth and batch-size distribution of the dense/sparse embedding batchers.
+    """
+    batchers = request.app.state.embedding_batchers
+    return {name: batcher.stats() for name, batcher in batchers.items()}
+
+
+@router.get("/models")
+async def model_metrics():
+    """
+    Load state, load time and RSS growth per model, plus the current process RSS.
+    """
+    return model_registry.stats()
+
+
+@router.get("/reranking")
+async def reranking_metrics():
+    """
+    Cross-encoder score cache hits/misses and how often the cascade skipped it.
+    """
+    return RankingService.stats()
+
+
+@router.get("/semantic-cache")
+async def semantic_cache_metrics():
+    """
+    Hit rate, stores and evictions of the semantic answer cache.
+    """
+    return SemanticCacheService.stats()
+
+
+@router.get("/intent-router")
+async def intent_router_metrics():
+    """
+    How often the local classifier bypassed the LLM and the latency it saved.
+    """
+    return ClassifyService.stats()
+
+
+@router.get("/plan-cache")
+async def plan_cache_metrics():
+    """
+    Hit rate of the memoized tour plans and how often users asked to regenerate.
+    """
+    return PlanCacheService.stats()
+
+
+@router.get("/redis-memory")
+async def redis_memory_metrics(
+    sample_size: int = 200,
+    redis_service: RedisService = Depends(get_redis_service),
+):
+    """
+    Key counts, sampled memory distribution and TTL coverage per key family
+    (sessions, embeddings, caches), plus the server's memory totals.
+    """
+    return await redis_service.memory_report(sample_size=sample_size)
@@ -1,34 +1,87 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, status
 from dependencies.dependency import (
+    get_bulk_ingestion,
     get_ingest_document,
     get_access_admin,
-    get_pinecone_service,
+    require_ready,
 )
+from services.bulk_ingestion_service import BulkIngestionService
 from services.document_ingestion_service import IngestDocumentService
-from services.pinecone_service import PineconeService
+from config import settings
+from services.ingestion_jobs import ingestion_jobs
 import os
 
-router = APIRouter(prefix="/admin", tags=["vector store"])
+router = APIRouter(
+    prefix="/admin", tags=["vector store"], dependencies=[Depends(require_ready)]
+)
 
 
-@router.post("/ingest-file")
+@router.post("/ingest-file", status_code=status.HTTP_202_ACCEPTED)
 async def ingest_file(
     file: UploadFile = File(...),
     ingest_service: IngestDocumentService = Depends(get_ingest_document),
 ):
+    """
+    Ingests the file as a background job that parses it as it streams, so a
+    malformed file fails the job; poll the returned job id on
+    /admin/ingest-jobs/{job_id}.
+    """
     try:
-        chunks = await ingest_service.upsert_documents(file)
-        return {"message": "Ingestion successful", "chunks": chunks}
+        job = await ingest_service.start_ingestion_job(file)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+    return {"message": "Ingestion started", **job.to_dict()}
+
+
+@router.post("/ingest-directory", status_code=status.HTTP_202_ACCEPTED)
+async def ingest_directory(
+    path: str = "",
+    bulk_service: BulkIngestionService = Depends(get_bulk_ingestion),
+):
+    """
+    Ingests every .json/.txt file under a directory, or listed in a manifest
+    file, as one background job. path is relative to BULK_INGEST_ROOT; poll
+    /admin/ingest-jobs/{job_id} for progress and per-stage throughput.
+    """
+    root = os.path.realpath(settings.BULK_INGEST_ROOT)
+    target = os.path.realpath(os.path.join(root, path))
+    if os.path.commonpath([root, target]) != root:
+        raise HTTPException(status_code=400, detail="Path is outside the ingest root")
+    try:
+        job = await bulk_service.start_job(target)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"message": "Bulk ingestion started", **job.to_dict()}
+
+
+@router.get("/ingest-jobs")
+async def list_ingest_jobs():
+    """
+    Recent ingestion jobs of every worker, newest first.
+    """
+    return await ingestion_jobs.list()
+
+
+@router.get("/ingest-jobs/{job_id}")
+async def get_ingest_job(job_id: str):
+    """
+    Progress, throughput (chunks/s) and failures of an ingestion job.
+    """
+    job = await ingestion_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Ingestion job not found")
+    return job
 
 
 @router.post("/delete-index")
 async def delete_index(
-    pinecone_service: PineconeService = Depends(get_pinecone_service),
+    ingest_service: IngestDocumentService = Depends(get_ingest_document),
 ):
     """
-    Delele the index and create the new one
+    Delele the index and create the new one (the active VECTOR_BACKEND's). The
+    chunk manifest and lookup store are cleared too, so files re-ingest in full.
     """
-    pinecone_service.delete_index()
+    await ingest_service.reset_index()
     return {"message": "Index deleted successfully"}
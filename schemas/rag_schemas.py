@@ -29,3 +29,6 @@ class TourConstraints(BaseModel):
     days: int | None = None
     from_city: str | None = None
     to_city: str | None = None
+    stops: List[str] | None = Field(
+        None, description="Other cities to visit on the way, if the user asks for any"
+    )
@@ -0,0 +1,54 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any
+
+from config import settings
+
+
+class AsyncIndexService:
+    """
+    Async facade over a blocking index handle (Pinecone or local).
+
+    query/upsert run in a bounded thread pool so the event loop keeps serving
+    other requests while retrieval is in flight, and concurrent searches (e.g.
+    the planner's asyncio.gather) actually overlap. The pool size is the
+    concurrency limit; the Pinecone handle is created with a matching HTTP
+    connection pool so every worker thread gets its own pooled connection.
+    """
+
+    def __init__(self, index: Any, max_concurrency: int = None):
+        self.index = index
+        self.max_concurrency = max_concurrency or settings.RETRIEVAL_MAX_CONCURRENCY
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_concurrency, thread_name_prefix="retrieval"
+        )
+
+    async def _run(self, fn, **kwargs):
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(self._executor, partial(fn, **kwargs))
+
+    async def query(self, **kwargs):
+        return await self._run(self.index.query, **kwargs)
+
+    async def upsert(self, **kwargs):
+        return await self._run(self.index.upsert, **kwargs)
+
+    async def delete(self, **kwargs):
+        return await self._run(self.index.delete, **kwargs)
+
+    async def flush(self):
+        """Persists a local index's pending writes; Pinecone writes through."""
+        flush = getattr(self.index, "flush", None)
+        if flush is not None:
+            await self._run(flush)
+
+    def __getattr__(self, name: str):
+        # Anything else (describe_index_stats, ...) goes straight to the handle
+        return getattr(self.index, name)
+
+    def close(self):
+        flush = getattr(self.index, "flush", None)
+        if flush is not None:
+            flush()
+        self._executor.shutdown(wait=False)
@@ -4,7 +4,7 @@ from langchain_pinecone import PineconeVectorStore
 from utils.logger import logger
 from services.embedding_service import EmbeddingService
 from services.redis_service import RedisService
-from pinecone_text.sparse import SpladeEncoder
+from services.query_embedding_cache import query_embedding_cache
 
 
 class BaseRagService(ABC):
@@ -22,32 +22,23 @@ class BaseRagService(ABC):
         self.ranking_service = ranking_service
         self.redis_service = redis_service
 
+    async def get_query_embeddings(self, query: str) -> dict:
+        """Dense + sparse query embeddings via LRU -> Redis -> single-flight compute."""
+        return await query_embedding_cache.get_or_compute(
+            query, self.redis_service, self.embedding_service.get_query_embeddings_async
+        )
+
     async def hybrid_search(self, query: str, k: int = 3, filter: dict = None):
         """Common similarity search logic."""
-        # Check Cache
-        cached_data = await self.redis_service.get_emb_cache(query)
-
-        if cached_data:
-            logger.info("Embedding CACHE HIT")
-            dense_embedding = cached_data.get("dense")
-            sparse_embedding = cached_data.get("sparse")
-        else:
-            logger.info("Embedding CACHE MISS -> Generating")
-            dense_embedding = await self.embedding_service.get_embedding_async(query)
-            sparse_embedding = await self.embedding_service.get_sparse_embedding_async(
-                query
-            )
-            embedding_vector = {
-                "dense": dense_embedding,
-                "sparse": sparse_embedding,
-            }
-            # Store in Cache
-            await self.redis_service.set_emb_cache(query, embedding_vector)
+        embeddings = await self.get_query_embeddings(query)
+        dense_embedding = embeddings.get("dense")
+        sparse_embedding = embeddings.get("sparse")
 
-        result = self.pc_index.query(
+        result = await self.pc_index.query(
             top_k=k,
             vector=dense_embedding,
             sparse_vector=sparse_embedding,
+            filter=filter,
             include_values=False,
             include_metadata=True,
         )
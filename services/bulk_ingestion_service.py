@@ -0,0 +1,316 @@
+import asyncio
+import multiprocessing
+import os
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List
+
+from langchain_core.documents import Document
+
+from config import settings
+from services.document_ingestion_service import DocumentProcessor, IngestDocumentService
+from services.ingestion_jobs import IngestionJob, ingestion_jobs
+from utils.logger import logger
+
+SUPPORTED_EXTENSIONS = (".json", ".txt")
+
+
+def parse_file(path: str) -> List[Document]:
+    """Parses and chunks one file; runs in a worker process."""
+    filename = os.path.basename(path)
+    with open(path, "rb") as stream:
+        if filename.endswith(".json"):
+            return list(DocumentProcessor.iter_json(stream, filename))
+        return list(DocumentProcessor.iter_txt(stream, filename))
+
+
+def discover_files(path: str) -> List[str]:
+    """
+    The .json/.txt files under a directory, or the files listed in a manifest
+    (one path per line, relative to the manifest; # starts a comment).
+    """
+    if os.path.isdir(path):
+        files = [
+            os.path.join(root, name)
+            for root, _, names in os.walk(path)
+            for name in names
+        ]
+    else:
+        base = os.path.dirname(path)
+        with open(path, encoding="utf-8") as f:
+            lines = [line.strip() for line in f]
+        files = [
+            os.path.join(base, line)
+            for line in lines
+            if line and not line.startswith("#")
+        ]
+    files = sorted(f for f in files if f.endswith(SUPPORTED_EXTENSIONS))
+
+    # Chunk ids and the manifest are keyed by file name, not path
+    duplicates = [
+        name
+        for name, count in Counter(os.path.basename(f) for f in files).items()
+        if count > 1
+    ]
+    if duplicates:
+        raise ValueError(f"Duplicate file names: {', '.join(sorted(duplicates))}")
+    if not files:
+        raise ValueError(f"No .json or .txt files found in {path}")
+    return files
+
+
+class FileState:
+    """What a bulk run tracks per file until the file is reconciled."""
+
+    def __init__(self, filename: str, previous: Dict[str, str]):
+        self.filename = filename
+        self.previous = previous
+        # Manifest ids the file has not produced (yet)
+        self.orphans = set(previous)
+        self.lookup_records = []
+        self.doc_types = set()
+        self.upserted = 0
+        self.parsed = False
+
+
+class BulkIngestionService:
+    """
+    Ingests every file of a directory or manifest in one pipeline, for cold
+    index rebuilds:
+
+    - parse: worker processes parse and chunk files in parallel. Files of at
+      least BULK_STREAM_MIN_BYTES are streamed in this process instead, so
+      memory stays bounded.
+    - encode: one batched encoder shared by all files, so small files still
+      fill INGEST_BATCH_SIZE batches.
+    - upsert: up to BULK_UPSERT_CONCURRENCY upserts in flight.
+
+    Stages are joined by a bounded queue. Each file is diffed against the chunk
+    manifest like a single upload, and its orphans are deleted at the end.
+    Per-stage throughput is recorded on the job.
+    """
+
+    def __init__(
+        self,
+        ingest_service: IngestDocumentService,
+        workers: int = None,
+        upsert_concurrency: int = None,
+    ):
+        self.ingest_service = ingest_service
+        self.workers = workers or settings.BULK_INGEST_WORKERS
+        self.upsert_concurrency = (
+            upsert_concurrency or settings.BULK_UPSERT_CONCURRENCY
+        )
+        self.batch_size = settings.INGEST_BATCH_SIZE
+
+    async def start_job(self, path: str) -> IngestionJob:
+        """Runs ingest() in the background; raises ValueError for a bad path."""
+        if not os.path.exists(path):
+            raise ValueError(f"{path} does not exist")
+        files = discover_files(path)
+        job = ingestion_jobs.create(path)
+        await ingestion_jobs.run(job, self._run_job(files, job))
+        return job
+
+    async def _run_job(self, files: List[str], job: IngestionJob):
+        try:
+            await self.ingest(files, job)
+        except Exception as e:
+            logger.error(f"Bulk ingestion job {job.job_id} failed: {e}")
+            job.finish(error=e)
+        finally:
+            # One write of the local index for the whole run
+            await self.ingest_service.pc_index.flush()
+
+    async def ingest(self, files: List[str], job: IngestionJob = None) -> IngestionJob:
+        job = job or IngestionJob(os.path.commonpath(files))
+        job.start()
+        logger.info(
+            f"Bulk ingestion of {len(files)} files ----> {self.workers} parse workers, "
+            f"{self.upsert_concurrency} concurrent upserts"
+        )
+
+        if self.ingest_service.manifest:
+            await self.ingest_service.verify_manifest()
+        states: Dict[str, FileState] = {}
+        queue = asyncio.Queue(maxsize=self.batch_size * 4)
+        # Spawned, so workers do not inherit loaded models and thread pools
+        pool = ProcessPoolExecutor(
+            self.workers, mp_context=multiprocessing.get_context("spawn")
+        )
+        parse_slots = asyncio.Semaphore(self.workers)
+        producers = [
+            asyncio.create_task(
+                self._parse(path, pool, parse_slots, queue, states, job)
+            )
+            for path in files
+        ]
+        consumer = asyncio.create_task(self._encode_and_upsert(queue, states, job))
+
+        async def parse_all():
+            results = await asyncio.gather(*producers, return_exceptions=True)
+            await queue.put(None)
+            return results
+
+        try:
+            # A failing consumer cancels the producers instead of leaving them
+            # blocked on a full queue
+            results, _ = await asyncio.gather(parse_all(), consumer)
+        finally:
+            for task in producers + [consumer]:
+                task.cancel()
+            await asyncio.to_thread(pool.shutdown, wait=True, cancel_futures=True)
+
+        for path, result in zip(files, results):
+            if isinstance(result, Exception):
+                logger.error(f"Failed to parse {path}: {result}")
+                job.errors.append(f"{os.path.basename(path)}: {result}")
+        job.parsed()
+
+        doc_types = set()
+        for state in states.values():
+            if not state.parsed:
+                continue
+            deleted = await self.ingest_service._reconcile_file(
+                state.filename,
+                state.orphans,
+                state.lookup_records,
+                job,
+            )
+            if state.upserted or deleted:
+                doc_types |= state.doc_types
+        await self.ingest_service._invalidate_caches(doc_types)
+
+        job.finish()
+        logger.info(
+            f"Bulk ingestion ----> {job.processed_chunks} upserted, "
+            f"{job.skipped_chunks} unchanged, {job.deleted_chunks} deleted, "
+            f"{job.failed_chunks} failed in {job.finished_at - job.started_at:.1f}s"
+        )
+        return job
+
+    async def _parse(
+        self,
+        path: str,
+        pool: ProcessPoolExecutor,
+        slots: asyncio.Semaphore,
+        queue: asyncio.Queue,
+        states: Dict[str, FileState],
+        job: IngestionJob,
+    ):
+        service = self.ingest_service
+        async with slots:
+            filename = os.path.basename(path)
+            previous = {}
+            if service.manifest:
+                previous = await asyncio.to_thread(service.manifest.load, filename)
+            state = states[filename] = FileState(filename, previous)
+
+            if os.path.getsize(path) < settings.BULK_STREAM_MIN_BYTES:
+                started = time.time()
+                documents = await asyncio.get_running_loop().run_in_executor(
+                    pool, parse_file, path
+                )
+                job.record_stage("parse", len(documents), started, time.time())
+                await self._enqueue(documents, state, queue, job)
+            else:
+                with open(path, "rb") as stream:
+                    batches = service._iter_batches(
+                        service.iter_documents(stream, filename), self.batch_size
+                    )
+                    while True:
+                        started = time.time()
+                        batch = await anext(batches, None)
+                        if batch is None:
+                            break
+                        job.record_stage("parse", len(batch), started, time.time())
+                        await self._enqueue(batch, state, queue, job)
+            state.parsed = True
+
+    async def _enqueue(
+        self,
+        documents: List[Document],
+        state: FileState,
+        queue: asyncio.Queue,
+        job: IngestionJob,
+    ):
+        """Queues the chunks that are new or changed since the last ingestion."""
+        service = self.ingest_service
+        job.record_parsed(len(documents))
+        skipped = 0
+        for doc in documents:
+            chunk_id = service._chunk_id(doc)
+            state.orphans.discard(chunk_id)
+            state.doc_types.add(doc.metadata.get("type"))
+            state.lookup_records = service._collect_lookup(
+                state.lookup_records, doc, state.filename
+            )
+            content_hash = service._content_hash(doc)
+            if state.previous.get(chunk_id) == content_hash:
+                skipped += 1
+                continue
+            await queue.put((doc, (state.filename, content_hash)))
+        job.record_skipped(skipped)
+
+    async def _encode_and_upsert(
+        self, queue: asyncio.Queue, states: Dict[str, FileState], job: IngestionJob
+    ):
+        """
+        Encodes queued chunks in batches that may span files, and upserts each
+        batch while the next one is encoded (at most upsert_concurrency in flight).
+        """
+        service = self.ingest_service
+        slots = asyncio.Semaphore(self.upsert_concurrency)
+        upserts = set()
+        done = False
+        while not done:
+            item = await queue.get()
+            if item is None:
+                break
+            batch = [item]
+            while len(batch) < self.batch_size:
+                try:
+                    item = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    break
+                if item is None:
+                    done = True
+                    break
+                batch.append(item)
+
+            documents = [doc for doc, _ in batch]
+            started = time.time()
+            try:
+                vectors = await service._encode_batch(documents, job)
+            except Exception as e:
+                logger.error(f"Error encoding batch of {len(batch)} chunks: {e}")
+                job.record_failure(len(batch), e)
+                continue
+            job.record_stage("encode", len(batch), started, time.time())
+
+            rows = {service._chunk_id(doc): row for doc, row in batch}
+            await slots.acquire()
+            task = asyncio.create_task(self._upsert(vectors, rows, slots, states, job))
+            upserts.add(task)
+            task.add_done_callback(upserts.discard)
+        if upserts:
+            await asyncio.gather(*upserts)
+
+    async def _upsert(
+        self,
+        vectors: List[dict],
+        rows: dict,
+        slots: asyncio.Semaphore,
+        states: Dict[str, FileState],
+        job: IngestionJob,
+    ):
+        started = time.time()
+        try:
+            upserted = await self.ingest_service._upsert_batch(vectors, rows, job)
+        finally:
+            slots.release()
+        if upserted:
+            job.record_stage("upsert", upserted, started, time.time())
+            for filename, _ in rows.values():
+                states[filename].upserted += 1
@@ -0,0 +1,93 @@
+from typing import Dict, List
+
+from sqlalchemy.orm import sessionmaker
+
+from config import settings
+from database.database_setup import SessionLocal
+from models.models import ChunkManifest
+from utils.logger import logger
+
+
+def active_index_name() -> str:
+    """The vector index ingestion writes to, e.g. "local:data/local_index"."""
+    if settings.VECTOR_BACKEND == "local":
+        return f"local:{settings.LOCAL_INDEX_DIR}"
+    return f"pinecone:{settings.PINECONE_INDEX}"
+
+
+class ChunkManifestService:
+    """
+    Content hashes of the chunks currently in the vector index, per source file.
+
+    Ingestion diffs a re-uploaded file against it to upsert only new or changed
+    chunks and delete the ones the file no longer produces. Rows are scoped to
+    the index they were written to, so switching VECTOR_BACKEND starts from an
+    empty manifest. Methods are blocking and open their own session, since
+    ingestion jobs outlive the request.
+    """
+
+    def __init__(self, session_factory: sessionmaker = None, index_name: str = None):
+        self.session_factory = session_factory or SessionLocal
+        self.index_name = index_name or active_index_name()
+
+    def _rows(self, db):
+        return db.query(ChunkManifest).filter(
+            ChunkManifest.index_name == self.index_name
+        )
+
+    def load(self, filename: str) -> Dict[str, str]:
+        """chunk_id -> content_hash for every chunk of the file."""
+        with self.session_factory() as db:
+            rows = (
+                self._rows(db)
+                .filter(ChunkManifest.filename == filename)
+                .with_entities(ChunkManifest.chunk_id, ChunkManifest.content_hash)
+                .all()
+            )
+        return {chunk_id: content_hash for chunk_id, content_hash in rows}
+
+    def count(self) -> int:
+        """How many chunks the index should hold."""
+        with self.session_factory() as db:
+            return self._rows(db).count()
+
+    def apply(self, filename: str, upserted: Dict[str, str], deleted: List[str]):
+        """Records the chunks written to the index and drops the deleted ones."""
+        with self.session_factory() as db:
+            if deleted:
+                self._rows(db).filter(ChunkManifest.chunk_id.in_(deleted)).delete(
+                    synchronize_session=False
+                )
+
+            existing = {
+                row.chunk_id: row
+                for row in self._rows(db).filter(
+                    ChunkManifest.chunk_id.in_(list(upserted))
+                )
+            }
+            for chunk_id, content_hash in upserted.items():
+                row = existing.get(chunk_id)
+                if row is None:
+                    db.add(
+                        ChunkManifest(
+                            index_name=self.index_name,
+                            filename=filename,
+                            chunk_id=chunk_id,
+                            content_hash=content_hash,
+                        )
+                    )
+                else:
+                    row.filename = filename
+                    row.content_hash = content_hash
+            db.commit()
+        logger.info(
+            f"Chunk manifest for {filename}: "
+            f"{len(upserted)} written, {len(deleted)} deleted"
+        )
+
+    def clear(self):
+        """Forgets every chunk of the index, e.g. after the index is deleted."""
+        with self.session_factory() as db:
+            deleted = self._rows(db).delete(synchronize_session=False)
+            db.commit()
+        logger.info(f"Chunk manifest cleared for {self.index_name}: {deleted} rows")
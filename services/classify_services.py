@@ -1,6 +1,13 @@
+import time
+
 from utils.logger import logger
 from pydantic import BaseModel
 
+from config import settings
+from services.intent_classifier import LocalIntentClassifier
+from services.history_compactor import HistoryCompactor
+from utils.tokens import log_prompt_tokens
+
 
 class Intent(BaseModel):
     intent: str
@@ -9,14 +16,70 @@ class Intent(BaseModel):
 class ClassifyService:
     """
     Classifies the intent of the user query like policy, tour planning, booking or general inquiry
+    The local classifier answers when it is confident; otherwise the LLM decides.
     """
 
-    def __init__(self, llm):
+    _counters = {
+        "local": 0,
+        "llm": 0,
+        "local_latency_ms": 0.0,
+        "llm_latency_ms": 0.0,
+    }
+
+    def __init__(
+        self,
+        llm,
+        local_classifier: LocalIntentClassifier = None,
+        threshold: float = None,
+    ):
         self.llm = llm
+        self.local_classifier = local_classifier
+        self.threshold = threshold or settings.INTENT_CONFIDENCE_THRESHOLD
 
     async def classify(self, user_query, message_history):
+        decision = await self.classify_with_details(user_query, message_history)
+        return decision["intent"]
+
+    async def classify_with_details(self, user_query, message_history) -> dict:
+        """
+        Returns the intent with its confidence, the path that decided it
+        ("local" or "llm") and the time spent. message_history is the session's
+        compacted history lines.
+        """
+        start = time.perf_counter()
+        local_intent, confidence = None, None
+
+        if self.local_classifier:
+            local_intent, confidence = await self.local_classifier.predict(user_query)
+            # Without context a follow-up ("make it 3 days") can look like chitchat
+            needs_context = local_intent == "general" and bool(message_history)
+            if confidence >= self.threshold and not needs_context:
+                return self._record("local", local_intent, confidence, start)
+
+        intent = await self._classify_with_llm(user_query, message_history)
+        return self._record("llm", intent, confidence, start, local_intent)
+
+    def _record(
+        self, path: str, intent: str, confidence, start: float, local_intent=None
+    ) -> dict:
+        latency_ms = (time.perf_counter() - start) * 1000
+        self._counters[path] += 1
+        self._counters[f"{path}_latency_ms"] += latency_ms
+        decision = {
+            "intent": intent,
+            "confidence": round(confidence, 3) if confidence is not None else None,
+            "path": path,
+            "latency_ms": round(latency_ms, 1),
+        }
+        if local_intent:
+            decision["local_intent"] = local_intent
+        logger.info(f"classify service ----> {decision}")
+        return decision
+
+    async def _classify_with_llm(self, user_query, message_history) -> str:
         prompt = f"""
-            user message history: {message_history}
+            user message history:
+            {HistoryCompactor.render(message_history)}
             Help to classify the user intent for the given user query into policy, planning, booking or general.
             user query: {user_query}
             If the question is related to the company itself, company policies, cancellations, refunds, or terms of service then return policy
@@ -28,8 +91,23 @@ class ClassifyService:
             conversation for the certain intent especially tour planning.
             .
         """
+        log_prompt_tokens("classify", prompt)
         structured_llm = self.llm.with_structured_output(Intent)
         response = await structured_llm.ainvoke(prompt)
         intent = response.model_dump()
-        logger.info(f"classify service ----> {intent}")
         return intent["intent"]
+
+    @classmethod
+    def stats(cls) -> dict:
+        local, llm = cls._counters["local"], cls._counters["llm"]
+        avg_local = cls._counters["local_latency_ms"] / local if local else 0.0
+        avg_llm = cls._counters["llm_latency_ms"] / llm if llm else 0.0
+        return {
+            "local": local,
+            "llm": llm,
+            "llm_bypass_rate": round(local / (local + llm), 3) if local + llm else 0.0,
+            "avg_local_latency_ms": round(avg_local, 1),
+            "avg_llm_latency_ms": round(avg_llm, 1),
+            # Estimated from the average LLM-path latency observed so far
+            "estimated_latency_saved_ms": round(max(avg_llm - avg_local, 0) * local, 1),
+        }
@@ -0,0 +1,204 @@
+import difflib
+import re
+from typing import Dict, List, Optional, Tuple
+
+NUMBER_WORDS = {
+    "one": 1,
+    "two": 2,
+    "three": 3,
+    "four": 4,
+    "five": 5,
+    "six": 6,
+    "seven": 7,
+    "eight": 8,
+    "nine": 9,
+    "ten": 10,
+    "eleven": 11,
+    "twelve": 12,
+    "thirteen": 13,
+    "fourteen": 14,
+    "a": 1,
+    "an": 1,
+    "single": 1,
+}
+FIXED_DURATIONS = {"weekend": 2, "week": 7, "fortnight": 14}
+CITY_ALIASES = {"ktm": "kathmandu", "pkr": "pokhara"}
+
+FROM_MARKERS = {"from", "leaving", "departing", "starting", "start"}
+TO_MARKERS = {
+    "to",
+    "in",
+    "visit",
+    "visiting",
+    "towards",
+    "toward",
+    "into",
+    "at",
+    "for",
+    "reach",
+    "explore",
+}
+FILLER_WORDS = {"the", "city", "of"}
+# "via chitwan", "a stop at chitwan", "chitwan on the way": the rules only read
+# the start and the destination, so stops are left to the LLM
+STOP_MARKERS = {"via", "through", "stop", "stops", "stopping", "stopover", "halt"}
+_ON_THE_WAY = ["on", "the", "way"]
+
+_DAYS_PATTERN = re.compile(
+    r"\b(\d{1,2}|" + "|".join(NUMBER_WORDS) + r")\s*(?:-|\s)?\s*(days?|nights?)\b"
+)
+_FIXED_PATTERN = re.compile(
+    r"\b(?:a\s+|one\s+)?(" + "|".join(FIXED_DURATIONS) + r")\b"
+)
+
+
+class ConstraintExtractor:
+    """
+    Rule-based extractor for the planner's TourConstraints (days, from_city, to_city).
+
+    Handles digits and number words, "N days"/"N nights" phrasing, misspelled
+    city names (fuzzy-matched against the allowed cities) and values stated in
+    earlier user turns. extract() reports whether it is confident; the caller
+    falls back to the LLM when it is not.
+    """
+
+    def __init__(self, allowed_cities: List[str], fuzzy_cutoff: float = 0.8):
+        self.allowed_cities = [c.lower() for c in allowed_cities]
+        self.fuzzy_cutoff = fuzzy_cutoff
+
+    def _match_city(self, token: str) -> Optional[str]:
+        if token in CITY_ALIASES:
+            return CITY_ALIASES[token]
+        if len(token) < 4:
+            return None
+        matches = difflib.get_close_matches(
+            token, self.allowed_cities, n=1, cutoff=self.fuzzy_cutoff
+        )
+        return matches[0] if matches else None
+
+    @staticmethod
+    def _tokenize(text: str) -> List[str]:
+        return re.findall(r"[a-z]+|\d+", text.lower())
+
+    def _extract_days(self, text: str) -> Tuple[Optional[int], bool]:
+        """Returns (days, ambiguous)."""
+        text = text.lower()
+        days, nights = set(), set()
+        for number, unit in _DAYS_PATTERN.findall(text):
+            value = int(number) if number.isdigit() else NUMBER_WORDS[number]
+            (nights if unit.startswith("night") else days).add(value)
+        for word in _FIXED_PATTERN.findall(text):
+            days.add(FIXED_DURATIONS[word])
+
+        if not days and not nights:
+            return None, False
+        if not days:
+            # "3 nights" is a 4-day trip
+            return (nights.pop() + 1, False) if len(nights) == 1 else (None, True)
+        # "3 days 2 nights" and "3 days 3 nights" state the same trip twice, so
+        # the stated day count wins; two day counts ("1 day in pokhara and 2
+        # days in chitwan") or nights that do not fit it are left to the LLM
+        if len(days) > 1:
+            return None, True
+        value = days.pop()
+        if not nights <= {value - 1, value}:
+            return None, True
+        return value, False
+
+    def _extract_cities(self, text: str) -> Tuple[Optional[str], Optional[str], bool]:
+        """
+        Returns (from_city, to_city, ambiguous). Two cities in the same role
+        ("to lumbini and visit chitwan") or a stop phrase leave the message to
+        the LLM, which can tell the destination from a stop on the way.
+        """
+        tokens = self._tokenize(text)
+        from_cities, to_cities, unmarked = set(), set(), []
+        stops = False
+
+        for i, token in enumerate(tokens):
+            city = self._match_city(token)
+            if not city:
+                continue
+
+            j = i - 1
+            while j >= 0 and tokens[j] in FILLER_WORDS:
+                j -= 1
+            prev = tokens[j] if j >= 0 else None
+
+            before_prev = tokens[j - 1] if j >= 1 else None
+            if (
+                prev in STOP_MARKERS
+                or (prev in TO_MARKERS and before_prev in STOP_MARKERS)
+                or tokens[i + 1 : i + 4] == _ON_THE_WAY
+            ):
+                stops = True
+            elif prev in FROM_MARKERS:
+                from_cities.add(city)
+            elif prev in TO_MARKERS:
+                to_cities.add(city)
+            else:
+                unmarked.append(city)
+
+        ambiguous = stops or len(from_cities) > 1 or len(to_cities) > 1
+        from_city = from_cities.pop() if len(from_cities) == 1 else None
+        to_city = to_cities.pop() if len(to_cities) == 1 else None
+        for city in unmarked:
+            if from_city is None and to_city is not None:
+                # "kathmandu to pokhara": the unmarked one is the origin
+                from_city = city
+            elif to_city is None and from_city is not None:
+                to_city = city
+            elif to_city is None and len(unmarked) == 1:
+                # A lone city is the destination ("3 days pokhara")
+                to_city = city
+            else:
+                ambiguous = True
+
+        if from_city and from_city == to_city:
+            ambiguous = True
+        return from_city, to_city, ambiguous
+
+    def _extract_message(self, text: str) -> Dict[str, Tuple[Optional[object], bool]]:
+        days, days_ambiguous = self._extract_days(text)
+        from_city, to_city, cities_ambiguous = self._extract_cities(text)
+        return {
+            "days": (days, days_ambiguous),
+            "from_city": (from_city, cities_ambiguous),
+            "to_city": (to_city, cities_ambiguous),
+        }
+
+    def extract(
+        self, user_query: str, message_history: list = None, previous: dict = None
+    ) -> Tuple[Dict[str, Optional[object]], bool]:
+        """
+        Returns (constraints, confident). When the constraints from earlier turns
+        are known, the new message only updates them; otherwise earlier user turns
+        are read oldest first and later mentions override them.
+        """
+        constraints = {"days": None, "from_city": None, "to_city": None}
+        if previous:
+            constraints.update({k: previous.get(k) for k in constraints})
+            texts = [user_query]
+        else:
+            texts = [
+                msg["content"]
+                for msg in message_history or []
+                if msg.get("role") == "user" and isinstance(msg.get("content"), str)
+            ]
+            texts.append(user_query)
+
+        ambiguous = {field: False for field in constraints}
+        for text in texts:
+            for field, (value, is_ambiguous) in self._extract_message(text).items():
+                if value is not None:
+                    constraints[field] = value
+                    ambiguous[field] = is_ambiguous
+                elif is_ambiguous:
+                    ambiguous[field] = True
+
+        confident = (
+            all(v is not None for v in constraints.values())
+            and not any(ambiguous.values())
+            and constraints["from_city"] != constraints["to_city"]
+        )
+        return constraints, confident
@@ -0,0 +1,117 @@
+import re
+from typing import Dict, List, Optional
+
+from config import settings
+from utils.logger import logger
+from utils.tokens import count_tokens
+
+# Fields worth showing the LLM per section; everything else (filename, type,
+# chunk_index, the flattened content dump) is bookkeeping
+SECTION_TEMPLATES = {
+    "attractions": "{text}",
+    "hotels": "{text}",
+    "travel": "{from_city} -> {to_city}: {text}",
+}
+
+# e.g. "hotel name -Meghauli Serai, hotel level-5, price per night - 160"
+_PAIR_PATTERN = re.compile(r"^\s*([a-z][a-z ]*?)\s*-(?!>)\s*(.+?)\s*$")
+
+
+class ContextPacker:
+    """
+    Packs retrieved records into compact prompt sections.
+
+    Each record is projected to its useful fields and near-identical records
+    (by word overlap) are dropped. Records sharing one "key - value" layout
+    become a table: a header row plus one row per record. Each section is cut
+    to a token budget, and pack() logs the tokens before and after packing.
+    """
+
+    def __init__(
+        self, section_token_budget: int = None, dedup_overlap: float = 0.9
+    ):
+        self.section_token_budget = (
+            section_token_budget or settings.CONTEXT_SECTION_TOKEN_BUDGET
+        )
+        self.dedup_overlap = dedup_overlap
+
+    @staticmethod
+    def _project(record, template: str) -> str:
+        if not isinstance(record, dict):
+            text = str(record)
+        else:
+            try:
+                text = template.format(**record)
+            except KeyError:
+                # Records ingested before "text" was kept only carry the dump
+                text = str(record.get("content", ""))
+        return " ".join(text.split())
+
+    def _dedup(self, lines: List[str]) -> List[str]:
+        kept, kept_words = [], []
+        for line in lines:
+            words = set(re.findall(r"[a-z0-9]+", line.lower()))
+            if any(
+                len(words & other) / max(len(words | other), 1) >= self.dedup_overlap
+                for other in kept_words
+            ):
+                continue
+            kept.append(line)
+            kept_words.append(words)
+        return kept
+
+    @staticmethod
+    def _parse_pairs(line: str) -> Optional[Dict[str, str]]:
+        pairs = {}
+        for part in line.split(","):
+            match = _PAIR_PATTERN.match(part)
+            if not match:
+                return None
+            pairs[match.group(1)] = match.group(2)
+        return pairs
+
+    def _tabulate(self, lines: List[str]) -> List[str]:
+        """Header plus rows when every line has the same keys, else the lines."""
+        parsed = [self._parse_pairs(line) for line in lines]
+        if len(lines) < 2 or any(p is None for p in parsed):
+            return lines
+        columns = list(parsed[0])
+        if any(list(p) != columns for p in parsed):
+            return lines
+        return [" | ".join(columns)] + [" | ".join(p.values()) for p in parsed]
+
+    def pack_section(self, section: str, records: list) -> str:
+        template = SECTION_TEMPLATES.get(section, "{text}")
+        lines = [self._project(r, template) for r in records]
+        lines = self._tabulate(self._dedup(lines))
+
+        packed, used = [], 0
+        for line in lines:
+            tokens = count_tokens(line)
+            if packed and used + tokens > self.section_token_budget:
+                break
+            packed.append(line)
+            used += tokens
+        if len(packed) < len(lines):
+            logger.info(f"Context packer dropped {len(lines) - len(packed)} {section}")
+        return "\n".join(packed) if packed else "none"
+
+    def pack(self, sections: Dict[str, list]) -> Dict[str, str]:
+        packed = {
+            name: self.pack_section(name, records) for name, records in sections.items()
+        }
+        # What the prompt used to carry: the flattened content of every record
+        before = count_tokens(
+            str(
+                [
+                    [r.get("content", r) if isinstance(r, dict) else r for r in records]
+                    for records in sections.values()
+                ]
+            )
+        )
+        after = count_tokens("\n".join(packed.values()))
+        logger.info(f"Context tokens ----> {before} before packing, {after} after")
+        return packed
+
+
+context_packer = ContextPacker()
@@ -1,125 +1,484 @@
+import asyncio
+import codecs
+import hashlib
+import io
 import json
+import os
 import re
-import uuid
-from typing import List
+import tempfile
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from typing import (
+    AsyncIterator,
+    BinaryIO,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+)
 from langchain_core.documents import Document
-from pinecone_text.sparse import SpladeEncoder
 from langchain_text_splitters import RecursiveCharacterTextSplitter
+from services.lookup_store import lookup_store
+from services.metadata_index import MetadataIndex
+from services.ingestion_jobs import IngestionJob, ingestion_jobs
+from services.chunk_manifest_service import ChunkManifestService
+from config import settings
+from services.model_registry import model_registry, SPLADE
+from utils.json_stream import iter_json_array
 from utils.logger import logger
 
-sparse_encoder = SpladeEncoder()
-
 
 class DocumentProcessor:
-    """Handles parsing of different file types into standard Document objects."""
+    """
+    Handles parsing of different file types into standard Document objects.
+
+    The iter_* parsers read a binary stream in blocks and yield Documents as
+    they go, so memory stays bounded whatever the file size.
+    """
 
     @staticmethod
-    def process_json(content_bytes: bytes, filename: str) -> List[Document]:
-        try:
-            data = json.loads(content_bytes)
-            # Ensure data is a list; if it's a single dict, wrap it
-            if isinstance(data, dict):
-                data = [data]
-
-            documents = []
-            for i, item in enumerate(data):
-                # Flatten dict to string
-                content_str = " ".join([f"{k}: {v}" for k, v in item.items()])
-                doc = Document(
-                    page_content=content_str,
-                    metadata={
-                        **item,
-                        "filename": filename,
-                        "chunk_index": i,
-                        "type": filename.replace(".json", ""),
-                    },
-                )
-                documents.append(doc)
-            return documents
-        except json.JSONDecodeError as e:
-            logger.error(f"Failed to parse JSON: {e}")
-            raise ValueError("Invalid JSON file")
+    def _json_document(item: dict, filename: str, index: int) -> Document:
+        # Flatten dict to string
+        content_str = " ".join([f"{k}: {v}" for k, v in item.items()])
+        return Document(
+            page_content=content_str,
+            metadata={
+                **item,
+                "filename": filename,
+                "chunk_index": index,
+                "type": filename.replace(".json", ""),
+                "content": content_str,
+            },
+        )
 
     @staticmethod
-    def process_txt(content_bytes: bytes, filename: str) -> List[Document]:
-        text = content_bytes.decode("utf-8")
-        # Clean whitespace
-        clean_text = re.sub(r"\s+", " ", text).strip()
+    def _txt_document(chunk: str, filename: str, index: int) -> Document:
+        return Document(
+            page_content=chunk,
+            metadata={
+                # Chunk ids and the manifest are both keyed by the real file name
+                "filename": filename,
+                "type": "policy",
+                "chunk_index": index,
+                "content": chunk,
+            },
+        )
 
-        # Chunk text
+    @classmethod
+    def iter_json(
+        cls, stream: BinaryIO, filename: str, read_size: int = None
+    ) -> Iterator[Document]:
+        items = iter_json_array(stream, read_size or settings.INGEST_READ_SIZE)
+        for i, item in enumerate(items):
+            if not isinstance(item, dict):
+                raise ValueError("Invalid JSON file: items must be objects")
+            yield cls._json_document(item, filename, i)
+
+    @classmethod
+    def iter_txt(
+        cls, stream: BinaryIO, filename: str, read_size: int = None
+    ) -> Iterator[Document]:
+        """
+        Splits the text a block at a time. The last chunk of each block is held
+        back and re-split with the next block, so chunks do not end at block
+        boundaries; a file smaller than one block is chunked exactly as before.
+        """
+        read_size = read_size or settings.INGEST_READ_SIZE
+        decode = codecs.getincrementaldecoder("utf-8")().decode
         text_splitter = RecursiveCharacterTextSplitter(
             chunk_size=500, chunk_overlap=200
         )
-        chunks = text_splitter.split_text(clean_text)
-
-        documents = []
-        for i, chunk in enumerate(chunks):
-            doc = Document(
-                page_content=chunk,
-                metadata={
-                    "filename": "company.txt",
-                    "type": "policy",
-                    "chunk_index": i,
-                    "content": chunk,
-                },
-            )
-            documents.append(doc)
-        return documents
+        buffer, index = "", 0
+        while True:
+            block = stream.read(read_size)
+            final = not block
+            # Clean whitespace
+            buffer = re.sub(r"\s+", " ", buffer + decode(block, final=final))
+            if not final and len(buffer) < read_size:
+                continue
+
+            trailing = " " if buffer.endswith(" ") else ""
+            chunks = text_splitter.split_text(buffer.strip())
+            buffer = ""
+            if not final and chunks:
+                # The last chunk ends at the block boundary, maybe mid-word
+                buffer = chunks.pop() + trailing
+            for chunk in chunks:
+                yield cls._txt_document(chunk, filename, index)
+                index += 1
+            if final:
+                return
+
+    @classmethod
+    def process_json(cls, content_bytes: bytes, filename: str) -> List[Document]:
+        return list(cls.iter_json(io.BytesIO(content_bytes), filename))
+
+    @classmethod
+    def process_txt(cls, content_bytes: bytes, filename: str) -> List[Document]:
+        return list(cls.iter_txt(io.BytesIO(content_bytes), filename))
 
 
 class IngestDocumentService:
-    def __init__(self, pc_index: str, emb_model, pc_service):
+    # Caches built from a document type, invalidated when it is re-ingested
+    CACHE_NAMESPACES_BY_TYPE = {
+        "policy": ["policy"],
+        "hotels": ["plans"],
+        "tour_attraction": ["plans"],
+        "travel_info": ["plans"],
+    }
+
+    # Dense and sparse encoders run side by side, off the event loop
+    _executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="ingest")
+
+    def __init__(
+        self,
+        pc_index: str,
+        emb_model,
+        pc_service,
+        redis_service=None,
+        manifest: ChunkManifestService = None,
+    ):
         self.pc_index = pc_index
         self.emb_model = emb_model
         self.pc_service = pc_service
+        self.redis_service = redis_service
+        self.manifest = manifest
         self.processor = DocumentProcessor()
 
-    async def _process_and_upsert(self, documents: List[Document], filename: str):
-        if not documents:
-            logger.warning(f"No documents parsed from {filename}")
-            return 0
+    async def _invalidate_caches(self, doc_types: set):
+        if not self.redis_service:
+            return
+        namespaces = {
+            ns
+            for doc_type in doc_types
+            for ns in self.CACHE_NAMESPACES_BY_TYPE.get(doc_type, [])
+        }
+        for namespace in namespaces:
+            version = await self.redis_service.bump_cache_version(namespace)
+            logger.info(f"Invalidated {namespace} caches (version {version})")
 
-        texts = [d.page_content for d in documents]
-        dense_vectors = self.emb_model.embed_documents(texts)
-        sparse_vectors = sparse_encoder.encode_documents(texts)
+    @staticmethod
+    def _chunk_id(doc: Document) -> str:
+        # Deterministic ID: filename_chunkIndex
+        return f"{doc.metadata['filename']}_{doc.metadata['chunk_index']}"
 
-        data_to_upsert = []
-        for doc, dv, sv in zip(documents, dense_vectors, sparse_vectors):
-            # Deterministic ID: filename_chunkIndex
-            doc_id = f"{doc.metadata['filename']}_{doc.metadata['chunk_index']}"
+    @staticmethod
+    def _text_hash(text: str) -> str:
+        return hashlib.sha256(text.encode()).hexdigest()
+
+    @staticmethod
+    def _content_hash(doc: Document) -> str:
+        """Changes when the chunk's text or anything stored with it changes."""
+        payload = json.dumps(
+            [doc.page_content, MetadataIndex.normalize(doc.metadata)],
+            sort_keys=True,
+            default=str,
+        )
+        return hashlib.sha256(payload.encode()).hexdigest()
 
-            data_to_upsert.append(
+    def _build_vectors(
+        self, documents: List[Document], dense_vectors, sparse_vectors
+    ) -> List[dict]:
+        vectors = []
+        for doc, dv, sv in zip(documents, dense_vectors, sparse_vectors):
+            vectors.append(
                 {
-                    "id": doc_id,
+                    "id": self._chunk_id(doc),
                     "values": dv,
                     "sparse_values": sv,
-                    "metadata": doc.metadata,
+                    # Normalize the filterable fields (city, type, ...) so the
+                    # metadata index built on upsert matches query filters exactly
+                    "metadata": MetadataIndex.normalize(doc.metadata),
                 }
             )
+        return vectors
+
+    @staticmethod
+    def _encode_sparse(texts: List[str]) -> list:
+        # Resolved in the worker thread: the first call may load SPLADE
+        return model_registry.get(SPLADE).encode_documents(texts)
+
+    async def _encode_texts(self, texts: List[str]) -> Dict[str, dict]:
+        """Dense and sparse encoding of the texts, overlapped in worker threads."""
+        loop = asyncio.get_running_loop()
+        dense_vectors, sparse_vectors = await asyncio.gather(
+            loop.run_in_executor(self._executor, self.emb_model.embed_documents, texts),
+            loop.run_in_executor(self._executor, self._encode_sparse, texts),
+        )
+        return {
+            self._text_hash(text): {"dense": list(dv), "sparse": sv}
+            for text, dv, sv in zip(texts, dense_vectors, sparse_vectors)
+        }
+
+    async def _encode_batch(
+        self, documents: List[Document], job: IngestionJob
+    ) -> List[dict]:
+        """Encodes one batch, reusing cached embeddings of texts seen before."""
+        hashes = [self._text_hash(d.page_content) for d in documents]
+        embeddings = {}
+        if self.redis_service:
+            embeddings = await self.redis_service.get_doc_emb_cache_many(
+                list(dict.fromkeys(hashes))
+            )
+
+        missing = list(
+            dict.fromkeys(
+                d.page_content for d, h in zip(documents, hashes) if h not in embeddings
+            )
+        )
+        if missing:
+            computed = await self._encode_texts(missing)
+            embeddings.update(computed)
+            if self.redis_service:
+                await self.redis_service.set_doc_emb_cache_many(computed)
+        job.record_reused(len(documents) - len(missing))
 
-        if not data_to_upsert:
+        return self._build_vectors(
+            documents,
+            [embeddings[h]["dense"] for h in hashes],
+            [embeddings[h]["sparse"] for h in hashes],
+        )
+
+    async def _upsert_batch(
+        self, vectors: List[dict], rows: Dict[str, Tuple[str, str]], job
+    ) -> int:
+        """rows maps each chunk id to its (filename, content hash) for the manifest."""
+        try:
+            await self.pc_index.upsert(vectors=vectors)
+        except Exception as e:
+            logger.error(f"Error upserting batch of {len(vectors)} vectors: {e}")
+            job.record_failure(len(vectors), e)
             return 0
+        if self.manifest:
+            # Recorded per batch, so a failed run keeps what it already wrote
+            by_file = defaultdict(dict)
+            for item in vectors:
+                filename, content_hash = rows[item["id"]]
+                by_file[filename][item["id"]] = content_hash
+            for filename, hashes in by_file.items():
+                await asyncio.to_thread(self.manifest.apply, filename, hashes, [])
+        job.record_batch(len(vectors))
+        return len(vectors)
+
+    @staticmethod
+    def _collect_lookup(records: list, doc: Document, filename: str) -> list:
+        """
+        Gathers the structured records for the lookup store. A file with more
+        than LOOKUP_STORE_MAX_RECORDS is left to vector search, so a large
+        catalog does not have to be held in memory (None from then on).
+        """
+        if records is None or not (
+            doc.metadata.get("city") or doc.metadata.get("from_city")
+        ):
+            return records
+        records.append(MetadataIndex.normalize(doc.metadata))
+        if len(records) > settings.LOOKUP_STORE_MAX_RECORDS:
+            logger.warning(
+                f"{filename} has over {settings.LOOKUP_STORE_MAX_RECORDS} "
+                "structured records; not keeping them in the lookup store"
+            )
+            return None
+        return records
+
+    @staticmethod
+    async def _iter_batches(
+        documents: Iterable[Document], batch_size: int
+    ) -> AsyncIterator[List[Document]]:
+        """Batches off a (possibly file-backed) document iterator, read in a thread."""
+        iterator = iter(documents)
+        while True:
+            batch = await asyncio.to_thread(lambda: list(islice(iterator, batch_size)))
+            if not batch:
+                return
+            yield batch
+
+    async def _process_and_upsert(
+        self, documents: Iterable[Document], filename: str, job: IngestionJob = None
+    ):
+        """
+        Brings the index in line with the file's chunks. Against the chunk manifest,
+        only new or changed chunks are encoded and upserted, and chunks the file no
+        longer produces are deleted.
+
+        documents may be a lazy parser: it is consumed in batches of
+        INGEST_BATCH_SIZE and the next batch is parsed and encoded while the
+        previous one is being upserted, so only a couple of batches are held in
+        memory. Batches that fail are recorded on the job and the rest carry on.
+        """
+        job = job or IngestionJob(filename)
+        job.start(len(documents) if isinstance(documents, list) else None)
+
+        previous = {}
+        if self.manifest:
+            await self.verify_manifest()
+            previous = await asyncio.to_thread(self.manifest.load, filename)
 
+        # Manifest ids the file has not produced (yet); what is left is orphaned
+        orphans = set(previous)
+        doc_types, lookup_records = set(), []
+        upserted, pending = 0, None
         try:
-            index_handle = self.pc_service.get_index()
-            index_handle.upsert(vectors=data_to_upsert)
-            logger.info(
-                f"Successfully upserted {len(data_to_upsert)} vectors for {filename}"
+            async for batch in self._iter_batches(
+                documents, settings.INGEST_BATCH_SIZE
+            ):
+                job.record_parsed(len(batch))
+                rows, changed = {}, []
+                for doc in batch:
+                    chunk_id = self._chunk_id(doc)
+                    orphans.discard(chunk_id)
+                    doc_types.add(doc.metadata.get("type"))
+                    lookup_records = self._collect_lookup(lookup_records, doc, filename)
+                    rows[chunk_id] = (filename, self._content_hash(doc))
+                    if previous.get(chunk_id) != rows[chunk_id][1]:
+                        changed.append(doc)
+                job.record_skipped(len(batch) - len(changed))
+                if not changed:
+                    continue
+
+                try:
+                    vectors = await self._encode_batch(changed, job)
+                except Exception as e:
+                    logger.error(f"Error encoding batch of {len(changed)} chunks: {e}")
+                    job.record_failure(len(changed), e)
+                    continue
+                if pending:
+                    upserted += await pending
+                pending = asyncio.create_task(
+                    self._upsert_batch(vectors, rows, job)
+                )
+        finally:
+            # Also when the parser fails mid-file: let the last upsert land
+            if pending:
+                upserted += await pending
+        job.parsed()
+
+        if not job.total_chunks:
+            logger.warning(f"No documents parsed from {filename}")
+            job.finish()
+            return 0
+
+        deleted = await self._reconcile_file(filename, orphans, lookup_records, job)
+        logger.info(
+            f"Ingested {filename}: {upserted} upserted, "
+            f"{job.skipped_chunks} unchanged, {len(deleted)} deleted"
+        )
+        if upserted or deleted:
+            await self._invalidate_caches(doc_types)
+        job.finish()
+        return upserted
+
+    async def _reconcile_file(
+        self,
+        filename: str,
+        orphans: Iterable[str],
+        lookup_records: Optional[list],
+        job: IngestionJob,
+    ) -> list:
+        """
+        Once a file is fully ingested: deletes its orphaned chunks and swaps in
+        its lookup records. Returns the ids deleted.
+        """
+        deleted = await self._delete_orphans(list(orphans), job)
+        if self.manifest and deleted:
+            await asyncio.to_thread(self.manifest.apply, filename, {}, deleted)
+        # Also for an unchanged file: the manifest outlives the container, the
+        # lookup store snapshot does not
+        await asyncio.to_thread(
+            lookup_store.replace_file, filename, lookup_records or []
+        )
+        return deleted
+
+    async def verify_manifest(self):
+        """
+        Forgets the chunk manifest when the index holds fewer vectors than it
+        records (e.g. a local index lost with its container), so files re-ingest
+        in full instead of skipping chunks the index no longer has.
+        """
+        recorded = await asyncio.to_thread(self.manifest.count)
+        if not recorded:
+            return
+        stats = await asyncio.to_thread(self.pc_index.describe_index_stats)
+        stored = stats["total_vector_count"]
+        if stored < recorded:
+            logger.warning(
+                f"Index holds {stored} vectors but the chunk manifest records "
+                f"{recorded}; clearing the manifest to re-ingest in full"
             )
-            return len(data_to_upsert)
+            await asyncio.to_thread(self.manifest.clear)
+
+    async def reset_index(self):
+        """
+        Empties the active index and forgets what was ingested into it (chunk
+        manifest, lookup store, derived caches), so every file re-ingests in full.
+        """
+        if settings.VECTOR_BACKEND == "local":
+            await self.pc_index.delete(delete_all=True)
+            await self.pc_index.flush()
+        else:
+            await asyncio.to_thread(self.pc_service.delete_index)
+            # Same pooled facade, new handle: the recreated index may have a new host
+            self.pc_index.index = self.pc_service.index
+        if self.manifest:
+            await asyncio.to_thread(self.manifest.clear)
+        await asyncio.to_thread(lookup_store.clear)
+        await self._invalidate_caches(set(self.CACHE_NAMESPACES_BY_TYPE))
+
+    async def _delete_orphans(self, chunk_ids: List[str], job: IngestionJob) -> list:
+        """Deletes chunks the file no longer produces; returns the ids deleted."""
+        if not chunk_ids:
+            return []
+        try:
+            await self.pc_index.delete(ids=chunk_ids)
         except Exception as e:
-            logger.error(f"Error upserting document: {e}")
-            raise
+            # They stay in the manifest, so the next run retries them
+            logger.error(f"Error deleting {len(chunk_ids)} orphaned chunks: {e}")
+            job.errors.append(str(e))
+            return []
+        job.record_deleted(len(chunk_ids))
+        return chunk_ids
+
+    def iter_documents(self, stream: BinaryIO, filename: str) -> Iterator[Document]:
+        if filename.endswith(".json"):
+            return self.processor.iter_json(stream, filename)
+        if filename.endswith(".txt"):
+            return self.processor.iter_txt(stream, filename)
+        raise ValueError("Unsupported file format. Use .json or .txt")
 
     async def upsert_documents(self, file) -> int:
-        content = await file.read()
         logger.info(f"Processing ingestion for file: {file.filename}")
+        documents = self.iter_documents(file.file, file.filename)
+        try:
+            return await self._process_and_upsert(documents, file.filename)
+        finally:
+            await self.pc_index.flush()
 
-        if file.filename.endswith(".json"):
-            documents = self.processor.process_json(content, file.filename)
-        elif file.filename.endswith(".txt"):
-            documents = self.processor.process_txt(content, file.filename)
-        else:
+    async def start_ingestion_job(self, file) -> IngestionJob:
+        """
+        Spools the upload to a temp file a block at a time and ingests it in the
+        background, streaming Documents off the file.
+        """
+        suffix = os.path.splitext(file.filename)[1]
+        if suffix not in (".json", ".txt"):
             raise ValueError("Unsupported file format. Use .json or .txt")
+        logger.info(f"Queuing ingestion job for file: {file.filename}")
+        with tempfile.NamedTemporaryFile(suffix=suffix, delete=False) as spool:
+            while block := await file.read(settings.INGEST_READ_SIZE):
+                await asyncio.to_thread(spool.write, block)
+        job = ingestion_jobs.create(file.filename)
+        await ingestion_jobs.run(job, self._run_job(spool.name, file.filename, job))
+        return job
 
-        return await self._process_and_upsert(documents, file.filename)
+    async def _run_job(self, path: str, filename: str, job: IngestionJob):
+        try:
+            with open(path, "rb") as stream:
+                documents = self.iter_documents(stream, filename)
+                await self._process_and_upsert(documents, filename, job)
+        except Exception as e:
+            logger.error(f"Ingestion job {job.job_id} failed: {e}")
+            job.finish(error=e)
+        finally:
+            os.remove(path)
+            await self.pc_index.flush()
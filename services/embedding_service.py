@@ -1,35 +1,88 @@
 from concurrent.futures import ThreadPoolExecutor
 import asyncio
-from langchain_huggingface import HuggingFaceEmbeddings
-from pinecone_text.sparse import SpladeEncoder
 
-splade_encoder = SpladeEncoder()
+from config import settings
+from services.micro_batcher import MicroBatcher
+from services.model_registry import model_registry, MPNET, SPLADE
 
 
 class EmbeddingService:
     """
     This service does the embedding in thread pool to avoid the blocking of the event loop.
+    When batchers are given, concurrent single-query calls are coalesced into one
+    batched forward pass instead of one pass per query.
     """
 
     _executor = ThreadPoolExecutor(max_workers=4)
 
-    def __init__(self, model):
-        self.model = model
+    def __init__(
+        self,
+        model=None,
+        dense_batcher: MicroBatcher = None,
+        sparse_batcher: MicroBatcher = None,
+    ):
+        self._model = model
+        self.dense_batcher = dense_batcher
+        self.sparse_batcher = sparse_batcher
+
+    @property
+    def model(self):
+        # Resolved from the shared registry; loads lazily in the calling thread
+        return self._model or model_registry.get(MPNET)
+
+    @staticmethod
+    def _embed_batch(texts: list) -> list:
+        return model_registry.get(MPNET).embed_documents(texts)
+
+    @staticmethod
+    def _encode_sparse_batch(texts: list) -> list:
+        return model_registry.get(SPLADE).encode_documents(texts)
+
+    @classmethod
+    def create_batchers(cls) -> dict:
+        """Process-wide batchers for the dense and sparse encoders (built in lifespan)."""
+        return {
+            "dense": MicroBatcher(
+                cls._embed_batch,
+                max_batch_size=settings.EMBED_BATCH_MAX_SIZE,
+                max_wait_ms=settings.EMBED_BATCH_WINDOW_MS,
+                executor=cls._executor,
+                name="dense_embedding",
+            ),
+            "sparse": MicroBatcher(
+                cls._encode_sparse_batch,
+                max_batch_size=settings.EMBED_BATCH_MAX_SIZE,
+                max_wait_ms=settings.EMBED_BATCH_WINDOW_MS,
+                executor=cls._executor,
+                name="sparse_embedding",
+            ),
+        }
 
     def get_embedding(self, text: str):
         return self.model.embed_query(text)
 
     async def get_embedding_async(self, text: str) -> list:
         """Asynchronous wrapper that runs in the thread pool"""
+        if self.dense_batcher:
+            return await self.dense_batcher.submit(text)
         loop = asyncio.get_event_loop()
         return await loop.run_in_executor(self._executor, self.get_embedding, text)
 
     def get_sparse_embedding(self, text: str):
-        return splade_encoder.encode_documents(text)
+        return model_registry.get(SPLADE).encode_documents(text)
 
     async def get_sparse_embedding_async(self, text: str) -> dict:
         """Asynchronous wrapper that runs in the thread pool"""
+        if self.sparse_batcher:
+            return await self.sparse_batcher.submit(text)
         loop = asyncio.get_event_loop()
         return await loop.run_in_executor(
             self._executor, self.get_sparse_embedding, text
         )
+
+    async def get_query_embeddings_async(self, text: str) -> dict:
+        """Dense and sparse embeddings of a query, in the shape the query cache stores."""
+        dense_embedding, sparse_embedding = await asyncio.gather(
+            self.get_embedding_async(text), self.get_sparse_embedding_async(text)
+        )
+        return {"dense": dense_embedding, "sparse": sparse_embedding}
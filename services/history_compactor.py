@@ -0,0 +1,59 @@
+import json
+from typing import List
+
+from config import settings
+from utils.tokens import count_tokens, truncate_to_tokens
+
+
+class HistoryCompactor:
+    """
+    Turns the session messages into short "role: text" lines for LLM prompts.
+
+    Assistant tour plans collapse to one line (title and number of days), long
+    messages are truncated, and the oldest lines are dropped once the history
+    is over the token budget. RedisService stores the compacted lines with the
+    session, so prompts reuse them instead of re-compacting every turn.
+    """
+
+    def __init__(self, token_budget: int = None, message_max_tokens: int = None):
+        self.token_budget = token_budget or settings.HISTORY_TOKEN_BUDGET
+        self.message_max_tokens = (
+            message_max_tokens or settings.HISTORY_MESSAGE_MAX_TOKENS
+        )
+
+    @staticmethod
+    def _summarize_content(content) -> str:
+        if not isinstance(content, dict):
+            return str(content)
+        if isinstance(content.get("response"), list):
+            # A TourPlan: the title carries the cities
+            title = content.get("title") or "Tour plan"
+            return f"[tour plan] {title}, {len(content['response'])} days"
+        if isinstance(content.get("response"), str):
+            return content["response"]
+        return json.dumps(content, default=str)
+
+    def compact_message(self, message: dict) -> str:
+        text = self._summarize_content(message.get("content"))
+        text = truncate_to_tokens(" ".join(text.split()), self.message_max_tokens)
+        return f"{message.get('role', 'user')}: {text}"
+
+    def compact(self, messages: List[dict]) -> List[str]:
+        """Newest compacted lines that fit in the token budget, oldest first."""
+        kept, used = [], 0
+        for message in reversed(messages or []):
+            line = self.compact_message(message)
+            tokens = count_tokens(line)
+            if used + tokens > self.token_budget:
+                break
+            kept.append(line)
+            used += tokens
+        kept.reverse()
+        return kept
+
+    @staticmethod
+    def render(lines: List[str]) -> str:
+        return "\n".join(lines) if lines else "none"
+
+
+history_compactor = HistoryCompactor()
@@ -0,0 +1,74 @@
+from config import settings
+from utils.logger import logger
+
+TORCH = "torch"
+INT8 = "int8"
+ONNX = "onnx"
+BACKENDS = (TORCH, INT8, ONNX)
+
+
+def _validate(backend: str) -> str:
+    backend = (backend or TORCH).lower()
+    if backend not in BACKENDS:
+        raise ValueError(
+            f"Unknown inference backend '{backend}'. Use one of {', '.join(BACKENDS)}"
+        )
+    return backend
+
+
+def _quantize_int8(module):
+    """Dynamic int8 quantization of every Linear layer, in place (CPU only)."""
+    import torch
+
+    torch.quantization.quantize_dynamic(
+        module, {torch.nn.Linear}, dtype=torch.qint8, inplace=True
+    )
+    return module
+
+
+def load_dense_model(backend: str = None, model_name: str = None):
+    """
+    all-mpnet-base-v2 behind the HuggingFaceEmbeddings interface.
+
+    onnx needs sentence-transformers>=3.2 with optimum[onnxruntime] installed;
+    int8 quantizes the torch model's Linear layers after loading.
+    """
+    from langchain_huggingface import HuggingFaceEmbeddings
+
+    backend = _validate(backend or settings.INFERENCE_BACKEND)
+    model_name = model_name or settings.EMBEDDING_MODEL_NAME
+
+    if backend == ONNX:
+        model = HuggingFaceEmbeddings(
+            model_name=model_name, model_kwargs={"backend": "onnx"}
+        )
+    else:
+        model = HuggingFaceEmbeddings(model_name=model_name)
+        if backend == INT8:
+            # _client is the underlying SentenceTransformer
+            _quantize_int8(model._client)
+
+    logger.info(f"Dense model {model_name} loaded with {backend} backend")
+    return model
+
+
+def load_cross_encoder(backend: str = None, model_name: str = None):
+    """
+    ms-marco cross-encoder with the selected backend.
+
+    onnx needs sentence-transformers>=4.1 with optimum[onnxruntime] installed.
+    """
+    from sentence_transformers import CrossEncoder
+
+    backend = _validate(backend or settings.INFERENCE_BACKEND)
+    model_name = model_name or settings.CROSS_ENCODER_MODEL_NAME
+
+    if backend == ONNX:
+        model = CrossEncoder(model_name, backend="onnx")
+    else:
+        model = CrossEncoder(model_name)
+        if backend == INT8:
+            _quantize_int8(model.model)
+
+    logger.info(f"Cross-encoder {model_name} loaded with {backend} backend")
+    return model
@@ -0,0 +1,239 @@
+import asyncio
+import json
+import time
+import uuid
+from collections import OrderedDict
+from typing import Coroutine, Optional
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from config import settings
+from utils.logger import logger
+
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+COMPLETED_WITH_ERRORS = "completed_with_errors"
+FAILED = "failed"
+
+
+class IngestionJob:
+    """Progress of one background ingestion: chunks done, failed and throughput."""
+
+    def __init__(self, filename: str):
+        self.job_id = uuid.uuid4().hex
+        self.filename = filename
+        self.status = QUEUED
+        self.total_chunks = 0
+        # False while a streamed file is still being parsed
+        self.total_known = False
+        self.processed_chunks = 0
+        self.failed_chunks = 0
+        # Unchanged since the last ingestion of the file, so not re-upserted
+        self.skipped_chunks = 0
+        self.deleted_chunks = 0
+        self.reused_embeddings = 0
+        self.errors: list = []
+        # Per pipeline stage: chunks through it and its first start / last end
+        self.stages: dict = {}
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+
+    def start(self, total_chunks: Optional[int] = None):
+        """total_chunks is None when the file is parsed as it streams in."""
+        self.status = RUNNING
+        self.total_known = total_chunks is not None
+        self.total_chunks = total_chunks or 0
+        self.started_at = time.time()
+
+    def record_parsed(self, chunks: int):
+        if not self.total_known:
+            self.total_chunks += chunks
+
+    def parsed(self):
+        self.total_known = True
+
+    def record_batch(self, chunks: int):
+        self.processed_chunks += chunks
+
+    def record_skipped(self, chunks: int):
+        self.skipped_chunks += chunks
+
+    def record_deleted(self, chunks: int):
+        self.deleted_chunks += chunks
+
+    def record_reused(self, chunks: int):
+        self.reused_embeddings += chunks
+
+    def record_stage(self, stage: str, chunks: int, started: float, finished: float):
+        stats = self.stages.setdefault(
+            stage, {"chunks": 0, "started": started, "finished": finished}
+        )
+        stats["chunks"] += chunks
+        stats["started"] = min(stats["started"], started)
+        stats["finished"] = max(stats["finished"], finished)
+
+    def stage_report(self) -> dict:
+        """Chunks, active seconds and chunks/s of each stage."""
+        report = {}
+        for stage, stats in self.stages.items():
+            seconds = stats["finished"] - stats["started"]
+            report[stage] = {
+                "chunks": stats["chunks"],
+                "seconds": round(seconds, 2),
+                "chunks_per_second": (
+                    round(stats["chunks"] / seconds, 1) if seconds else 0.0
+                ),
+            }
+        return report
+
+    def record_failure(self, chunks: int, error: Exception):
+        self.failed_chunks += chunks
+        self.errors.append(str(error))
+
+    def finish(self, error: Exception = None):
+        if error is not None:
+            self.errors.append(str(error))
+            self.status = FAILED
+        elif self.failed_chunks or self.errors:
+            self.status = COMPLETED_WITH_ERRORS
+        else:
+            self.status = COMPLETED
+        self.finished_at = time.time()
+
+    def to_dict(self) -> dict:
+        elapsed = None
+        if self.started_at:
+            elapsed = (self.finished_at or time.time()) - self.started_at
+        done = self.processed_chunks + self.failed_chunks + self.skipped_chunks
+        progress = None
+        if self.total_known:
+            progress = round(done / self.total_chunks, 3) if self.total_chunks else 0.0
+        return {
+            "job_id": self.job_id,
+            "filename": self.filename,
+            "status": self.status,
+            "total_chunks": self.total_chunks,
+            "total_known": self.total_known,
+            "processed_chunks": self.processed_chunks,
+            "failed_chunks": self.failed_chunks,
+            "skipped_chunks": self.skipped_chunks,
+            "deleted_chunks": self.deleted_chunks,
+            "reused_embeddings": self.reused_embeddings,
+            "progress": progress,
+            "chunks_per_second": (
+                round(self.processed_chunks / elapsed, 1) if elapsed else 0.0
+            ),
+            "elapsed_seconds": round(elapsed, 2) if elapsed is not None else None,
+            "stages": self.stage_report(),
+            "errors": self.errors[-10:],
+        }
+
+
+class IngestionJobRegistry:
+    """
+    Ingestion jobs and their running tasks. A job runs on the worker that
+    started it, which publishes its state to Redis (ingest_job:{id}) while it
+    runs, so a poll can land on any worker. Only the most recent max_jobs are
+    listed and each is kept INGEST_JOB_TTL after its last update. Without a
+    Redis client (e.g. ingest.py) jobs are only visible in this process.
+    """
+
+    _KEY_PREFIX = "ingest_job:"
+    _INDEX_KEY = "ingest_jobs"
+
+    def __init__(self, max_jobs: int = 100, redis_client: Redis = None):
+        self.max_jobs = max_jobs
+        self.redis_client = redis_client
+        self._jobs: "OrderedDict[str, IngestionJob]" = OrderedDict()
+        self._tasks: set = set()
+
+    def attach(self, redis_client: Redis):
+        self.redis_client = redis_client
+
+    def create(self, filename: str) -> IngestionJob:
+        job = IngestionJob(filename)
+        self._jobs[job.job_id] = job
+        while len(self._jobs) > self.max_jobs:
+            self._jobs.popitem(last=False)
+        return job
+
+    async def run(self, job: IngestionJob, coro: Coroutine) -> asyncio.Task:
+        # Published before returning, so the job id the client gets back resolves
+        await self._publish(job)
+        # Keep a reference so the task is not garbage collected mid-run
+        task = asyncio.create_task(self._track(job, coro))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    async def _track(self, job: IngestionJob, coro: Coroutine):
+        publisher = asyncio.create_task(self._publish_while_running(job))
+        try:
+            await coro
+        finally:
+            publisher.cancel()
+            await self._publish(job)
+
+    async def _publish_while_running(self, job: IngestionJob):
+        while True:
+            await asyncio.sleep(settings.INGEST_JOB_PUBLISH_INTERVAL)
+            await self._publish(job)
+
+    async def _publish(self, job: IngestionJob):
+        if self.redis_client is None:
+            return
+        try:
+            pipe = self.redis_client.pipeline(transaction=False)
+            pipe.set(
+                f"{self._KEY_PREFIX}{job.job_id}",
+                json.dumps(job.to_dict()),
+                ex=settings.INGEST_JOB_TTL,
+            )
+            pipe.zadd(self._INDEX_KEY, {job.job_id: job.created_at})
+            pipe.zremrangebyrank(self._INDEX_KEY, 0, -self.max_jobs - 1)
+            pipe.expire(self._INDEX_KEY, settings.INGEST_JOB_TTL)
+            await pipe.execute()
+        except RedisError as e:
+            # Progress reporting must not fail the ingestion itself
+            logger.warning(f"Could not publish ingestion job {job.job_id}: {e}")
+
+    async def get(self, job_id: str) -> Optional[dict]:
+        job = self._jobs.get(job_id)
+        if job is not None:
+            return job.to_dict()
+        if self.redis_client is None:
+            return None
+        data = await self.redis_client.get(f"{self._KEY_PREFIX}{job_id}")
+        return json.loads(data) if data else None
+
+    async def list(self) -> list:
+        """Recent jobs of every worker, newest first."""
+        if self.redis_client is None:
+            return [job.to_dict() for job in reversed(self._jobs.values())]
+        job_ids = await self.redis_client.zrevrange(
+            self._INDEX_KEY, 0, self.max_jobs - 1
+        )
+        if not job_ids:
+            return []
+        published = await self.redis_client.mget(
+            [f"{self._KEY_PREFIX}{job_id}" for job_id in job_ids]
+        )
+        jobs = []
+        for job_id, data in zip(job_ids, published):
+            # This worker's own jobs are fresher than their last publish
+            job = self._jobs.get(job_id)
+            if job is not None:
+                jobs.append(job.to_dict())
+            elif data:
+                jobs.append(json.loads(data))
+        return jobs
+
+    async def close(self):
+        for task in list(self._tasks):
+            task.cancel()
+
+
+ingestion_jobs = IngestionJobRegistry()
@@ -0,0 +1,136 @@
+import asyncio
+from typing import Optional, Tuple
+
+import numpy as np
+
+from services.embedding_service import EmbeddingService
+from services.query_embedding_cache import query_embedding_cache
+from services.redis_service import RedisService
+
+# Labelled exemplars for the kNN classifier; extend these when misroutes show up
+INTENT_EXEMPLARS = {
+    "policy": [
+        "what is your refund policy?",
+        "can i cancel my booking?",
+        "how do cancellations work",
+        "will i get my money back if i cancel",
+        "what are the terms of service",
+        "tell me about your company",
+        "where is the company headquartered",
+        "what happens if my tour is cancelled due to weather",
+        "do you charge a cancellation fee",
+        "what is your privacy policy",
+        "is travel insurance included",
+        "how do i file a complaint",
+    ],
+    "planning": [
+        "plan a 3 day trip from kathmandu to pokhara",
+        "create an itinerary for chitwan",
+        "i want to visit lumbini for 2 days",
+        "make a tour plan for nagarkot",
+        "what attractions are there in pokhara",
+        "suggest a 5 day tour starting from kathmandu",
+        "plan my holiday to chitwan from pokhara",
+        "regenerate the tour plan",
+        "change the plan to 4 days",
+        "which hotel should i stay in pokhara",
+        "how long does it take to travel from kathmandu to chitwan",
+        "i want a trip to nepal",
+    ],
+    "booking": [
+        "book this tour",
+        "confirm the booking",
+        "yes please book it",
+        "i want to book the plan",
+        "go ahead and confirm",
+        "reserve this trip for me",
+        "confirm my tour",
+        "book the itinerary you created",
+    ],
+    "general": [
+        "hello",
+        "hi there",
+        "how are you",
+        "thank you",
+        "what is the weather like on mars",
+        "tell me a joke",
+        "who won the football match yesterday",
+        "what is the capital of france",
+        "write me a poem",
+        "good morning",
+        "bye",
+        "what is 2 plus 2",
+    ],
+}
+
+
+class LocalIntentClassifier:
+    """
+    kNN intent classifier over labelled exemplars, using the mpnet embeddings
+    the service already loads. Confidence is the similarity-weighted vote share
+    of the winning label among the k nearest exemplars. The query is embedded
+    through the query embedding cache, so the retrieval that follows reuses it.
+    """
+
+    _labels: Optional[list] = None
+    _matrix: Optional[np.ndarray] = None
+    _build_lock: Optional[asyncio.Lock] = None
+
+    def __init__(
+        self,
+        embedding_service: EmbeddingService,
+        redis_service: RedisService,
+        k: int = 5,
+    ):
+        self.embedding_service = embedding_service
+        self.redis_service = redis_service
+        self.k = k
+
+    @staticmethod
+    def _normalize(matrix: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+        return matrix / np.where(norms == 0, 1, norms)
+
+    async def _ensure_exemplars(self):
+        """Embed the exemplars once per process."""
+        cls = type(self)
+        if cls._matrix is not None:
+            return
+        if cls._build_lock is None:
+            cls._build_lock = asyncio.Lock()
+        async with cls._build_lock:
+            if cls._matrix is not None:
+                return
+            labels, texts = [], []
+            for label, examples in INTENT_EXEMPLARS.items():
+                labels.extend([label] * len(examples))
+                texts.extend(examples)
+            vectors = await asyncio.gather(
+                *[self.embedding_service.get_embedding_async(t) for t in texts]
+            )
+            cls._labels = labels
+            cls._matrix = self._normalize(np.asarray(vectors, dtype=np.float32))
+
+    async def predict(self, user_query: str) -> Tuple[str, float]:
+        await self._ensure_exemplars()
+        embeddings = await query_embedding_cache.get_or_compute(
+            user_query,
+            self.redis_service,
+            self.embedding_service.get_query_embeddings_async,
+        )
+        query = np.asarray(embeddings["dense"], dtype=np.float32)
+        similarities = self._matrix @ self._normalize(query)
+
+        k = min(self.k, len(self._labels))
+        nearest = np.argsort(-similarities)[:k]
+        votes = {}
+        for i in nearest:
+            votes[self._labels[i]] = votes.get(self._labels[i], 0.0) + max(
+                float(similarities[i]), 0.0
+            )
+
+        total = sum(votes.values())
+        if not total:
+            return "general", 0.0
+        intent = max(votes, key=votes.get)
+        return intent, votes[intent] / total
@@ -0,0 +1,279 @@
+import json
+import os
+import threading
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from config import settings
+from services.metadata_index import MetadataIndex
+from utils.logger import logger
+
+
+class LocalIndexService:
+    """
+    In-process hybrid index that exposes the same query/upsert surface as the
+    Pinecone index handle, so it can be dropped into app.state.pc_index.
+
+    Dense vectors live in a contiguous float32 memory-mapped matrix and are scored
+    with a single matrix-vector product. Sparse vectors are scored with a dot
+    product on the shared indices, matching Pinecone's dotproduct hybrid metric.
+    Metadata filters are resolved against an inverted index first, so only the
+    rows that can match are scored.
+
+    upsert/delete only change memory and the mapped matrix; meta.json is written
+    by flush(), which ingestion calls once per job rather than once per batch.
+    """
+
+    _DENSE_FILE = "dense.f32"
+    _META_FILE = "meta.json"
+    _INITIAL_CAPACITY = 256
+
+    def __init__(self, index_dir: str = None, dimension: int = None):
+        self.index_dir = index_dir or settings.LOCAL_INDEX_DIR
+        self.dimension = dimension or settings.EMBEDDING_DIMENSION
+        self._lock = threading.Lock()
+
+        self._ids: List[str] = []
+        self._id_to_row: Dict[str, int] = {}
+        self._metadata: List[dict] = []
+        self._sparse: List[Dict[int, float]] = []
+        self._capacity = 0
+        self._matrix: Optional[np.memmap] = None
+        self._metadata_index = MetadataIndex()
+        self._dirty = False
+
+        os.makedirs(self.index_dir, exist_ok=True)
+        self._load()
+
+    @property
+    def _dense_path(self) -> str:
+        return os.path.join(self.index_dir, self._DENSE_FILE)
+
+    @property
+    def _meta_path(self) -> str:
+        return os.path.join(self.index_dir, self._META_FILE)
+
+    def _load(self):
+        if not os.path.exists(self._meta_path):
+            self._allocate(self._INITIAL_CAPACITY)
+            return
+
+        with open(self._meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+
+        if meta["dimension"] != self.dimension:
+            raise ValueError(
+                f"Local index dimension {meta['dimension']} does not match {self.dimension}"
+            )
+
+        self._ids = meta["ids"]
+        self._metadata = meta["metadata"]
+        self._sparse = [
+            {int(i): float(v) for i, v in zip(sv["indices"], sv["values"])}
+            for sv in meta["sparse"]
+        ]
+        self._id_to_row = {doc_id: row for row, doc_id in enumerate(self._ids)}
+        for row, metadata in enumerate(self._metadata):
+            self._metadata_index.add(row, metadata)
+        self._capacity = meta["capacity"]
+        self._matrix = np.memmap(
+            self._dense_path,
+            dtype=np.float32,
+            mode="r+",
+            shape=(self._capacity, self.dimension),
+        )
+        logger.info(f"Loaded local index with {len(self._ids)} vectors")
+
+    def _allocate(self, capacity: int):
+        """(Re)allocate the memory-mapped matrix, copying the existing rows over."""
+        tmp_path = f"{self._dense_path}.tmp"
+        matrix = np.memmap(
+            tmp_path, dtype=np.float32, mode="w+", shape=(capacity, self.dimension)
+        )
+        if self._matrix is not None and self._ids:
+            matrix[: len(self._ids)] = self._matrix[: len(self._ids)]
+        matrix.flush()
+        del matrix
+        self._matrix = None
+        os.replace(tmp_path, self._dense_path)
+
+        self._capacity = capacity
+        self._matrix = np.memmap(
+            self._dense_path,
+            dtype=np.float32,
+            mode="r+",
+            shape=(capacity, self.dimension),
+        )
+
+    def flush(self):
+        """Writes pending upserts/deletes to disk."""
+        with self._lock:
+            if self._dirty:
+                self._persist()
+                self._dirty = False
+
+    def _persist(self):
+        self._matrix.flush()
+        meta = {
+            "dimension": self.dimension,
+            "capacity": self._capacity,
+            "ids": self._ids,
+            "metadata": self._metadata,
+            "sparse": [
+                {"indices": list(sv.keys()), "values": list(sv.values())}
+                for sv in self._sparse
+            ],
+        }
+        tmp_path = f"{self._meta_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, self._meta_path)
+
+    @staticmethod
+    def _to_sparse_dict(sparse_values: Optional[dict]) -> Dict[int, float]:
+        if not sparse_values:
+            return {}
+        return {
+            int(i): float(v)
+            for i, v in zip(sparse_values["indices"], sparse_values["values"])
+        }
+
+    def _candidate_rows(self, filter: Optional[dict], size: int) -> np.ndarray:
+        """Rows that satisfy the filter, narrowed by the metadata index before scoring."""
+        if not filter:
+            return np.arange(size)
+
+        candidates = self._metadata_index.candidates(filter)
+        # The index narrows on indexed fields; the remaining clauses are verified per row
+        rows = sorted(candidates) if candidates is not None else range(size)
+        return np.fromiter(
+            (row for row in rows if MetadataIndex.matches(self._metadata[row], filter)),
+            dtype=np.int64,
+        )
+
+    def upsert(self, vectors: List[dict], **kwargs) -> dict:
+        """Insert or overwrite vectors given as Pinecone-style dicts."""
+        with self._lock:
+            needed = len(self._ids) + len(vectors)
+            if needed > self._capacity:
+                capacity = max(self._capacity, self._INITIAL_CAPACITY)
+                while capacity < needed:
+                    capacity *= 2
+                self._allocate(capacity)
+
+            for vec in vectors:
+                values = np.asarray(vec["values"], dtype=np.float32)
+                if values.shape != (self.dimension,):
+                    raise ValueError(
+                        f"Vector {vec['id']} has dimension {values.shape}, expected {self.dimension}"
+                    )
+
+                row = self._id_to_row.get(vec["id"])
+                if row is None:
+                    row = len(self._ids)
+                    self._ids.append(vec["id"])
+                    self._metadata.append({})
+                    self._sparse.append({})
+                    self._id_to_row[vec["id"]] = row
+
+                self._matrix[row] = values
+                self._metadata[row] = dict(vec.get("metadata") or {})
+                self._metadata_index.add(row, self._metadata[row])
+                self._sparse[row] = self._to_sparse_dict(vec.get("sparse_values"))
+
+            self._dirty = True
+
+        logger.info(f"Local index upserted {len(vectors)} vectors")
+        return {"upserted_count": len(vectors)}
+
+    def delete(
+        self, ids: List[str] = None, delete_all: bool = False, **kwargs
+    ) -> dict:
+        """Remove vectors by id (the last row moves into each freed slot) or all."""
+        deleted = 0
+        with self._lock:
+            if delete_all:
+                deleted = len(self._ids)
+                self._ids, self._metadata, self._sparse = [], [], []
+                self._id_to_row = {}
+                self._metadata_index = MetadataIndex()
+                ids = []
+            for vec_id in ids or []:
+                row = self._id_to_row.pop(vec_id, None)
+                if row is None:
+                    continue
+                last = len(self._ids) - 1
+                self._metadata_index.remove(row)
+                if row != last:
+                    moved_id = self._ids[last]
+                    self._metadata_index.remove(last)
+                    self._ids[row] = moved_id
+                    self._matrix[row] = self._matrix[last]
+                    self._metadata[row] = self._metadata[last]
+                    self._sparse[row] = self._sparse[last]
+                    self._id_to_row[moved_id] = row
+                    self._metadata_index.add(row, self._metadata[row])
+                self._ids.pop()
+                self._metadata.pop()
+                self._sparse.pop()
+                deleted += 1
+
+            if deleted:
+                self._dirty = True
+
+        logger.info(f"Local index deleted {deleted} vectors")
+        return {"deleted_count": deleted}
+
+    def query(
+        self,
+        top_k: int,
+        vector: List[float],
+        sparse_vector: Optional[dict] = None,
+        filter: Optional[dict] = None,
+        include_values: bool = False,
+        include_metadata: bool = True,
+        **kwargs,
+    ) -> Dict[str, Any]:
+        """Hybrid dotproduct search returning a Pinecone-shaped response."""
+        with self._lock:
+            size = len(self._ids)
+            if size == 0:
+                return {"matches": [], "namespace": ""}
+
+            rows = self._candidate_rows(filter, size)
+            if rows.size == 0:
+                return {"matches": [], "namespace": ""}
+
+            query_dense = np.asarray(vector, dtype=np.float32)
+            scores = self._matrix[rows] @ query_dense
+
+            if sparse_vector:
+                query_sparse = self._to_sparse_dict(sparse_vector)
+                for pos, row in enumerate(rows):
+                    doc_sparse = self._sparse[row]
+                    if doc_sparse:
+                        scores[pos] += sum(
+                            v * doc_sparse[i]
+                            for i, v in query_sparse.items()
+                            if i in doc_sparse
+                        )
+
+            k = min(top_k, rows.size)
+            top_pos = np.argpartition(-scores, k - 1)[:k]
+            top_pos = top_pos[np.argsort(-scores[top_pos])]
+
+            matches = []
+            for pos in top_pos:
+                row = rows[pos]
+                match = {"id": self._ids[row], "score": float(scores[pos])}
+                if include_metadata:
+                    match["metadata"] = dict(self._metadata[row])
+                if include_values:
+                    match["values"] = self._matrix[row].tolist()
+                matches.append(match)
+
+        return {"matches": matches, "namespace": ""}
+
+    def describe_index_stats(self) -> dict:
+        return {"dimension": self.dimension, "total_vector_count": len(self._ids)}
@@ -0,0 +1,132 @@
+import json
+import os
+import threading
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+from config import settings
+from services.metadata_index import MetadataIndex
+from services.route_graph import RouteGraph
+from utils.logger import logger
+
+
+class LookupStore:
+    """
+    Keyed in-memory view of the structured JSON records (travel hours, hotels,
+    attractions), built at ingestion so the planner can read them without a
+    vector search: travel hours by (from_city, to_city) and records per
+    (type, city). Records are the chunk metadata without the bookkeeping fields,
+    the same shape a vector search match carries.
+
+    Records are kept per source file, so re-ingesting a file replaces its
+    records. The store is snapshotted to disk and other workers reload it when
+    the snapshot changes.
+    """
+
+    def __init__(self, path: str = None):
+        self.path = path or settings.LOOKUP_STORE_PATH
+        self._lock = threading.Lock()
+        self._records_by_file: Dict[str, List[dict]] = {}
+        self._travel: Dict[Tuple[str, str], List[dict]] = {}
+        self._by_city: Dict[Tuple[str, str], List[dict]] = {}
+        self._route_graph: Optional[RouteGraph] = None
+        self._snapshot_mtime: Optional[float] = None
+
+    @staticmethod
+    def _key(*values) -> tuple:
+        return tuple(MetadataIndex.normalize_value(v) for v in values)
+
+    def _rebuild(self):
+        travel, by_city = defaultdict(list), defaultdict(list)
+        for records in self._records_by_file.values():
+            for record in records:
+                if record.get("from_city") and record.get("to_city"):
+                    key = self._key(record["from_city"], record["to_city"])
+                    travel[key].append(record)
+                elif record.get("city") and record.get("type"):
+                    key = self._key(record["type"], record["city"])
+                    by_city[key].append(record)
+        self._travel, self._by_city = dict(travel), dict(by_city)
+        self._route_graph = None
+
+    def replace_file(self, filename: str, metadatas: List[dict]):
+        """Swap in the structured records parsed from one ingested file."""
+        records = [
+            {
+                field: value
+                for field, value in md.items()
+                if field not in ("filename", "chunk_index") and value is not None
+            }
+            for md in metadatas
+            if md.get("content") and (md.get("city") or md.get("from_city"))
+        ]
+        with self._lock:
+            if records:
+                self._records_by_file[filename] = records
+            elif self._records_by_file.pop(filename, None) is None:
+                return
+            self._rebuild()
+            self._save()
+        logger.info(f"Lookup store: {len(records)} structured records from {filename}")
+
+    def clear(self):
+        """Drop every file's records, e.g. when the index is deleted."""
+        with self._lock:
+            self._records_by_file = {}
+            self._rebuild()
+            self._save()
+        logger.info("Lookup store cleared")
+
+    def _save(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self._records_by_file, f)
+        os.replace(tmp_path, self.path)
+        self._snapshot_mtime = os.path.getmtime(self.path)
+
+    def load(self):
+        """Reload the snapshot if it changed since it was last read."""
+        with self._lock:
+            try:
+                mtime = os.path.getmtime(self.path)
+            except OSError:
+                return
+            if mtime == self._snapshot_mtime:
+                return
+            with open(self.path, "r", encoding="utf-8") as f:
+                self._records_by_file = json.load(f)
+            self._rebuild()
+            self._snapshot_mtime = mtime
+
+    def travel(self, from_city: str, to_city: str) -> List[dict]:
+        self.load()
+        records = self._travel.get(self._key(from_city, to_city), [])
+        return [dict(r) for r in records]
+
+    def city_records(self, record_type: str, city: str) -> List[dict]:
+        self.load()
+        return [dict(r) for r in self._by_city.get(self._key(record_type, city), [])]
+
+    def route_graph(self) -> RouteGraph:
+        """City graph over the travel records, rebuilt when they change."""
+        self.load()
+        graph = self._route_graph
+        if graph is None:
+            graph = RouteGraph.from_records(
+                (from_city, to_city, record.get("text") or record["content"])
+                for (from_city, to_city), records in self._travel.items()
+                for record in records
+            )
+            self._route_graph = graph
+        return graph
+
+    def stats(self) -> dict:
+        return {
+            "files": len(self._records_by_file),
+            "city_pairs": len(self._travel),
+            "city_lists": len(self._by_city),
+        }
+
+
+lookup_store = LookupStore()
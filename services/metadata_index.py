@@ -0,0 +1,125 @@
+from collections import defaultdict
+from typing import Dict, Iterable, Optional, Set
+
+INDEXED_FIELDS = ("city", "type", "from_city", "to_city", "filename")
+
+
+class MetadataIndex:
+    """
+    Inverted index from (field, value) to the set of rows carrying it.
+
+    Supports the subset of Pinecone's filter language the services use:
+    plain equality, $eq, $in and $and. Filters on fields that are not indexed
+    are checked row by row, but only on the rows the indexed fields left over.
+    """
+
+    def __init__(self, fields: Iterable[str] = INDEXED_FIELDS):
+        self.fields = tuple(fields)
+        self._postings: Dict[str, Dict[str, Set[int]]] = {
+            field: defaultdict(set) for field in self.fields
+        }
+        self._row_values: Dict[int, Dict[str, str]] = {}
+
+    @staticmethod
+    def normalize_value(value) -> str:
+        return str(value).strip().lower()
+
+    @classmethod
+    def normalize(cls, metadata: dict, fields: Iterable[str] = INDEXED_FIELDS) -> dict:
+        """Lowercase/strip the indexed fields so filters match regardless of casing."""
+        normalized = dict(metadata)
+        for field in fields:
+            if normalized.get(field) is not None:
+                normalized[field] = cls.normalize_value(normalized[field])
+        return normalized
+
+    def add(self, row: int, metadata: dict):
+        self.remove(row)
+        values = {}
+        for field in self.fields:
+            if metadata.get(field) is not None:
+                value = self.normalize_value(metadata[field])
+                self._postings[field][value].add(row)
+                values[field] = value
+        self._row_values[row] = values
+
+    def remove(self, row: int):
+        for field, value in self._row_values.pop(row, {}).items():
+            postings = self._postings[field][value]
+            postings.discard(row)
+            if not postings:
+                del self._postings[field][value]
+
+    def _match_clause(self, field: str, condition) -> Optional[Set[int]]:
+        """Rows matching one field clause, or None if the field is not indexed."""
+        if field not in self._postings:
+            return None
+
+        if isinstance(condition, dict):
+            if "$eq" in condition:
+                values = [condition["$eq"]]
+            elif "$in" in condition:
+                values = condition["$in"]
+            else:
+                return None
+        else:
+            values = [condition]
+
+        rows = set()
+        for value in values:
+            rows |= self._postings[field].get(self.normalize_value(value), set())
+        return rows
+
+    def candidates(self, filter: Optional[dict]) -> Optional[Set[int]]:
+        """
+        Narrow the candidate rows for a filter using the indexed fields.
+        Returns None when the filter cannot narrow anything (e.g. no filter).
+        """
+        if not filter:
+            return None
+
+        result: Optional[Set[int]] = None
+        clauses = list(filter.items())
+        while clauses:
+            field, condition = clauses.pop()
+            if field == "$and":
+                clauses.extend(
+                    item for sub_filter in condition for item in sub_filter.items()
+                )
+                continue
+
+            rows = self._match_clause(field, condition)
+            if rows is None:
+                continue
+            result = rows if result is None else result & rows
+            if not result:
+                return set()
+        return result
+
+    @classmethod
+    def matches(cls, metadata: dict, filter: Optional[dict]) -> bool:
+        """Check a single metadata dict against a filter (used for non-indexed fields)."""
+        if not filter:
+            return True
+        for field, condition in filter.items():
+            if field == "$and":
+                if not all(cls.matches(metadata, sub) for sub in condition):
+                    return False
+                continue
+
+            value = metadata.get(field)
+            if value is None:
+                return False
+            value = cls.normalize_value(value)
+            if isinstance(condition, dict):
+                if "$eq" in condition:
+                    allowed = [condition["$eq"]]
+                elif "$in" in condition:
+                    allowed = condition["$in"]
+                else:
+                    raise ValueError(f"Unsupported filter operator for {field}")
+            else:
+                allowed = [condition]
+            if value not in {cls.normalize_value(v) for v in allowed}:
+                return False
+        return True
@@ -0,0 +1,119 @@
+import asyncio
+import time
+from collections import Counter
+from concurrent.futures import Executor
+from typing import Any, Callable, List, Optional
+
+from utils.logger import logger
+
+
+class MicroBatcher:
+    """
+    Collects single items submitted by concurrent callers and runs them through
+    one batched call.
+
+    A batch is flushed as soon as max_batch_size items are waiting or max_wait_ms
+    has passed since the first item of the batch arrived, whichever comes first.
+    The batch function runs in the given executor so the event loop is never
+    blocked, and each caller's future is resolved with its own result.
+    """
+
+    def __init__(
+        self,
+        batch_fn: Callable[[List[Any]], List[Any]],
+        max_batch_size: int,
+        max_wait_ms: float,
+        executor: Optional[Executor] = None,
+        name: str = "batcher",
+    ):
+        self.batch_fn = batch_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.executor = executor
+        self.name = name
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+
+        self._batches = 0
+        self._items = 0
+        self._max_queue_depth = 0
+        self._batch_sizes = Counter()
+        self._busy_seconds = 0.0
+
+    def _ensure_worker(self):
+        # Created lazily so the queue and task bind to the running event loop
+        if self._worker is None or self._worker.done():
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.get_event_loop().create_task(self._run())
+
+    async def submit(self, item: Any) -> Any:
+        self._ensure_worker()
+        future = asyncio.get_event_loop().create_future()
+        await self._queue.put((item, future))
+        self._max_queue_depth = max(self._max_queue_depth, self._queue.qsize())
+        return await future
+
+    async def _collect(self) -> list:
+        batch = [await self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        loop = asyncio.get_event_loop()
+        while True:
+            batch = await self._collect()
+            items = [item for item, _ in batch]
+            futures = [future for _, future in batch]
+
+            start = time.perf_counter()
+            try:
+                results = await loop.run_in_executor(self.executor, self.batch_fn, items)
+            except Exception as e:
+                logger.error(f"{self.name} batch of {len(items)} failed: {e}")
+                for future in futures:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            finally:
+                self._busy_seconds += time.perf_counter() - start
+                self._batches += 1
+                self._items += len(items)
+                self._batch_sizes[len(items)] += 1
+
+            for future, result in zip(futures, results):
+                # The caller may have been cancelled while the batch was running
+                if not future.done():
+                    future.set_result(result)
+
+    async def close(self):
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+
+    def stats(self) -> dict:
+        return {
+            "queue_depth": self._queue.qsize() if self._queue else 0,
+            "max_queue_depth": self._max_queue_depth,
+            "batches": self._batches,
+            "items": self._items,
+            "avg_batch_size": round(self._items / self._batches, 2)
+            if self._batches
+            else 0,
+            "batch_size_histogram": dict(sorted(self._batch_sizes.items())),
+            "busy_seconds": round(self._busy_seconds, 3),
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000,
+        }
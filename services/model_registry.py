@@ -0,0 +1,117 @@
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from utils.logger import logger
+
+MPNET = "mpnet"
+SPLADE = "splade"
+CROSS_ENCODER = "cross_encoder"
+
+
+def _current_rss_mb() -> Optional[float]:
+    """Resident set size of this process in MB (Linux /proc, else peak RSS)."""
+    try:
+        with open("/proc/self/statm") as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, IndexError):
+        try:
+            import resource
+
+            # ru_maxrss is in KB on Linux; good enough as a fallback
+            return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        except ImportError:
+            return None
+
+
+class ModelRegistry:
+    """
+    Process-wide registry so every model is loaded exactly once and shared by
+    all services.
+
+    Models are loaded lazily on first get() (thread-safe, so a model first used
+    from an executor thread is still loaded once) or explicitly via preload().
+    Load time and the RSS growth observed during each load are recorded.
+    """
+
+    def __init__(self):
+        self._loaders: Dict[str, Callable[[], Any]] = {}
+        self._models: Dict[str, Any] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._stats: Dict[str, dict] = {}
+
+    def register(self, name: str, loader: Callable[[], Any]):
+        self._loaders[name] = loader
+        self._locks[name] = threading.Lock()
+
+    def is_loaded(self, name: str) -> bool:
+        return name in self._models
+
+    def get(self, name: str) -> Any:
+        model = self._models.get(name)
+        if model is not None:
+            return model
+
+        if name not in self._loaders:
+            raise KeyError(f"Model '{name}' is not registered")
+
+        with self._locks[name]:
+            # Another thread may have finished loading while we waited
+            if name in self._models:
+                return self._models[name]
+
+            rss_before = _current_rss_mb()
+            start = time.perf_counter()
+            model = self._loaders[name]()
+            load_seconds = time.perf_counter() - start
+            rss_after = _current_rss_mb()
+
+            self._stats[name] = {
+                "load_seconds": round(load_seconds, 3),
+                # Approximate: other allocations during the load are included
+                "rss_delta_mb": round(rss_after - rss_before, 1)
+                if rss_before is not None and rss_after is not None
+                else None,
+            }
+            self._models[name] = model
+            logger.info(f"Loaded model '{name}' in {load_seconds:.2f}s")
+            return model
+
+    def preload(self, names: Iterable[str] = None):
+        for name in names or list(self._loaders):
+            self.get(name)
+
+    def stats(self) -> dict:
+        return {
+            "process_rss_mb": _current_rss_mb(),
+            "models": {
+                name: {"loaded": self.is_loaded(name), **self._stats.get(name, {})}
+                for name in self._loaders
+            },
+        }
+
+
+def _load_mpnet():
+    from services.inference_backend import load_dense_model
+
+    return load_dense_model()
+
+
+def _load_splade():
+    from pinecone_text.sparse import SpladeEncoder
+
+    return SpladeEncoder()
+
+
+def _load_cross_encoder():
+    from services.inference_backend import load_cross_encoder
+
+    return load_cross_encoder()
+
+
+model_registry = ModelRegistry()
+model_registry.register(MPNET, _load_mpnet)
+model_registry.register(SPLADE, _load_splade)
+model_registry.register(CROSS_ENCODER, _load_cross_encoder)
@@ -1,27 +1,57 @@
 import time
-from pinecone import ServerlessSpec, Pinecone
 from config import settings
 from utils.logger import logger
 
 
 class PineconeService:
     def __init__(self):
+        # Nothing built here: the module-level instance exists at import time,
+        # also when VECTOR_BACKEND=local and no Pinecone key is set
         self.index_name = settings.PINECONE_INDEX
-        self.pc = Pinecone(api_key=settings.PINECONE_API_KEY)
+        self._pc = None
+        self.index = None
 
+    @property
+    def pc(self):
+        """Pinecone client, created on first use."""
+        if self._pc is None:
+            from pinecone import Pinecone
+
+            self._pc = Pinecone(api_key=settings.PINECONE_API_KEY)
+        return self._pc
+
+    @staticmethod
+    def _spec():
+        from pinecone import ServerlessSpec
+
+        return ServerlessSpec(cloud="aws", region=settings.PINECONE_REGION)
+
+    def ensure_index(self):
+        """Create the index if it does not exist and open the pooled handle."""
         if not self.pc.has_index(self.index_name):
             logger.info("Creating index for pinecone vector")
             self.pc.create_index(
                 name=self.index_name,
                 dimension=settings.EMBEDDING_DIMENSION,
                 metric="dotproduct",
-                spec=ServerlessSpec(cloud="aws", region=settings.PINECONE_REGION),
+                spec=self._spec(),
             )
-        self.index = self.pc.Index(self.index_name)
+        self.index = self._create_index_handle()
+        return self.index
+
+    def _create_index_handle(self):
+        # Size the HTTP connection pool to the retrieval concurrency limit
+        return self.pc.Index(
+            self.index_name,
+            pool_threads=settings.RETRIEVAL_MAX_CONCURRENCY,
+            connection_pool_maxsize=settings.RETRIEVAL_MAX_CONCURRENCY,
+        )
 
     def get_index(self):
-        # Optimistic: Return the index handle immediately (no API call)
-        return self.pc.Index(self.index_name)
+        # Optimistic: Return the pooled index handle immediately (no API call)
+        if self.index is None:
+            return self.ensure_index()
+        return self.index
 
     def delete_index(self):
         """Delete and recreate the index with a fresh state."""
@@ -36,8 +66,9 @@ class PineconeService:
             name=self.index_name,
             dimension=settings.EMBEDDING_DIMENSION,
             metric="dotproduct",
-            spec=ServerlessSpec(cloud="aws", region=settings.PINECONE_REGION),
+            spec=self._spec(),
         )
+        self.index = self._create_index_handle()
         logger.info("Index recreated successfully")
 
 
@@ -0,0 +1,66 @@
+import hashlib
+import json
+from typing import Optional
+
+from redis.asyncio import Redis
+
+from config import settings
+from services.redis_service import RedisService
+from utils.logger import logger
+
+PLAN_CACHE_NAMESPACE = "plans"
+
+
+class PlanCacheService:
+    """
+    Memoizes generated TourPlans keyed on the canonical constraints
+    (from_city, to_city, days) plus a hash of the retrieved context.
+
+    Keys carry the "plans" cache version, which ingestion bumps whenever hotels,
+    attractions or travel data are re-ingested, so stale plans are never served.
+    """
+
+    _counters = {"hits": 0, "misses": 0, "bypassed": 0}
+
+    def __init__(self, redis_client: Redis, ttl: int = None):
+        self.redis_client = redis_client
+        self.redis_service = RedisService(redis_client=redis_client)
+        self.ttl = ttl or settings.PLAN_CACHE_TTL
+
+    @staticmethod
+    def context_hash(*context) -> str:
+        payload = json.dumps(context, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode()).hexdigest()[:16]
+
+    async def _key(self, constraints: dict, context_hash: str) -> str:
+        version = await self.redis_service.get_cache_version(PLAN_CACHE_NAMESPACE)
+        from_city = constraints["from_city"].strip().lower()
+        to_city = constraints["to_city"].strip().lower()
+        days = int(constraints["days"])
+        return f"plan_cache:{version}:{from_city}:{to_city}:{days}:{context_hash}"
+
+    async def get(self, constraints: dict, context_hash: str) -> Optional[dict]:
+        cached = await self.redis_client.get(await self._key(constraints, context_hash))
+        if cached:
+            self._counters["hits"] += 1
+            logger.info(f"Plan cache HIT for {constraints}")
+            return json.loads(cached)
+        self._counters["misses"] += 1
+        return None
+
+    async def set(self, constraints: dict, context_hash: str, plan: dict):
+        await self.redis_client.set(
+            await self._key(constraints, context_hash), json.dumps(plan), ex=self.ttl
+        )
+
+    @classmethod
+    def record_bypass(cls):
+        cls._counters["bypassed"] += 1
+
+    @classmethod
+    def stats(cls) -> dict:
+        lookups = cls._counters["hits"] + cls._counters["misses"]
+        return {
+            **cls._counters,
+            "hit_rate": round(cls._counters["hits"] / lookups, 3) if lookups else 0.0,
+        }
@@ -1,32 +1,61 @@
 from services.base_rag import BaseRagService
+from services.semantic_cache_service import SemanticCacheService
 from utils.logger import logger
+from utils.tokens import log_prompt_tokens
+
+POLICY_CACHE_NAMESPACE = "policy"
+UNABLE_TO_ANSWER = "I am unable to answer that question based on the available information."
 
 
 class PolicyService(BaseRagService):
+    def __init__(self, *args, semantic_cache: SemanticCacheService = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.semantic_cache = semantic_cache
+
     async def run(self, user_query: str) -> str:
         """
         Handles policy-related queries using RAG and re-ranking.
+        Answers to semantically equivalent questions are served from the cache.
         """
+        if self.semantic_cache:
+            # Same embedding hybrid_search uses, so this adds no encoding work
+            embeddings = await self.get_query_embeddings(user_query)
+            cached_answer = await self.semantic_cache.lookup(embeddings["dense"])
+            if cached_answer:
+                return cached_answer
+
         retriever_results = await self.hybrid_search(
-            query=user_query, k=6, filter={"filename": "company.txt"}
+            query=user_query, k=6, filter={"type": "policy"}
         )
 
         logger.info(f"Retriever results ----> {retriever_results}")
 
         # Extract documents from Pinecone matches
-        retrieved_doc_list = [
-            match["metadata"]["content"] for match in retriever_results["matches"]
-        ]
+        matches = retriever_results["matches"]
+        retrieved_doc_list = [match["metadata"]["content"] for match in matches]
 
-        top_3_docs = await self.ranking_service.rank_documents(
-            user_query, retrieved_doc_list
+        ranked_docs = await self.ranking_service.rank_documents(
+            user_query,
+            retrieved_doc_list,
+            retrieval_scores=[match["score"] for match in matches],
+            return_scores=True,
         )
+        top_3_docs = [doc["content"] for doc in ranked_docs]
 
+        logger.info(
+            f"Top 3 doc scores ----> {[(d['scorer'], round(d['score'], 3)) for d in ranked_docs]}"
+        )
         logger.info(f"Top 3 docs ----> {top_3_docs}")
 
         prompt = self._get_policy_prompt(user_query, top_3_docs)
+        log_prompt_tokens("policy", prompt)
         response = await self.llm.ainvoke(prompt)
-        return response.content
+        answer = response.content
+
+        # Don't pin the refusal: a re-phrased question may still be answerable
+        if self.semantic_cache and answer.strip() != UNABLE_TO_ANSWER:
+            await self.semantic_cache.store(user_query, embeddings["dense"], answer)
+        return answer
 
     def _get_policy_prompt(self, user_query: str, docs: list) -> str:
         return f"""
@@ -38,7 +67,7 @@ class PolicyService(BaseRagService):
         3. Keep the answer short, precise, and factual. Make sure to provide the answer
         within a single paragraph without any kind of styling.
         4. If the documents do not contain the answer, reply exactly:
-        "I am unable to answer that question based on the available information."
+        "{UNABLE_TO_ANSWER}"
 
         User query:
         {user_query}
@@ -0,0 +1,106 @@
+import asyncio
+from typing import Awaitable, Callable
+
+from config import settings
+from services.redis_service import RedisService
+from utils.cache import TTLCache
+from utils.logger import logger
+
+
+class QueryEmbeddingCache:
+    """
+    Two-tier cache for query embeddings with single-flight computation.
+
+    Lookups go in-process LRU -> Redis -> compute. Concurrent callers asking
+    for the same query while it is being fetched or computed await the same
+    in-flight task instead of encoding it again (e.g. the three parallel
+    searches TourPlannerService.run fires for one user query).
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self._lru = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._in_flight: dict[str, asyncio.Future] = {}
+        self._counters = {
+            "lru_hits": 0,
+            "lru_misses": 0,
+            "redis_hits": 0,
+            "redis_misses": 0,
+            "coalesced": 0,
+        }
+
+    @staticmethod
+    def _key(query: str) -> str:
+        # Same normalization RedisService uses for its embedding keys
+        return query.strip().lower()
+
+    async def get_or_compute(
+        self,
+        query: str,
+        redis_service: RedisService,
+        compute: Callable[[str], Awaitable[dict]],
+    ) -> dict:
+        key = self._key(query)
+
+        cached = self._lru.get(key)
+        if cached is not None:
+            self._counters["lru_hits"] += 1
+            return cached
+        self._counters["lru_misses"] += 1
+
+        task = self._in_flight.get(key)
+        if task is not None:
+            self._counters["coalesced"] += 1
+        else:
+            # The lookup runs in its own task, so a caller that is cancelled
+            # does not cancel it for the others waiting on it
+            task = asyncio.ensure_future(self._fetch(key, query, redis_service, compute))
+            self._in_flight[key] = task
+            task.add_done_callback(lambda t: self._done(key, t))
+        return await asyncio.shield(task)
+
+    async def _fetch(
+        self,
+        key: str,
+        query: str,
+        redis_service: RedisService,
+        compute: Callable[[str], Awaitable[dict]],
+    ) -> dict:
+        embeddings = await redis_service.get_emb_cache(query)
+        if embeddings:
+            self._counters["redis_hits"] += 1
+            logger.info("Embedding CACHE HIT")
+        else:
+            self._counters["redis_misses"] += 1
+            logger.info("Embedding CACHE MISS -> Generating")
+            embeddings = await compute(query)
+            await redis_service.set_emb_cache(query, embeddings)
+
+        self._lru.set(key, embeddings)
+        return embeddings
+
+    def _done(self, key: str, task: asyncio.Task):
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        # Mark the exception as retrieved when every caller was cancelled
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> dict:
+        return {
+            "lru": {
+                "hits": self._counters["lru_hits"],
+                "misses": self._counters["lru_misses"],
+                "size": len(self._lru),
+            },
+            "redis": {
+                "hits": self._counters["redis_hits"],
+                "misses": self._counters["redis_misses"],
+            },
+            "coalesced": self._counters["coalesced"],
+            "in_flight": len(self._in_flight),
+        }
+
+
+query_embedding_cache = QueryEmbeddingCache(
+    maxsize=settings.EMB_CACHE_LRU_SIZE, ttl=settings.EMB_CACHE_LRU_TTL
+)
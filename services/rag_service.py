@@ -20,5 +20,20 @@ class RagService:
     async def policy_service(self, user_query: str) -> str:
         return await self.policy_service_impl.run(user_query)
 
-    async def tour_planning_service(self, user_query: str, message_history: list):
-        return await self.tour_planner_impl.run(user_query, message_history)
+    async def tour_planning_service(
+        self,
+        user_query: str,
+        message_history: list,
+        constraints: dict = None,
+        on_day_plan=None,
+        regenerate: bool = False,
+        history: list = None,
+    ):
+        return await self.tour_planner_impl.run(
+            user_query,
+            message_history,
+            constraints,
+            on_day_plan=on_day_plan,
+            regenerate=regenerate,
+            history=history,
+        )
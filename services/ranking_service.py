@@ -1,27 +1,118 @@
 from concurrent.futures import ThreadPoolExecutor
 import asyncio
+import hashlib
+import re
+
+from config import settings
+from services.model_registry import model_registry, CROSS_ENCODER
+from utils.cache import TTLCache
 
 
 class RankingService:
+    """
+    Reranks retrieved documents with the cross-encoder.
+
+    Scores are cached per (normalized query, chunk content hash), so repeat
+    questions over the same chunks skip the model. In cascade mode the
+    cross-encoder is skipped entirely when the retrieval scores already separate
+    the top-k from the rest by a clear margin.
+    """
+
     _executor = ThreadPoolExecutor(max_workers=2)
+    _score_cache = TTLCache(
+        maxsize=settings.RERANK_CACHE_SIZE, ttl=settings.RERANK_CACHE_TTL
+    )
+    _counters = {"cache_hits": 0, "cache_misses": 0, "cascade_skips": 0}
+
+    def __init__(self, model=None):
+        self._model = model
+
+    @property
+    def model(self):
+        # Resolved from the shared registry; loads lazily in the calling thread
+        return self._model or model_registry.get(CROSS_ENCODER)
+
+    def _predict(self, pairs: list):
+        return self.model.predict(pairs)
+
+    @staticmethod
+    def _hash(text: str) -> str:
+        return hashlib.sha256(text.encode()).hexdigest()
+
+    @classmethod
+    def _cache_key(cls, query: str, doc: str) -> tuple:
+        norm_query = re.sub(r"\s+", " ", query).strip().lower()
+        return cls._hash(norm_query), cls._hash(doc)
 
-    def __init__(self, model):
-        self.model = model
+    async def score_documents(self, query: str, documents: list[str]) -> list[float]:
+        """Cross-encoder score per (query, doc) pair, computing only uncached pairs."""
+        keys = [self._cache_key(query, doc) for doc in documents]
+        scores = [self._score_cache.get(key) for key in keys]
+        missing = [i for i, score in enumerate(scores) if score is None]
 
-    async def rank_documents(self, query: str, documents: list[str], top_k: int = 3):
+        self._counters["cache_hits"] += len(documents) - len(missing)
+        self._counters["cache_misses"] += len(missing)
+
+        if missing:
+            # Prepare pairs for the cross-encoder
+            pairs = [[query, documents[i]] for i in missing]
+
+            # Use the thread pool to avoid blocking
+            loop = asyncio.get_event_loop()
+            predicted = await loop.run_in_executor(self._executor, self._predict, pairs)
+            for i, score in zip(missing, predicted):
+                scores[i] = float(score)
+                self._score_cache.set(keys[i], scores[i])
+
+        return scores
+
+    @staticmethod
+    def _has_clear_margin(retrieval_scores: list[float], top_k: int) -> bool:
+        """True when the k-th retrieval score beats the (k+1)-th by the configured margin."""
+        if len(retrieval_scores) <= top_k:
+            return False
+        ordered = sorted(retrieval_scores, reverse=True)
+        scale = abs(ordered[0]) or 1.0
+        return (ordered[top_k - 1] - ordered[top_k]) / scale >= (
+            settings.RERANK_CASCADE_MARGIN
+        )
+
+    async def rank_documents(
+        self,
+        query: str,
+        documents: list[str],
+        top_k: int = 3,
+        retrieval_scores: list[float] = None,
+        return_scores: bool = False,
+    ):
         """
         Takes a query and a list of docs, and returns them sorted by relevance.
+        With return_scores=True each item is {"content", "score", "scorer"} so
+        callers can threshold on the score.
         """
         if not documents:
             return []
 
-        # Prepare pairs for the cross-encoder
-        pairs = [[query, doc] for doc in documents]
-
-        # Use the thread pool to avoid blocking
-        loop = asyncio.get_event_loop()
-        scores = await loop.run_in_executor(self._executor, self.model.predict, pairs)
+        if (
+            settings.RERANK_CASCADE
+            and retrieval_scores is not None
+            and self._has_clear_margin(retrieval_scores, top_k)
+        ):
+            self._counters["cascade_skips"] += 1
+            scores, scorer = [float(s) for s in retrieval_scores], "retrieval"
+        else:
+            scores = await self.score_documents(query, documents)
+            scorer = "cross_encoder"
 
         # Sort and return
         scored_docs = sorted(zip(scores, documents), reverse=True, key=lambda x: x[0])
+        if return_scores:
+            return [
+                {"content": doc, "score": score, "scorer": scorer}
+                for score, doc in scored_docs[:top_k]
+            ]
         return [doc for score, doc in scored_docs[:top_k]]
+
+    @classmethod
+    def stats(cls) -> dict:
+        return {**cls._counters, "cache_size": len(cls._score_cache)}
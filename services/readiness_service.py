@@ -0,0 +1,45 @@
+import time
+from typing import Iterable, Optional
+
+from utils.logger import logger
+
+
+class ReadinessTracker:
+    """
+    Tracks the warm status of each startup component (vector index, models,
+    database, redis) so /readyz can report them individually.
+    """
+
+    def __init__(self, components: Iterable[str], started_at: float):
+        self.started_at = started_at
+        self.ready_at: Optional[float] = None
+        self.components = {
+            name: {"status": "pending", "seconds": None, "error": None}
+            for name in components
+        }
+
+    @property
+    def ready(self) -> bool:
+        return all(c["status"] == "ready" for c in self.components.values())
+
+    def mark_ready(self, name: str, seconds: float):
+        self.components[name].update(status="ready", seconds=round(seconds, 3))
+        logger.info(f"Warm-up: {name} ready in {seconds:.2f}s")
+        if self.ready and self.ready_at is None:
+            self.ready_at = time.perf_counter()
+            logger.info(
+                f"cold_start_to_ready_seconds={self.ready_at - self.started_at:.2f}"
+            )
+
+    def mark_failed(self, name: str, error: Exception):
+        self.components[name].update(status="failed", error=str(error))
+        logger.error(f"Warm-up: {name} failed: {error}")
+
+    def report(self) -> dict:
+        return {
+            "ready": self.ready,
+            "cold_start_to_ready_seconds": round(self.ready_at - self.started_at, 3)
+            if self.ready_at
+            else None,
+            "components": self.components,
+        }
@@ -1,47 +1,222 @@
 from redis.asyncio import Redis
+from redis.asyncio.lock import Lock
 import json
 import hashlib
+from typing import Dict, List
 
 from config import settings
+from utils import codec
+from services.history_compactor import history_compactor
 
 MAX_MESSAGE = settings.REDIS_MAX_MESSAGES
 
+# Key families reported by memory_report
+MEMORY_KEY_GROUPS = {
+    "sessions": "session_*",
+    "session_locks": "session_*:lock",
+    "embeddings": "embedding:*",
+    "doc_embeddings": "doc_embedding:*",
+    "semantic_cache": "semantic_cache:*",
+    "plan_cache": "plan_cache:*",
+    "cache_versions": "cache_version:*",
+}
+
 
 class RedisService:
-    def __init__(self, redis_client: Redis):
+    def __init__(self, redis_client: Redis, binary_client: Redis = None):
         self.redis_client = redis_client
+        # Sessions and embeddings are stored compactly encoded, so they need a
+        # client created with decode_responses=False
+        self.binary_client = binary_client or redis_client
 
-    async def get_redis(self, userid: int):
-        state_json = await self.redis_client.get(f"session_{userid}")
-        if state_json:
-            state = json.loads(state_json)
-            if isinstance(state, dict):
-                return state
-            else:
-                return {"messages": state}
-        return {"messages": [], "title": None}
-
-    async def set_redis(self, userid: int, result: dict, title: str):
+    @staticmethod
+    def _session_keys(userid: int) -> dict:
         session_id = f"session_{userid}"
-        messages = result.get("messages", [])
+        return {
+            # Pre-list sessions stored everything as one JSON blob under session_id
+            "legacy": session_id,
+            "messages": f"{session_id}:messages",
+            "meta": f"{session_id}:meta",
+        }
+
+    def session_lock(self, userid: int) -> Lock:
+        """Held for a whole turn so one user's concurrent requests run in order."""
+        return self.redis_client.lock(
+            f"session_{userid}:lock",
+            timeout=settings.SESSION_LOCK_TIMEOUT,
+            blocking_timeout=settings.SESSION_LOCK_WAIT,
+        )
+
+    async def get_redis(self, userid: int):
+        """Reads the message list and the title/constraints hash in one round-trip."""
+        keys = self._session_keys(userid)
+        pipe = self.binary_client.pipeline(transaction=False)
+        pipe.lrange(keys["messages"], 0, -1)
+        pipe.hgetall(keys["meta"])
+        pipe.get(keys["legacy"])
+        # Reading a session slides its TTL
+        pipe.expire(keys["messages"], settings.SESSION_TTL)
+        pipe.expire(keys["meta"], settings.SESSION_TTL)
+        messages, meta, legacy, _, _ = await pipe.execute()
 
-        if len(messages) > MAX_MESSAGE:
-            updated_list_of_messages = messages[-MAX_MESSAGE:]
-        else:
-            updated_list_of_messages = messages
+        if legacy and not messages and not meta:
+            return await self._migrate_legacy_session(userid, legacy)
 
-        await self.redis_client.set(
-            session_id,
-            json.dumps({"messages": updated_list_of_messages, "title": title}),
+        title = meta.get(b"title")
+        constraints = meta.get(b"constraints")
+        history = meta.get(b"history")
+        return {
+            "messages": [codec.decode(m) for m in messages],
+            "title": title.decode() if title else None,
+            "constraints": codec.decode(constraints) if constraints else None,
+            # Compacted prompt lines; None for sessions saved before they existed
+            "history": codec.decode(history) if history else None,
+        }
+
+    async def _migrate_legacy_session(self, userid: int, state_json: bytes) -> dict:
+        state = json.loads(state_json)
+        if not isinstance(state, dict):
+            state = {"messages": state}
+        session = {
+            "messages": state.get("messages") or [],
+            "title": state.get("title"),
+            "constraints": state.get("constraints"),
+        }
+        await self.set_redis(userid, session, session["title"])
+        return session
+
+    @staticmethod
+    def _messages_to_keep(sizes: List[int], budget: int) -> int:
+        """How many of the newest messages fit in MAX_MESSAGE and the byte budget."""
+        keep, total = 0, 0
+        for size in reversed(sizes[-MAX_MESSAGE:]):
+            # The newest message is always kept, even if it is over budget alone
+            if keep and total + size > budget:
+                break
+            total += size
+            keep += 1
+        return keep
+
+    async def set_redis(
+        self, userid: int, result: dict, title: str, history_len: int = 0
+    ):
+        """
+        Appends the turn's new messages (those after the first history_len, which
+        are already stored) and updates title and constraints, in one atomic
+        round-trip. The list is trimmed to the newest messages that fit both
+        MAX_MESSAGE and SESSION_MAX_BYTES, and the session TTL is refreshed.
+        The compacted history for the next turn's prompts is stored alongside.
+        """
+        keys = self._session_keys(userid)
+        min_bytes = settings.SESSION_COMPRESS_MIN_BYTES
+        # Re-encoding the stored history is cheap and gives the exact stored sizes
+        encoded = [codec.encode(m, min_bytes) for m in result.get("messages", [])]
+        meta = {
+            "title": title or "",
+            "constraints": codec.encode(result.get("constraints"), min_bytes),
+        }
+        meta_bytes = sum(len(v) for v in meta.values())
+        keep = self._messages_to_keep(
+            [len(m) for m in encoded], settings.SESSION_MAX_BYTES - meta_bytes
         )
+        kept_messages = result.get("messages", [])[-keep:] if keep else []
+        meta["history"] = codec.encode(history_compactor.compact(kept_messages))
 
-    async def set_emb_cache(self, user_query: str, embedding_vectors: dict):
+        pipe = self.binary_client.pipeline(transaction=True)
+        if encoded[history_len:]:
+            pipe.rpush(keys["messages"], *encoded[history_len:])
+        if keep:
+            pipe.ltrim(keys["messages"], -keep, -1)
+        pipe.hset(keys["meta"], mapping=meta)
+        pipe.expire(keys["messages"], settings.SESSION_TTL)
+        pipe.expire(keys["meta"], settings.SESSION_TTL)
+        pipe.delete(keys["legacy"])
+        await pipe.execute()
+
+    @staticmethod
+    def _emb_cache_key(user_query: str) -> str:
         norm_user_query = user_query.strip().lower()
-        key = f"embedding:{hashlib.sha256(norm_user_query.encode()).hexdigest()}"
-        await self.redis_client.set(key, json.dumps(embedding_vectors), ex=86400)
+        return f"embedding:{hashlib.sha256(norm_user_query.encode()).hexdigest()}"
+
+    async def set_emb_cache(self, user_query: str, embedding_vectors: dict):
+        await self.binary_client.set(
+            self._emb_cache_key(user_query),
+            codec.encode(embedding_vectors, settings.SESSION_COMPRESS_MIN_BYTES),
+            ex=settings.EMB_CACHE_REDIS_TTL,
+        )
 
     async def get_emb_cache(self, user_query: str):
-        norm_user_query = user_query.strip().lower()
-        key = f"embedding:{hashlib.sha256(norm_user_query.encode()).hexdigest()}"
-        cached_data = await self.redis_client.get(key)
-        return json.loads(cached_data) if cached_data else None
+        # GETEX slides the TTL so frequently asked queries stay cached
+        cached_data = await self.binary_client.getex(
+            self._emb_cache_key(user_query), ex=settings.EMB_CACHE_REDIS_TTL
+        )
+        return codec.decode(cached_data) if cached_data else None
+
+    async def get_doc_emb_cache_many(self, text_hashes: List[str]) -> Dict[str, dict]:
+        """Cached document embeddings by text hash, in one round-trip."""
+        if not text_hashes:
+            return {}
+        values = await self.binary_client.mget(
+            [f"doc_embedding:{h}" for h in text_hashes]
+        )
+        return {h: codec.decode(v) for h, v in zip(text_hashes, values) if v}
+
+    async def set_doc_emb_cache_many(self, embeddings: Dict[str, dict]):
+        pipe = self.binary_client.pipeline(transaction=False)
+        for text_hash, vectors in embeddings.items():
+            pipe.set(
+                f"doc_embedding:{text_hash}",
+                codec.encode(vectors, settings.SESSION_COMPRESS_MIN_BYTES),
+                ex=settings.DOC_EMB_CACHE_TTL,
+            )
+        await pipe.execute()
+
+    async def get_cache_version(self, namespace: str) -> int:
+        version = await self.redis_client.get(f"cache_version:{namespace}")
+        return int(version) if version else 0
+
+    async def bump_cache_version(self, namespace: str) -> int:
+        """Invalidates every cache entry stamped with the previous version."""
+        return await self.redis_client.incr(f"cache_version:{namespace}")
+
+    async def memory_report(self, sample_size: int = 200) -> dict:
+        """
+        Key counts per key family, with memory usage and TTL coverage measured on
+        a sample of each family's keys and extrapolated to the whole family.
+        """
+        report = {}
+        for group, pattern in MEMORY_KEY_GROUPS.items():
+            count, sample = 0, []
+            async for key in self.redis_client.scan_iter(match=pattern, count=1000):
+                if group == "sessions" and key.endswith(":lock"):
+                    # Counted under session_locks
+                    continue
+                count += 1
+                if len(sample) < sample_size:
+                    sample.append(key)
+
+            pipe = self.redis_client.pipeline(transaction=False)
+            for key in sample:
+                pipe.memory_usage(key)
+                pipe.ttl(key)
+            results = await pipe.execute()
+            sizes = sorted(size or 0 for size in results[0::2])
+            avg = sum(sizes) / len(sizes) if sizes else 0
+            report[group] = {
+                "keys": count,
+                "sampled": len(sizes),
+                "avg_bytes": round(avg),
+                "p50_bytes": sizes[len(sizes) // 2] if sizes else 0,
+                "p95_bytes": sizes[int(len(sizes) * 0.95)] if sizes else 0,
+                "max_bytes": sizes[-1] if sizes else 0,
+                "estimated_total_bytes": round(avg * count),
+                "sampled_without_ttl": sum(1 for ttl in results[1::2] if ttl == -1),
+            }
+
+        info = await self.redis_client.info("memory")
+        report["server"] = {
+            "used_memory_bytes": info.get("used_memory"),
+            "used_memory_peak_bytes": info.get("used_memory_peak"),
+            "maxmemory_bytes": info.get("maxmemory"),
+        }
+        return report
@@ -0,0 +1,134 @@
+import heapq
+import itertools
+import re
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# travel_info records read like "mode-bus, duration hour-3"
+_TRAVEL_PATTERN = re.compile(
+    r"mode\s*-\s*([a-z ]+?)\s*,\s*duration\s+hours?\s*-\s*(\d+(?:\.\d+)?)"
+)
+
+# Above this the stop order is kept as given instead of searching permutations
+MAX_STOPS_TO_REORDER = 6
+
+
+class RouteGraph:
+    """
+    Weighted city graph over the ingested travel records (mode and hours per
+    direct connection), with Dijkstra for point-to-point routes and a brute-force
+    TSP over the intermediate stops, which is tiny for the allowed cities.
+
+    Legs are dicts with from_city, to_city, mode and hours; a leg that passes
+    through other cities is expanded into its direct connections.
+    """
+
+    def __init__(self):
+        self._edges: Dict[str, Dict[str, Tuple[float, str]]] = {}
+
+    @staticmethod
+    def parse_travel_text(text: str) -> Optional[Tuple[str, float]]:
+        match = _TRAVEL_PATTERN.search(text.lower())
+        if not match:
+            return None
+        return match.group(1).strip(), float(match.group(2))
+
+    @classmethod
+    def from_records(cls, records: Iterable[Tuple[str, str, str]]) -> "RouteGraph":
+        """Builds the graph from (from_city, to_city, travel text) records."""
+        graph = cls()
+        for from_city, to_city, text in records:
+            parsed = cls.parse_travel_text(text)
+            if parsed:
+                graph.add_edge(from_city, to_city, hours=parsed[1], mode=parsed[0])
+        # Assume travel is symmetric where only one direction was recorded
+        for from_city, neighbours in list(graph._edges.items()):
+            for to_city, (hours, mode) in list(neighbours.items()):
+                graph._edges.setdefault(to_city, {}).setdefault(
+                    from_city, (hours, mode)
+                )
+        return graph
+
+    def add_edge(self, from_city: str, to_city: str, hours: float, mode: str):
+        current = self._edges.setdefault(from_city, {}).get(to_city)
+        if current is None or hours < current[0]:
+            self._edges[from_city][to_city] = (hours, mode)
+
+    def __len__(self) -> int:
+        return sum(len(neighbours) for neighbours in self._edges.values())
+
+    def shortest_path(self, source: str, target: str) -> Optional[List[dict]]:
+        if source == target:
+            return []
+        if source not in self._edges:
+            return None
+
+        best = {source: 0.0}
+        previous: Dict[str, str] = {}
+        heap = [(0.0, source)]
+        while heap:
+            hours, city = heapq.heappop(heap)
+            if city == target:
+                break
+            if hours > best[city]:
+                continue
+            for neighbour, (edge_hours, _) in self._edges.get(city, {}).items():
+                candidate = hours + edge_hours
+                if candidate < best.get(neighbour, float("inf")):
+                    best[neighbour] = candidate
+                    previous[neighbour] = city
+                    heapq.heappush(heap, (candidate, neighbour))
+
+        if target not in best:
+            return None
+        path = [target]
+        while path[-1] != source:
+            path.append(previous[path[-1]])
+        path.reverse()
+        return [self._leg(a, b) for a, b in zip(path, path[1:])]
+
+    def _leg(self, from_city: str, to_city: str) -> dict:
+        hours, mode = self._edges[from_city][to_city]
+        return {"from_city": from_city, "to_city": to_city, "mode": mode, "hours": hours}
+
+    def plan_route(
+        self, start: str, end: str, stops: Iterable[str] = ()
+    ) -> Optional[List[dict]]:
+        """
+        Fastest route from start to end visiting every stop, or None if some
+        city is unreachable. Stops are reordered to minimize total hours.
+        """
+        stops = [s for s in dict.fromkeys(stops) if s not in (start, end)]
+        cities = [start, *stops, end]
+        paths = {}
+        for a, b in itertools.permutations(cities, 2):
+            path = self.shortest_path(a, b)
+            if path is None:
+                return None
+            paths[a, b] = path
+
+        orders = (
+            itertools.permutations(stops)
+            if len(stops) <= MAX_STOPS_TO_REORDER
+            else [tuple(stops)]
+        )
+        best_order, best_hours = None, float("inf")
+        for order in orders:
+            route = [start, *order, end]
+            hours = sum(
+                leg["hours"] for a, b in zip(route, route[1:]) for leg in paths[a, b]
+            )
+            if hours < best_hours:
+                best_order, best_hours = route, hours
+
+        return [leg for a, b in zip(best_order, best_order[1:]) for leg in paths[a, b]]
+
+    @staticmethod
+    def describe(legs: List[dict]) -> List[str]:
+        """One line per leg for the planning prompt."""
+        lines = [
+            f"{leg['from_city']} -> {leg['to_city']}: {leg['mode']}, {leg['hours']:g} hours"
+            for leg in legs
+        ]
+        if len(legs) > 1:
+            lines.append(f"total travel: {sum(leg['hours'] for leg in legs):g} hours")
+        return lines
@@ -0,0 +1,215 @@
+import base64
+import json
+import time
+import uuid
+from typing import Optional
+
+import numpy as np
+from redis.asyncio import Redis
+
+from config import settings
+from services.redis_service import RedisService
+from utils.logger import logger
+
+
+class _Mirror:
+    """Per-process normalized embedding matrix of a namespace version."""
+
+    def __init__(
+        self, version: int, generation: str, ids: list, matrix: np.ndarray, applied: int
+    ):
+        self.version = version
+        self.generation = generation
+        self.ids = ids
+        self.matrix = matrix
+        # How many ids of the generation's add log are in the matrix
+        self.applied = applied
+
+
+class SemanticCacheService:
+    """
+    Caches final answers keyed by the query embedding and serves them for new
+    queries whose cosine similarity to a cached one passes the threshold.
+
+    Redis is the shared store: a hash of entries plus a sorted set of last-access
+    times used for idle-TTL and LRU eviction. Each worker keeps a local matrix of
+    the cached embeddings. New entries are also appended to an add log, which
+    workers apply incrementally; the matrix is only reloaded in full when the
+    generation token changes, i.e. when entries are evicted. Entries live under
+    the namespace's cache version, so bumping the version (e.g. on re-ingesting
+    company.txt) invalidates them all at once. The keys expire TTL seconds after
+    the last store or hit, which cleans up versions that are no longer used.
+    """
+
+    _mirrors: dict = {}
+    _counters = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+
+    def __init__(
+        self,
+        redis_client: Redis,
+        namespace: str,
+        threshold: float = None,
+        ttl: int = None,
+        max_entries: int = None,
+    ):
+        self.redis_client = redis_client
+        self.redis_service = RedisService(redis_client=redis_client)
+        self.namespace = namespace
+        self.threshold = threshold or settings.SEMANTIC_CACHE_THRESHOLD
+        self.ttl = ttl or settings.SEMANTIC_CACHE_TTL
+        self.max_entries = max_entries or settings.SEMANTIC_CACHE_MAX_ENTRIES
+
+    def _keys(self, version: int) -> dict:
+        prefix = f"semantic_cache:{self.namespace}:{version}"
+        return {
+            "entries": f"{prefix}:entries",
+            "lru": f"{prefix}:lru",
+            "generation": f"{prefix}:generation",
+            "added": f"{prefix}:added",
+        }
+
+    @staticmethod
+    def _normalize(vector) -> np.ndarray:
+        vector = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    @staticmethod
+    def _encode_vector(vector: np.ndarray) -> str:
+        return base64.b64encode(vector.astype(np.float32).tobytes()).decode()
+
+    @staticmethod
+    def _decode_vector(data: str) -> np.ndarray:
+        return np.frombuffer(base64.b64decode(data), dtype=np.float32)
+
+    def _decode_entries(self, entries: list) -> np.ndarray:
+        if not entries:
+            return np.empty((0, settings.EMBEDDING_DIMENSION), dtype=np.float32)
+        return np.stack(
+            [self._decode_vector(json.loads(entry)["embedding"]) for entry in entries]
+        )
+
+    async def _load_mirror(self, version: int) -> _Mirror:
+        keys = self._keys(version)
+        mirror = self._mirrors.get(self.namespace)
+
+        if mirror and mirror.version == version:
+            pipe = self.redis_client.pipeline(transaction=True)
+            pipe.get(keys["generation"])
+            pipe.lrange(keys["added"], mirror.applied, -1)
+            generation, added = await pipe.execute()
+            if generation == mirror.generation:
+                if added:
+                    # Only fetch the entries stored since the last lookup
+                    entries = await self.redis_client.hmget(keys["entries"], added)
+                    new = [(i, e) for i, e in zip(added, entries) if e is not None]
+                    if new:
+                        mirror.ids = mirror.ids + [i for i, _ in new]
+                        mirror.matrix = np.vstack(
+                            [mirror.matrix, self._decode_entries([e for _, e in new])]
+                        )
+                    mirror.applied += len(added)
+                return mirror
+
+        pipe = self.redis_client.pipeline(transaction=True)
+        pipe.get(keys["generation"])
+        pipe.hgetall(keys["entries"])
+        pipe.llen(keys["added"])
+        generation, entries, applied = await pipe.execute()
+        ids = list(entries)
+        matrix = self._decode_entries([entries[i] for i in ids])
+        mirror = _Mirror(version, generation, ids, matrix, applied)
+        self._mirrors[self.namespace] = mirror
+        return mirror
+
+    async def lookup(self, embedding: list) -> Optional[str]:
+        """Cached answer for the most similar query above the threshold, if any."""
+        version = await self.redis_service.get_cache_version(self.namespace)
+        mirror = await self._load_mirror(version)
+
+        if not mirror.ids:
+            self._counters["misses"] += 1
+            return None
+
+        similarities = mirror.matrix @ self._normalize(embedding)
+        best = int(np.argmax(similarities))
+        if similarities[best] < self.threshold:
+            self._counters["misses"] += 1
+            return None
+
+        keys = self._keys(version)
+        entry_id = mirror.ids[best]
+        now = time.time()
+        last_access = await self.redis_client.zscore(keys["lru"], entry_id)
+        entry = await self.redis_client.hget(keys["entries"], entry_id)
+        if entry is None or last_access is None or last_access < now - self.ttl:
+            # Evicted or idle past the TTL since the mirror was built
+            self._counters["misses"] += 1
+            return None
+
+        # A hit keeps the namespace alive, not just the entry's idle score
+        pipe = self.redis_client.pipeline(transaction=True)
+        pipe.zadd(keys["lru"], {entry_id: now})
+        for key in keys.values():
+            pipe.expire(key, self.ttl)
+        await pipe.execute()
+        self._counters["hits"] += 1
+        logger.info(
+            f"Semantic cache HIT ({self.namespace}) similarity={similarities[best]:.3f}"
+        )
+        return json.loads(entry)["answer"]
+
+    async def store(self, query: str, embedding: list, answer: str):
+        version = await self.redis_service.get_cache_version(self.namespace)
+        keys = self._keys(version)
+        now = time.time()
+        entry_id = uuid.uuid4().hex
+        entry = {
+            "query": query,
+            "answer": answer,
+            "embedding": self._encode_vector(self._normalize(embedding)),
+        }
+
+        # Evict idle entries, then the least recently used beyond max_entries
+        expired = await self.redis_client.zrangebyscore(
+            keys["lru"], "-inf", now - self.ttl
+        )
+        live = await self.redis_client.zcard(keys["lru"]) - len(expired)
+        overflow = max(0, live + 1 - self.max_entries)
+        evicted = list(expired)
+        if overflow:
+            # Expired ids have the lowest scores, so the oldest live ones follow them
+            evicted += await self.redis_client.zrange(
+                keys["lru"], len(expired), len(expired) + overflow - 1
+            )
+
+        pipe = self.redis_client.pipeline(transaction=True)
+        if evicted:
+            pipe.hdel(keys["entries"], *evicted)
+            pipe.zrem(keys["lru"], *evicted)
+        if evicted or not live:
+            # Removals (or a namespace that expired while idle) make workers
+            # reload in full; a fresh token cannot collide with an old one
+            pipe.set(keys["generation"], uuid.uuid4().hex)
+            pipe.delete(keys["added"])
+        pipe.hset(keys["entries"], entry_id, json.dumps(entry))
+        pipe.zadd(keys["lru"], {entry_id: now})
+        pipe.rpush(keys["added"], entry_id)
+        for key in keys.values():
+            pipe.expire(key, self.ttl)
+        await pipe.execute()
+
+        self._counters["stores"] += 1
+        self._counters["evictions"] += len(evicted)
+
+    @classmethod
+    def stats(cls) -> dict:
+        lookups = cls._counters["hits"] + cls._counters["misses"]
+        return {
+            **cls._counters,
+            "hit_rate": round(cls._counters["hits"] / lookups, 3) if lookups else 0.0,
+            "mirrors": {
+                ns: {"version": m.version, "entries": len(m.ids)}
+                for ns, m in cls._mirrors.items()
+            },
+        }
@@ -1,53 +1,228 @@
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Callable, Optional
+from pydantic import ValidationError
+from langchain_core.output_parsers import JsonOutputParser
 from services.base_rag import BaseRagService
-from schemas.rag_schemas import TourConstraints, MissingConstraints, TourPlan
+from schemas.rag_schemas import TourConstraints, MissingConstraints, TourPlan, DayPlan
 from utils.logger import logger
 from prompts.ai_prompts import AIPrompts
+from services.constraint_extractor import ConstraintExtractor
+from services.plan_cache_service import PlanCacheService
+from services.lookup_store import lookup_store
+from services.route_graph import RouteGraph
+from services.metadata_index import MetadataIndex
+from services.history_compactor import history_compactor, HistoryCompactor
+from utils.tokens import log_prompt_tokens
+from services.context_packer import context_packer
 import asyncio
-from pinecone_text.sparse import SpladeEncoder
 from config import settings
 
-sparse_encoder = SpladeEncoder()
-
 
 class TourPlannerService(BaseRagService):
     ALLOWED_CITIES = settings.ALLOWED_CITIES
+    REQUIRED_CONSTRAINTS = ("days", "from_city", "to_city")
+    constraint_extractor = ConstraintExtractor(ALLOWED_CITIES)
+
+    def __init__(self, *args, plan_cache: PlanCacheService = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.plan_cache = plan_cache
 
-    async def run(self, user_query: str, message_history: list):
+    async def run(
+        self,
+        user_query: str,
+        message_history: list,
+        constraints: dict = None,
+        on_day_plan: Optional[Callable[[dict], None]] = None,
+        regenerate: bool = False,
+        history: list = None,
+    ):
         """
         Main entry point for tour planning.
+        Returns the response and the updated constraints to keep in the session.
+        on_day_plan is called with each DayPlan as soon as it is fully generated.
+        regenerate skips the plan cache and always asks the LLM for a new plan.
+        history is the session's compacted history, used in place of the raw
+        messages in LLM prompts.
         """
-        # 1. Extract constraints
-        entity_metadata = await self._get_tour_constraints(user_query, message_history)
-        missing_constraints = [k for k, v in entity_metadata.items() if v is None]
+        # 1. Extract constraints (only what the new message changes, if we have some)
+        entity_metadata = await self._get_tour_constraints(
+            user_query, message_history, constraints, history
+        )
+        missing_constraints = [
+            k for k in self.REQUIRED_CONSTRAINTS if entity_metadata.get(k) is None
+        ]
 
         if missing_constraints:
-            return await self._handle_missing_constraints(missing_constraints)
+            response = await self._handle_missing_constraints(missing_constraints)
+            return response, entity_metadata
+
+        # 2. Compute the route, then fetch attractions and hotels for the
+        # destination and every stop (travel hours only without a route)
+        route = self._plan_route(entity_metadata)
+        cities = [entity_metadata["to_city"], *(entity_metadata.get("stops") or [])]
+        fetches = [
+            self._fetch_data(user_query, city, data_type)
+            for city in cities
+            for data_type in ("tour_attraction", "hotels")
+        ]
+        if route is None:
+            fetches.append(self._fetch_travel_hours(user_query, entity_metadata))
+        results = await asyncio.gather(*fetches)
+        attractions = [r for records in results[0 : 2 * len(cities) : 2] for r in records]
+        hotels = [r for records in results[1 : 2 * len(cities) : 2] for r in records]
+        travel_info = results[2 * len(cities)] if route is None else []
+        route_legs = RouteGraph.describe(route) if route else None
 
-        # 2. Fetch relevant data from vector store
-        attractions, travel_info, hotels = await asyncio.gather(
-            self._fetch_data(user_query, entity_metadata, "tour_attraction"),
-            self._fetch_travel_hours(user_query, entity_metadata),
-            self._fetch_data(user_query, entity_metadata, "hotels"),
+        # 3. Serve a memoized plan for the same trip and context
+        regenerate = regenerate or "regenerate" in user_query.lower()
+        context_hash = PlanCacheService.context_hash(
+            attractions, travel_info, hotels, route_legs
         )
+        if self.plan_cache and regenerate:
+            PlanCacheService.record_bypass()
+        elif self.plan_cache:
+            cached_plan = await self.plan_cache.get(entity_metadata, context_hash)
+            if cached_plan:
+                response = self._personalize_plan(cached_plan, entity_metadata)
+                if on_day_plan:
+                    for day in response["response"]:
+                        on_day_plan(day)
+                return response, entity_metadata
 
-        # 3. Generate the tour plan
+        # 4. Generate the tour plan from the packed context
+        packed = context_packer.pack(
+            {
+                "attractions": attractions,
+                "hotels": hotels,
+                "travel": route_legs or travel_info,
+            }
+        )
         prompt = AIPrompts.get_planning_prompt(
-            user_query, entity_metadata, attractions, travel_info, hotels
+            user_query,
+            entity_metadata,
+            packed["attractions"],
+            packed["travel"],
+            packed["hotels"],
+            route=bool(route_legs),
+        )
+        log_prompt_tokens("planning", prompt)
+        response = await self._generate_plan(prompt, on_day_plan)
+
+        if self.plan_cache:
+            await self.plan_cache.set(entity_metadata, context_hash, response)
+        return response, entity_metadata
+
+    @staticmethod
+    def _plan_route(metadata: dict) -> Optional[List[dict]]:
+        """
+        Legs computed on the travel graph, or None if the trip cannot be routed
+        or has no legs (start and end are the same city and there are no stops).
+        """
+        graph = lookup_store.route_graph()
+        if not len(graph):
+            return None
+        route = graph.plan_route(
+            MetadataIndex.normalize_value(metadata["from_city"]),
+            MetadataIndex.normalize_value(metadata["to_city"]),
+            [MetadataIndex.normalize_value(s) for s in metadata.get("stops") or []],
         )
-        structured_llm = self.llm.with_structured_output(TourPlan)
-        response = await structured_llm.ainvoke(prompt)
+        logger.info(f"Computed route ----> {route}")
+        return route or None
+
+    @staticmethod
+    def _personalize_plan(plan: dict, metadata: dict) -> dict:
+        """Small touch-ups so a shared cached plan reads as this user's plan."""
+        plan = dict(plan)
+        plan["title"] = f"Tour Plan for {metadata['from_city']} to {metadata['to_city']}"
+        plan["confirmation"] = plan.get("confirmation") or (
+            "Would you like to confirm this tour or regenerate the plan?"
+        )
+        return plan
+
+    async def _generate_plan(
+        self, prompt: str, on_day_plan: Optional[Callable[[dict], None]] = None
+    ) -> dict:
+        if on_day_plan is None:
+            structured_llm = self.llm.with_structured_output(TourPlan)
+            response = await structured_llm.ainvoke(prompt)
+            return response.model_dump()
+
+        # Structured output only yields a TourPlan once the whole object validates,
+        # so stream the raw JSON instead and validate each day on its own
+        parser = JsonOutputParser(pydantic_object=TourPlan)
+        chain = self.llm | parser
+        emitted = 0
+        plan = None
+        async for partial in chain.astream(
+            f"{prompt}\n\n{parser.get_format_instructions()}"
+        ):
+            if not isinstance(partial, dict):
+                continue
+            plan = partial
+            days = partial.get("response") or []
+            # The last day may still be partial; everything before it is final
+            for day in days[emitted:-1]:
+                try:
+                    on_day_plan(DayPlan.model_validate(day).model_dump())
+                except ValidationError:
+                    break
+                emitted += 1
 
-        return response.model_dump()
+        plan = TourPlan.model_validate(plan)
+        for day in plan.response[emitted:]:
+            on_day_plan(day.model_dump())
+        return plan.model_dump()
 
     async def _get_tour_constraints(
-        self, user_query: str, message_history: list
+        self,
+        user_query: str,
+        message_history: list,
+        previous: dict = None,
+        history: list = None,
+    ) -> Dict[str, Any]:
+        if settings.RULE_BASED_CONSTRAINTS:
+            constraints, confident = self.constraint_extractor.extract(
+                user_query, message_history, previous=previous
+            )
+            logger.info(
+                f"Rule-based constraints ----> {constraints} (confident: {confident})"
+            )
+            if confident:
+                # The rules only read days/cities; keep the stops already agreed
+                if previous and previous.get("stops"):
+                    constraints["stops"] = previous["stops"]
+                return constraints
+
+        if previous:
+            return await self._update_tour_constraints_with_llm(user_query, previous)
+        if history is None:
+            history = history_compactor.compact(message_history)
+        return await self._get_tour_constraints_with_llm(user_query, history)
+
+    async def _update_tour_constraints_with_llm(
+        self, user_query: str, previous: dict
+    ) -> Dict[str, Any]:
+        """Asks only which fields the new message changes; the prompt size stays flat."""
+        prompt = AIPrompts.get_tour_constraint_update_prompt(
+            user_query=user_query,
+            current_constraints=previous,
+            allowed_cities=self.ALLOWED_CITIES,
+        )
+        log_prompt_tokens("planning.constraints", prompt)
+        structured_llm = self.llm.with_structured_output(TourConstraints)
+        changes = await structured_llm.ainvoke(prompt)
+        updated = TourConstraints(**previous).model_dump()
+        updated.update({k: v for k, v in changes.model_dump().items() if v is not None})
+        return updated
+
+    async def _get_tour_constraints_with_llm(
+        self, user_query: str, history: list
     ) -> Dict[str, Any]:
         prompt = AIPrompts.get_tour_constraint_prompt(
             user_query=user_query,
-            message_history=message_history,
+            message_history=HistoryCompactor.render(history),
             allowed_cities=self.ALLOWED_CITIES,
         )
+        log_prompt_tokens("planning.constraints", prompt)
         structured_llm = self.llm.with_structured_output(TourConstraints)
         entity = await structured_llm.ainvoke(prompt)
         return entity.model_dump()
@@ -61,25 +236,34 @@ class TourPlannerService(BaseRagService):
         missing_constraints_resp = await structured_llm.ainvoke(prompt)
         return missing_constraints_resp.model_dump()
 
-    async def _fetch_data(self, query: str, metadata: dict, data_type: str):
+    async def _fetch_data(self, query: str, city: str, data_type: str, k=3):
+        city = city.strip().lower()
+        records = lookup_store.city_records(data_type, city)
+        if records and len(records) <= k:
+            return records
+
+        # Vector search only ranks the city's records against the free-text query
         results = await self.hybrid_search(
             query=query,
-            k=3,
-            filter={
-                "city": metadata["to_city"].strip().lower(),
-                "type": data_type,
-            },
+            k=k,
+            filter={"city": city, "type": data_type},
         )
-        return [match["metadata"]["content"] for match in results["matches"]]
+        return [match["metadata"] for match in results["matches"]]
 
     async def _fetch_travel_hours(self, query: str, metadata: dict):
+        records = lookup_store.travel(metadata["from_city"], metadata["to_city"])
+        if records:
+            return records
+
+        # Not in the lookup store (e.g. ingested before it existed)
         results = await self.hybrid_search(
             query=query,
             k=3,
+            # from_city/to_city only exist on travel records, so they identify
+            # them regardless of the filename-derived "type" at ingestion
             filter={
                 "to_city": metadata["to_city"].strip().lower(),
                 "from_city": metadata["from_city"].strip().lower(),
-                "type": "travel_hour",
             },
         )
-        return [match["metadata"]["content"] for match in results["matches"]]
+        return [match["metadata"] for match in results["matches"]]
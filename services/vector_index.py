@@ -0,0 +1,10 @@
+from config import settings
+from services.local_index_service import LocalIndexService
+from services.pinecone_service import pc_service
+
+
+def open_vector_index():
+    """The blocking index handle of the configured VECTOR_BACKEND."""
+    if settings.VECTOR_BACKEND == "local":
+        return LocalIndexService()
+    return pc_service.ensure_index()
@@ -0,0 +1,7 @@
+import os
+import sys
+
+# database_setup builds its engine at import time; tests never connect to it
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,58 @@
+import pytest
+
+from config import settings
+from services.constraint_extractor import ConstraintExtractor
+
+
+@pytest.fixture
+def extractor():
+    return ConstraintExtractor(settings.ALLOWED_CITIES)
+
+
+@pytest.mark.parametrize(
+    "query, days",
+    [
+        ("3 days 2 nights in pokhara from kathmandu", 3),
+        ("3 days 3 nights in pokhara from kathmandu", 3),
+        ("2 nights in pokhara from kathmandu", 3),
+        ("a weekend in pokhara from kathmandu", 2),
+    ],
+)
+def test_days_and_nights_state_one_trip(extractor, query, days):
+    constraints, confident = extractor.extract(query)
+    assert confident
+    assert constraints["days"] == days
+
+
+def test_separate_day_counts_are_not_collapsed(extractor):
+    constraints, confident = extractor.extract(
+        "1 day in pokhara and 2 days in chitwan from kathmandu"
+    )
+    assert not confident
+    assert constraints["days"] is None
+
+
+@pytest.mark.parametrize(
+    "query",
+    [
+        "plan 5 days from kathmandu to lumbini and visit chitwan on the way",
+        "from kathmandu to pokhara for 3 days with a stop at chitwan",
+    ],
+)
+def test_two_destinations_are_left_to_the_llm(extractor, query):
+    _, confident = extractor.extract(query)
+    assert not confident
+
+
+def test_repeating_the_destination_stays_confident(extractor):
+    constraints, confident = extractor.extract(
+        "3 days in pokhara from kathmandu, hotels in pokhara"
+    )
+    assert confident
+    assert constraints["to_city"] == "pokhara"
+
+
+def test_nights_that_do_not_fit_the_days_are_not_confident(extractor):
+    constraints, confident = extractor.extract("3 days 5 nights in pokhara from kathmandu")
+    assert not confident
+    assert constraints["days"] is None
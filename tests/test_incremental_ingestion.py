@@ -0,0 +1,157 @@
+import asyncio
+import json
+
+import pytest
+
+pytest.importorskip("langchain_core")
+pytest.importorskip("langchain_text_splitters")
+pytest.importorskip("sqlalchemy")
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from config import settings
+from models.models import ChunkManifest
+from services.async_index_service import AsyncIndexService
+from services.chunk_manifest_service import ChunkManifestService
+from services.document_ingestion_service import DocumentProcessor, IngestDocumentService
+from services.ingestion_jobs import IngestionJob
+from services.local_index_service import LocalIndexService
+from services.lookup_store import lookup_store
+
+DIMENSION = 8
+
+
+class FakeEmbeddings:
+    def embed_documents(self, texts):
+        return [[1.0] * DIMENSION for _ in texts]
+
+
+def _encode_sparse(texts):
+    return [{"indices": [0], "values": [1.0]} for _ in texts]
+
+
+@pytest.fixture
+def session_factory():
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    ChunkManifest.__table__.create(engine)
+    return sessionmaker(bind=engine)
+
+
+@pytest.fixture
+def service(tmp_path, monkeypatch, session_factory):
+    monkeypatch.setattr(settings, "VECTOR_BACKEND", "local")
+    monkeypatch.setattr(lookup_store, "path", str(tmp_path / "lookup_store.json"))
+    monkeypatch.setattr(
+        IngestDocumentService, "_encode_sparse", staticmethod(_encode_sparse)
+    )
+    index = AsyncIndexService(LocalIndexService(str(tmp_path / "index"), DIMENSION))
+    yield IngestDocumentService(
+        pc_index=index,
+        emb_model=FakeEmbeddings(),
+        pc_service=None,
+        manifest=ChunkManifestService(session_factory, index_name="local:test"),
+    )
+    index.close()
+
+
+def _hotels(count: int = 5):
+    items = [{"city": "pokhara", "text": f"hotel {i}"} for i in range(count)]
+    return DocumentProcessor.process_json(json.dumps(items).encode(), "hotels.json")
+
+
+def _ingest(service, documents, filename="hotels.json") -> int:
+    return asyncio.run(service._process_and_upsert(documents, filename))
+
+
+def _vector_count(service) -> int:
+    return service.pc_index.describe_index_stats()["total_vector_count"]
+
+
+def test_unchanged_file_is_skipped(service):
+    assert _ingest(service, _hotels()) == 5
+    assert _ingest(service, _hotels()) == 0
+    assert _vector_count(service) == 5
+
+
+def test_reingest_after_delete_index_upserts_again(service):
+    assert _ingest(service, _hotels()) == 5
+
+    asyncio.run(service.reset_index())
+    assert _vector_count(service) == 0
+    assert lookup_store.city_records("hotels", "pokhara") == []
+
+    assert _ingest(service, _hotels()) == 5
+    assert _vector_count(service) == 5
+    assert len(lookup_store.city_records("hotels", "pokhara")) == 5
+
+
+def test_manifest_is_scoped_to_the_index(service, session_factory):
+    _ingest(service, _hotels())
+
+    other = ChunkManifestService(session_factory, index_name="pinecone:other")
+    assert other.load("hotels.json") == {}
+    assert len(service.manifest.load("hotels.json")) == 5
+
+
+def _policy(text: str, filename: str):
+    return DocumentProcessor.process_txt(text.encode(), filename)
+
+
+def test_txt_files_do_not_overwrite_each_other(service):
+    company = _policy("Refunds are issued within 7 days of cancellation.", "company.txt")
+    partner = _policy("Partner tours are non-refundable.", "partner.txt")
+    assert [d.metadata["filename"] for d in partner] == ["partner.txt"]
+
+    assert _ingest(service, company, "company.txt") == 1
+    assert _ingest(service, partner, "partner.txt") == 1
+    assert _vector_count(service) == 2
+
+    # Re-ingesting one file leaves the other's chunks and manifest alone
+    assert _ingest(service, company, "company.txt") == 0
+    assert set(service.manifest.load("company.txt")) == {"company.txt_0"}
+    assert set(service.manifest.load("partner.txt")) == {"partner.txt_0"}
+
+
+def test_local_index_is_written_once_per_job(service, tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "INGEST_BATCH_SIZE", 2)
+    writes = []
+    persist = LocalIndexService._persist
+    monkeypatch.setattr(
+        LocalIndexService, "_persist", lambda self: writes.append(1) or persist(self)
+    )
+    path = tmp_path / "hotels.json"
+    items = [{"city": "pokhara", "text": f"hotel {i}"} for i in range(5)]
+    path.write_text(json.dumps(items))
+
+    job = IngestionJob("hotels.json")
+    asyncio.run(service._run_job(str(path), "hotels.json", job))
+
+    assert job.processed_chunks == 5
+    assert len(writes) == 1
+    reopened = LocalIndexService(str(tmp_path / "index"), DIMENSION)
+    assert reopened.describe_index_stats()["total_vector_count"] == 5
+
+
+def test_unchanged_file_rebuilds_a_lost_lookup_store(service):
+    _ingest(service, _hotels())
+    # A fresh container: the manifest survives, the lookup snapshot does not
+    lookup_store.clear()
+
+    assert _ingest(service, _hotels()) == 0
+    assert len(lookup_store.city_records("hotels", "pokhara")) == 5
+
+
+def test_lost_local_index_is_reingested_in_full(service):
+    _ingest(service, _hotels())
+    # The index directory is gone but the manifest still lists its chunks
+    service.pc_index.index.delete(delete_all=True)
+
+    assert _ingest(service, _hotels()) == 5
+    assert _vector_count(service) == 5
+    assert len(service.manifest.load("hotels.json")) == 5
@@ -0,0 +1,46 @@
+import asyncio
+
+import pytest
+
+fakeredis = pytest.importorskip("fakeredis")
+
+from services.ingestion_jobs import COMPLETED, RUNNING, IngestionJobRegistry
+
+
+def test_a_job_can_be_polled_from_another_worker():
+    async def scenario():
+        redis_client = fakeredis.aioredis.FakeRedis(decode_responses=True)
+        worker, other = IngestionJobRegistry(), IngestionJobRegistry()
+        worker.attach(redis_client)
+        other.attach(redis_client)
+        release = asyncio.Event()
+
+        async def ingest(job):
+            job.start(4)
+            job.record_batch(4)
+            await release.wait()
+            job.finish()
+
+        job = worker.create("hotels.json")
+        task = await worker.run(job, ingest(job))
+        await asyncio.sleep(0)
+        polled = await other.get(job.job_id)
+
+        release.set()
+        await task
+        return job, polled, await other.get(job.job_id), await other.list()
+
+    job, polled, finished, listed = asyncio.run(scenario())
+    assert polled["status"] in ("queued", RUNNING)
+    assert finished["status"] == COMPLETED
+    assert finished["processed_chunks"] == 4
+    assert [j["job_id"] for j in listed] == [job.job_id]
+
+
+def test_unknown_job_is_none():
+    async def scenario():
+        registry = IngestionJobRegistry()
+        registry.attach(fakeredis.aioredis.FakeRedis(decode_responses=True))
+        return await registry.get("missing")
+
+    assert asyncio.run(scenario()) is None
@@ -0,0 +1,61 @@
+import asyncio
+
+from services.intent_classifier import INTENT_EXEMPLARS, LocalIntentClassifier
+from services.query_embedding_cache import query_embedding_cache
+
+LABELS = list(INTENT_EXEMPLARS)
+
+
+class FakeEmbeddingService:
+    """Exemplars embed one-hot by their label; every query embeds as planning."""
+
+    def __init__(self):
+        self.queries = []
+
+    async def get_embedding_async(self, text):
+        vector = [0.0] * len(LABELS)
+        for label, examples in INTENT_EXEMPLARS.items():
+            if text in examples:
+                vector[LABELS.index(label)] = 1.0
+        return vector
+
+    async def get_query_embeddings_async(self, text):
+        self.queries.append(text)
+        return {"dense": [0.0, 1.0, 0.0, 0.0], "sparse": {"indices": [], "values": []}}
+
+
+class FakeRedisService:
+    def __init__(self):
+        self.store = {}
+
+    async def get_emb_cache(self, query):
+        return self.store.get(query)
+
+    async def set_emb_cache(self, query, embeddings):
+        self.store[query] = embeddings
+
+
+def test_query_embedding_goes_through_the_query_cache():
+    class Classifier(LocalIntentClassifier):
+        _labels = None
+        _matrix = None
+        _build_lock = None
+
+    embedding_service = FakeEmbeddingService()
+    redis_service = FakeRedisService()
+    classifier = Classifier(embedding_service, redis_service)
+    query = "plan a week around the annapurna circuit"
+
+    async def run():
+        first = await classifier.predict(query)
+        second = await classifier.predict(query)
+        # The retrieval that follows classification hits the same entry
+        cached = await query_embedding_cache.get_or_compute(
+            query, redis_service, embedding_service.get_query_embeddings_async
+        )
+        return first, second, cached
+
+    first, second, cached = asyncio.run(run())
+    assert first[0] == second[0] == "planning"
+    assert embedding_service.queries == [query]
+    assert "sparse" in cached
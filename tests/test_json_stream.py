@@ -0,0 +1,33 @@
+import io
+import json
+
+import pytest
+
+from utils.json_stream import iter_json_array
+
+DOCUMENTS = [
+    "[12.34]",
+    "[1, -2.5e3, 0, 1234567890123]",
+    '[true, false, null, "x", 7]',
+    ' [ {"city": "pokhara", "price": 45.5}, [1, [2, 3]], "caf\\u00e9 ünïcode" ] ',
+    '{"city": "kathmandu", "nights": 3}',
+    "[]",
+    "[\n  3.14159\n]",
+]
+
+
+@pytest.mark.parametrize("document", DOCUMENTS)
+@pytest.mark.parametrize("read_size", [1, 2, 3, 4, 7, 64])
+def test_matches_json_loads_at_any_block_size(document, read_size):
+    stream = io.BytesIO(document.encode("utf-8"))
+    items = list(iter_json_array(stream, read_size=read_size))
+
+    expected = json.loads(document)
+    assert items == (expected if isinstance(expected, list) else [expected])
+
+
+@pytest.mark.parametrize("document", ["[1 2]", "[12.34", '"text"', "[1,]"])
+@pytest.mark.parametrize("read_size", [1, 4, 64])
+def test_invalid_documents_are_rejected(document, read_size):
+    with pytest.raises(ValueError):
+        list(iter_json_array(io.BytesIO(document.encode()), read_size=read_size))
@@ -0,0 +1,71 @@
+import pytest
+
+from services.metadata_index import MetadataIndex
+
+ROWS = [
+    {"city": "Pokhara", "type": "hotels", "level": 3},
+    {"city": "pokhara", "type": "tour_attraction", "level": 5},
+    {"city": "chitwan", "type": "hotels", "level": 5},
+    {"from_city": "kathmandu", "to_city": "pokhara", "type": "travel_info"},
+]
+
+
+@pytest.fixture
+def index():
+    index = MetadataIndex()
+    for row, metadata in enumerate(ROWS):
+        index.add(row, metadata)
+    return index
+
+
+def _search(index, filter):
+    """What LocalIndexService does: narrow by the index, then verify each row."""
+    candidates = index.candidates(filter)
+    rows = range(len(ROWS)) if candidates is None else sorted(candidates)
+    return [row for row in rows if MetadataIndex.matches(ROWS[row], filter)]
+
+
+@pytest.mark.parametrize(
+    "filter, rows",
+    [
+        ({"city": "pokhara"}, [0, 1]),
+        ({"city": " POKHARA "}, [0, 1]),
+        ({"city": {"$eq": "chitwan"}}, [2]),
+        ({"city": "pokhara", "type": "hotels"}, [0]),
+        ({"type": {"$in": ["hotels", "travel_info"]}}, [0, 2, 3]),
+        ({"$and": [{"city": "pokhara"}, {"type": {"$in": ["tour_attraction"]}}]}, [1]),
+        ({"from_city": "kathmandu", "to_city": "pokhara"}, [3]),
+        ({"city": "lumbini"}, []),
+    ],
+)
+def test_indexed_filters(index, filter, rows):
+    assert _search(index, filter) == rows
+    assert index.candidates(filter) == set(rows)
+
+
+def test_fields_that_are_not_indexed_are_checked_per_row(index):
+    # level is not indexed: the index narrows on type only
+    filter = {"type": "hotels", "level": 5}
+    assert index.candidates(filter) == {0, 2}
+    assert _search(index, filter) == [2]
+
+    assert index.candidates({"level": 5}) is None
+    assert _search(index, {"level": 5}) == [1, 2]
+
+
+def test_no_filter_does_not_narrow(index):
+    assert index.candidates(None) is None
+    assert MetadataIndex.matches(ROWS[0], None)
+
+
+def test_removed_and_readded_rows(index):
+    index.remove(0)
+    assert index.candidates({"city": "pokhara"}) == {1}
+    index.add(1, {"city": "chitwan", "type": "hotels"})
+    assert index.candidates({"city": "pokhara"}) == set()
+    assert index.candidates({"city": "chitwan"}) == {1, 2}
+
+
+def test_unsupported_operator_is_rejected():
+    with pytest.raises(ValueError):
+        MetadataIndex.matches({"level": 3}, {"level": {"$gt": 2}})
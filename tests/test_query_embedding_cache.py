@@ -0,0 +1,71 @@
+import asyncio
+
+from services.query_embedding_cache import QueryEmbeddingCache
+
+
+class FakeRedisService:
+    def __init__(self):
+        self.store = {}
+
+    async def get_emb_cache(self, query):
+        return self.store.get(query)
+
+    async def set_emb_cache(self, query, embeddings):
+        self.store[query] = embeddings
+
+
+def test_cancelled_leader_does_not_cancel_followers():
+    async def run():
+        cache = QueryEmbeddingCache(maxsize=8, ttl=60)
+        redis_service = FakeRedisService()
+        started, release = asyncio.Event(), asyncio.Event()
+        calls = 0
+
+        async def compute(query):
+            nonlocal calls
+            calls += 1
+            started.set()
+            await release.wait()
+            return {"dense": [1.0]}
+
+        leader = asyncio.create_task(
+            cache.get_or_compute("Pokhara", redis_service, compute)
+        )
+        await started.wait()
+        follower = asyncio.create_task(
+            cache.get_or_compute("pokhara", redis_service, compute)
+        )
+        await asyncio.sleep(0)
+
+        leader.cancel()
+        await asyncio.sleep(0)
+        release.set()
+
+        assert await follower == {"dense": [1.0]}
+        assert leader.cancelled()
+        assert calls == 1
+        assert cache.stats()["coalesced"] == 1
+        assert cache.stats()["in_flight"] == 0
+
+    asyncio.run(run())
+
+
+def test_failure_reaches_every_caller_and_is_not_cached():
+    async def run():
+        cache = QueryEmbeddingCache(maxsize=8, ttl=60)
+        redis_service = FakeRedisService()
+
+        async def compute(query):
+            await asyncio.sleep(0)
+            raise RuntimeError("encoder down")
+
+        results = await asyncio.gather(
+            cache.get_or_compute("chitwan", redis_service, compute),
+            cache.get_or_compute("chitwan", redis_service, compute),
+            return_exceptions=True,
+        )
+        assert all(isinstance(r, RuntimeError) for r in results)
+        assert cache.stats()["in_flight"] == 0
+        assert cache.stats()["lru"]["size"] == 0
+
+    asyncio.run(run())
@@ -0,0 +1,38 @@
+import asyncio
+
+import pytest
+
+fakeredis = pytest.importorskip("fakeredis")
+
+from services.redis_service import RedisService
+
+
+class FakeRedis(fakeredis.aioredis.FakeRedis):
+    """fakeredis implements neither INFO nor MEMORY USAGE."""
+
+    async def info(self, section=None, *args, **kwargs):
+        return {}
+
+
+def test_session_locks_are_not_counted_as_sessions():
+    async def scenario():
+        redis_client = FakeRedis(decode_responses=True)
+        await redis_client.set("session_1", "{}")
+        await redis_client.set("session_2", "{}")
+        await redis_client.set("session_1:lock", "token")
+        # Count the keys without sampling their memory
+        return await RedisService(redis_client=redis_client).memory_report(
+            sample_size=0
+        )
+
+    report = asyncio.run(scenario())
+    assert report["sessions"]["keys"] == 2
+    assert report["session_locks"]["keys"] == 1
+
+
+def test_metrics_require_an_admin():
+    pytest.importorskip("jwt")
+    from dependencies.dependency import get_access_admin
+    from routes.metrics_route import router
+
+    assert [d.dependency for d in router.dependencies] == [get_access_admin]
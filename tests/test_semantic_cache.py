@@ -0,0 +1,87 @@
+import asyncio
+
+import pytest
+
+fakeredis = pytest.importorskip("fakeredis")
+
+from services.semantic_cache_service import SemanticCacheService
+
+
+def worker_service(redis_client, **kwargs):
+    """A service with its own mirror, as in a separate worker process."""
+
+    class WorkerCache(SemanticCacheService):
+        _mirrors = {}
+
+    return WorkerCache(redis_client, "policy", threshold=0.9, ttl=3600, **kwargs)
+
+
+class CountingRedis(fakeredis.aioredis.FakeRedis):
+    hgetall_calls = 0
+
+    async def hgetall(self, name):
+        CountingRedis.hgetall_calls += 1
+        return await super().hgetall(name)
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_stores_are_applied_incrementally_by_other_workers():
+    async def scenario():
+        redis_client = CountingRedis(decode_responses=True)
+        writer = worker_service(redis_client)
+        reader = worker_service(redis_client)
+
+        await writer.store("refund policy", [1.0, 0.0, 0.0], "full refund")
+        assert await reader.lookup([1.0, 0.0, 0.0]) == "full refund"
+        generation = await redis_client.get("semantic_cache:policy:0:generation")
+        full_loads = CountingRedis.hgetall_calls
+
+        await writer.store("cancel booking", [0.0, 1.0, 0.0], "cancel online")
+        assert await reader.lookup([0.0, 1.0, 0.0]) == "cancel online"
+        assert await reader.lookup([1.0, 0.0, 0.0]) == "full refund"
+        # No eviction, so the generation stays and nothing is reloaded in full
+        assert await redis_client.get("semantic_cache:policy:0:generation") == generation
+        assert CountingRedis.hgetall_calls == full_loads
+
+    run(scenario())
+
+
+def test_eviction_reloads_the_mirror():
+    async def scenario():
+        redis_client = fakeredis.aioredis.FakeRedis(decode_responses=True)
+        writer = worker_service(redis_client, max_entries=1)
+        reader = worker_service(redis_client, max_entries=1)
+
+        await writer.store("refund policy", [1.0, 0.0, 0.0], "full refund")
+        assert await reader.lookup([1.0, 0.0, 0.0]) == "full refund"
+        generation = await redis_client.get("semantic_cache:policy:0:generation")
+
+        await writer.store("cancel booking", [0.0, 1.0, 0.0], "cancel online")
+        assert await redis_client.get("semantic_cache:policy:0:generation") != generation
+        assert await reader.lookup([1.0, 0.0, 0.0]) is None
+        assert await reader.lookup([0.0, 1.0, 0.0]) == "cancel online"
+        assert reader._mirrors["policy"].ids == list(
+            await redis_client.hkeys("semantic_cache:policy:0:entries")
+        )
+
+    run(scenario())
+
+
+def test_hits_keep_the_namespace_from_expiring():
+    async def scenario():
+        redis_client = fakeredis.aioredis.FakeRedis(decode_responses=True)
+        service = worker_service(redis_client)
+        keys = service._keys(0)
+
+        await service.store("refund policy", [1.0, 0.0, 0.0], "full refund")
+        for key in keys.values():
+            await redis_client.expire(key, 5)
+
+        assert await service.lookup([1.0, 0.0, 0.0]) == "full refund"
+        for key in ("entries", "lru", "generation", "added"):
+            assert await redis_client.ttl(keys[key]) > 5
+
+    run(scenario())
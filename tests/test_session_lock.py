@@ -0,0 +1,63 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("jwt")
+pytest.importorskip("langgraph")
+
+from starlette.requests import ClientDisconnect
+
+from routes.classify_route import _SessionStreamingResponse
+
+
+class FakeLock:
+    def __init__(self):
+        self.released = 0
+
+    async def release(self):
+        self.released += 1
+
+
+def _scope(spec_version: str) -> dict:
+    return {"type": "http", "asgi": {"version": "3.0", "spec_version": spec_version}}
+
+
+async def _receive():
+    await asyncio.Event().wait()
+
+
+async def _disconnected(message):
+    raise OSError("client went away")
+
+
+def test_lock_released_when_client_disconnects_before_the_body_starts():
+    started = []
+
+    async def body():
+        started.append(True)
+        yield "event: intent\n\n"
+
+    lock = FakeLock()
+    response = _SessionStreamingResponse(body(), lock, media_type="text/event-stream")
+    with pytest.raises(ClientDisconnect):
+        asyncio.run(response(_scope("2.4"), _receive, _disconnected))
+
+    assert started == []
+    assert lock.released == 1
+
+
+def test_lock_released_once_after_a_full_stream():
+    sent = []
+
+    async def body():
+        yield "event: done\n\n"
+
+    async def send(message):
+        sent.append(message)
+
+    lock = FakeLock()
+    response = _SessionStreamingResponse(body(), lock, media_type="text/event-stream")
+    asyncio.run(response(_scope("2.4"), _receive, send))
+
+    assert sent[-1] == {"type": "http.response.body", "body": b"", "more_body": False}
+    assert lock.released == 1
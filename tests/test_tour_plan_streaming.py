@@ -0,0 +1,81 @@
+import asyncio
+import json
+
+import pytest
+
+pytest.importorskip("langchain_core")
+pytest.importorskip("langchain_pinecone")
+
+from langchain_core.runnables import RunnableGenerator
+
+from services.tour_planner_service import TourPlannerService
+
+PLAN = {
+    "title": "Tour Plan for kathmandu to pokhara",
+    "response": [
+        {
+            "day": day,
+            "title": f"Day {day}",
+            "schedule": ["09:00 breakfast", "10:00 sightseeing"],
+            "hotel": "Lakeside Inn",
+            "transport": ["tourist bus"],
+        }
+        for day in (1, 2, 3)
+    ],
+    "confirmation": "Would you like to confirm this tour?",
+    "sources_used": ["Lakeside Inn"],
+}
+
+
+class StreamingLLM:
+    """Streams the plan JSON a few characters at a time and counts what it sent."""
+
+    def __init__(self, text: str, chunk_size: int = 8):
+        self.text = text
+        self.chunk_size = chunk_size
+        self.sent = 0
+
+    async def _stream(self, _input):
+        for start in range(0, len(self.text), self.chunk_size):
+            self.sent = start + self.chunk_size
+            yield self.text[start : self.sent]
+
+    def runnable(self):
+        return RunnableGenerator(self._stream)
+
+
+def _planner(llm) -> TourPlannerService:
+    return TourPlannerService(
+        pc_index=None, llm=llm, embedding_service=None, redis_service=None
+    )
+
+
+def test_day_plans_are_emitted_while_the_plan_streams():
+    llm = StreamingLLM(json.dumps(PLAN))
+    emitted = []
+
+    plan = asyncio.run(
+        _planner(llm.runnable())._generate_plan(
+            "plan", on_day_plan=lambda day: emitted.append((day["day"], llm.sent))
+        )
+    )
+
+    assert [day for day, _ in emitted] == [1, 2, 3]
+    # Days 1 and 2 went out before the model had finished the plan
+    assert all(sent < len(llm.text) for _, sent in emitted[:2])
+    assert plan == PLAN
+
+
+def test_planner_node_only_streams_day_plans_when_asked():
+    pytest.importorskip("langgraph")
+    from workflow.nodes.planner_node import planner_node
+
+    class RagService:
+        async def tour_planning_service(self, on_day_plan=None, **kwargs):
+            self.on_day_plan = on_day_plan
+            return PLAN, {}
+
+    rag_service = RagService()
+    state = {"user_query": "3 days from kathmandu to pokhara", "messages": []}
+    asyncio.run(planner_node(state, {"configurable": {"rag_service": rag_service}}))
+    assert rag_service.on_day_plan is None
@@ -0,0 +1,91 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("langchain_core")
+pytest.importorskip("langchain_pinecone")
+
+from services.lookup_store import lookup_store
+from services.route_graph import RouteGraph
+from services.tour_planner_service import TourPlannerService
+
+MULTI_STOP = {
+    "days": 5,
+    "from_city": "kathmandu",
+    "to_city": "lumbini",
+    "stops": ["chitwan"],
+}
+
+
+class Planner(TourPlannerService):
+    """Records what the planner asks for instead of calling the LLM or the index."""
+
+    def __init__(self, llm_constraints: dict):
+        super().__init__(pc_index=None, llm=None, embedding_service=None, redis_service=None)
+        self.llm_constraints = llm_constraints
+        self.llm_calls = 0
+        self.fetched = []
+        self.travel_fetched = False
+        self.prompt = None
+
+    async def _get_tour_constraints_with_llm(self, user_query, history):
+        self.llm_calls += 1
+        return dict(self.llm_constraints)
+
+    async def _fetch_data(self, query, city, data_type, k=3):
+        self.fetched.append((city, data_type))
+        return [{"city": city, "type": data_type}]
+
+    async def _fetch_travel_hours(self, query, metadata):
+        self.travel_fetched = True
+        return [{"from_city": metadata["from_city"], "to_city": metadata["to_city"]}]
+
+    async def _generate_plan(self, prompt, on_day_plan=None):
+        self.prompt = prompt
+        return {"response": []}
+
+
+def _graph(*edges) -> RouteGraph:
+    return RouteGraph.from_records(
+        (a, b, f"mode-bus, duration hour-{hours}") for a, b, hours in edges
+    )
+
+
+def test_fresh_multi_stop_request_reaches_the_route_solver(monkeypatch):
+    monkeypatch.setattr(
+        lookup_store,
+        "route_graph",
+        lambda: _graph(("kathmandu", "chitwan", 5), ("chitwan", "lumbini", 4)),
+    )
+    planner = Planner(MULTI_STOP)
+
+    _, constraints = asyncio.run(
+        planner.run(
+            "plan 5 days from kathmandu to lumbini and visit chitwan on the way", []
+        )
+    )
+
+    assert planner.llm_calls == 1
+    assert constraints["stops"] == ["chitwan"]
+    assert "kathmandu -> chitwan" in planner.prompt
+    assert "chitwan -> lumbini" in planner.prompt
+    assert not planner.travel_fetched
+    # Stops get hotels as well as attractions
+    assert set(planner.fetched) == {
+        (city, data_type)
+        for city in ("lumbini", "chitwan")
+        for data_type in ("tour_attraction", "hotels")
+    }
+
+
+def test_trip_without_legs_falls_back_to_travel_records(monkeypatch):
+    monkeypatch.setattr(
+        lookup_store, "route_graph", lambda: _graph(("kathmandu", "pokhara", 6))
+    )
+    planner = Planner(
+        {"days": 2, "from_city": "pokhara", "to_city": "pokhara", "stops": None}
+    )
+
+    asyncio.run(planner.run("2 days around pokhara", []))
+
+    assert planner.travel_fetched
@@ -0,0 +1,28 @@
+import zlib
+from typing import Any
+
+import orjson
+
+# One-byte header on every encoded value. Plain JSON text written before this
+# codec existed starts with a printable character, so it is still decoded.
+_RAW = b"\x00"
+_ZLIB = b"\x01"
+
+
+def encode(value: Any, compress_min_bytes: int = 512) -> bytes:
+    """orjson-encodes value, zlib-compressing it when that pays off."""
+    payload = orjson.dumps(value, option=orjson.OPT_SERIALIZE_NUMPY)
+    if len(payload) >= compress_min_bytes:
+        compressed = zlib.compress(payload, 6)
+        if len(compressed) < len(payload):
+            return _ZLIB + compressed
+    return _RAW + payload
+
+
+def decode(data: bytes) -> Any:
+    header, payload = data[:1], data[1:]
+    if header == _ZLIB:
+        return orjson.loads(zlib.decompress(payload))
+    if header == _RAW:
+        return orjson.loads(payload)
+    return orjson.loads(data)
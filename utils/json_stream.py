@@ -0,0 +1,75 @@
+import codecs
+import json
+import re
+from typing import BinaryIO, Iterator
+
+_WHITESPACE = " \t\n\r\ufeff"
+# What ends a number or literal item
+_SCALAR_END = re.compile(r"[,\]\s]")
+
+
+def iter_json_array(stream: BinaryIO, read_size: int = 64 * 1024) -> Iterator:
+    """
+    Yields the items of a top-level JSON array one at a time, reading the stream
+    in read_size blocks. Only the current item and one block are held in memory.
+    A top-level object is yielded as a single item.
+    """
+    decoder = json.JSONDecoder()
+    decode = codecs.getincrementaldecoder("utf-8")().decode
+    buffer, pos, eof = "", 0, False
+
+    def read_more() -> bool:
+        nonlocal buffer, pos, eof
+        if eof:
+            return False
+        block = stream.read(read_size)
+        eof = not block
+        # Drop what has been consumed so the buffer stays around one block
+        buffer = buffer[pos:] + decode(block, final=eof)
+        pos = 0
+        return True
+
+    def next_char() -> str:
+        nonlocal pos
+        while True:
+            while pos < len(buffer) and buffer[pos] in _WHITESPACE:
+                pos += 1
+            if pos < len(buffer):
+                return buffer[pos]
+            if not read_more():
+                return ""
+
+    first = next_char()
+    if first == "{":
+        while read_more():
+            pass
+        yield json.loads(buffer[pos:])
+        return
+    if first != "[":
+        raise ValueError("Invalid JSON file: expected an array or an object")
+    pos += 1
+
+    if next_char() == "]":
+        return
+    while True:
+        if next_char() not in '{["':
+            # A number or literal may continue in the next block ("12" + ".34"),
+            # so read until whatever ends it has arrived
+            while not _SCALAR_END.search(buffer, pos) and read_more():
+                pass
+        try:
+            item, end = decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError as e:
+            # Most likely the item runs past the buffer; read on and retry
+            if read_more():
+                continue
+            raise ValueError(f"Invalid JSON file: {e}")
+        pos = end
+        yield item
+
+        separator = next_char()
+        if separator == "]":
+            return
+        if separator != ",":
+            raise ValueError(f"Invalid JSON file: expected ',' or ']' at {pos}")
+        pos += 1
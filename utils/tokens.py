@@ -0,0 +1,40 @@
+from functools import lru_cache
+
+from utils.logger import logger
+
+
+@lru_cache(maxsize=1)
+def _get_encoding():
+    # Gemini's tokenizer is not public; cl100k is a close, fast approximation
+    try:
+        import tiktoken
+
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception as e:
+        # e.g. the BPE file cannot be downloaded in an offline container
+        logger.warning(f"tiktoken unavailable, estimating tokens from length: {e}")
+        return None
+
+
+def count_tokens(text: str) -> int:
+    encoding = _get_encoding()
+    if encoding is None:
+        return len(text) // 4 + 1
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    encoding = _get_encoding()
+    if encoding is None:
+        limit = max_tokens * 4
+        return text if len(text) <= limit else text[:limit] + "..."
+    tokens = encoding.encode(text, disallowed_special=())
+    if len(tokens) <= max_tokens:
+        return text
+    return encoding.decode(tokens[:max_tokens]) + "..."
+
+
+def log_prompt_tokens(node: str, prompt: str) -> int:
+    tokens = count_tokens(prompt)
+    logger.info(f"Prompt tokens [{node}] ----> {tokens}")
+    return tokens
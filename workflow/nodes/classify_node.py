@@ -1,6 +1,7 @@
 from workflow.state import GraphState
 from langchain_core.runnables import RunnableConfig
 from utils.logger import logger
+from services.history_compactor import history_compactor
 
 
 async def classify_node(
@@ -14,18 +15,25 @@ async def classify_node(
     classify_service = cfg.get("classify_service")
     user_query = state.get("user_query")
     messages = state.get("messages") or []
+    history = state.get("history")
+    if history is None:
+        history = history_compactor.compact(messages)
 
     if user_query:
-        intent = await classify_service.classify(user_query, messages)
+        decision = await classify_service.classify_with_details(user_query, history)
     else:
-        intent = "general inquiry"
+        decision = {"intent": "general inquiry", "confidence": None, "path": "default"}
 
-    return {"intent": intent}
+    return {
+        "intent": decision["intent"],
+        "intent_confidence": decision["confidence"],
+        "intent_path": decision["path"],
+    }
 
 
 def router_node(state: GraphState):
     intent = state.get("intent")
-    logger.info(f"router node ----> {intent}")
+    logger.info(f"router node ----> {intent} (path: {state.get('intent_path')})")
     if intent == "policy":
         return "policy"
     elif intent == "planning":
@@ -2,6 +2,7 @@ import json
 
 from workflow.state import GraphState
 from langchain_core.runnables import RunnableConfig
+from langgraph.config import get_stream_writer
 from utils.logger import logger
 
 
@@ -17,11 +18,26 @@ async def planner_node(
     user_query = state.get("user_query")
     messages = state.get("messages") or []
     if rag_service and user_query:
-        response = await rag_service.tour_planning_service(
-            user_query=user_query, message_history=messages
+        on_day_plan = None
+        if cfg.get("stream_day_plans"):
+            # Day plans go out on the "custom" stream as soon as they are complete
+            writer = get_stream_writer()
+            on_day_plan = lambda day: writer({"event": "day_plan", "data": day})
+        response, constraints = await rag_service.tour_planning_service(
+            user_query=user_query,
+            message_history=messages,
+            history=state.get("history"),
+            constraints=state.get("constraints"),
+            on_day_plan=on_day_plan,
+            regenerate=bool(state.get("regenerate")),
         )
         messages.append({"role": "user", "content": user_query})
         messages.append({"role": "assistant", "content": response})
     else:
         raise ValueError("RAG service returned none.")
-    return {"response": response, "messages": messages, "title": response.get("title")}
+    return {
+        "response": response,
+        "messages": messages,
+        "title": response.get("title"),
+        "constraints": constraints,
+    }
@@ -6,6 +6,11 @@ class GraphState(TypedDict):
     user_id: int
     user_query: str
     messages: List[dict]
+    history: List[str]
     intent: str
+    intent_confidence: float
+    intent_path: str
     title: str
+    constraints: dict
+    regenerate: bool
     response: str